@@ -4,6 +4,7 @@ from selenium.webdriver.chrome.options import Options
 import undetected_chromedriver as uc
 from TikTokBot.bot import Bot
 from TikTokBot.puppets import PuppetPassive, PuppetCasual, PuppetActive, PuppetBase
+from TikTokBot.output import partition_path
 import json, datetime, sys
 
 PUPPET_TYPES = [PuppetBase, PuppetPassive, PuppetCasual, PuppetActive]
@@ -16,12 +17,29 @@ def _default_outputfile(data_dir, puppet_id):
     """
     return f"{data_dir}/{puppet_id}_{datetime.date.today()}_out.csv"
 
+def _default_partitionfile(data_dir, puppet_id):
+    """
+        Returns the default Parquet part file for a given puppet's output (partitioned by topic, puppet & date).
+    """
+    return partition_path(f"{data_dir}/parquet", puppet_id[:2], puppet_id, datetime.date.today())
+
+
+def _configure_resources(puppet, policy, monitor):
+    """
+        Applies a resource policy and/or enables resource monitoring for a new puppet.
+    """
+    if monitor:
+        puppet.enable_resource_monitor(policy or "full")
+    if policy is not None:
+        puppet.apply_resource_policy(policy)
+
 
 ### Public functionality ###
 
-def get_chrome_options(user_dir="./users/default", incognito=False):
+def get_chrome_options(user_dir="./users/default", incognito=False, capture_feed=False):
     """
         Returns Options object which can be used to configure the driver.
+        capture_feed enables the performance log (needed for FeedCapture & bandwidth metrics).
     """
     options = Options()
     #options.add_argument(
@@ -45,6 +63,8 @@ def get_chrome_options(user_dir="./users/default", incognito=False):
     # options.add_argument("--profile-directory=Default")
     options.add_argument(f"--user-data-dir={user_dir}")
     options.add_argument("--mute-audio")
+    if capture_feed:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
 
     return options
 
@@ -56,10 +76,13 @@ def setup_anon_puppet(driver_path, **kwargs):
     data_dir = kwargs.get("data_dir", "./data")
     outf = kwargs.get("output_file", f"{data_dir}/anon.csv")
     profile_f = kwargs.get("profile_file", f"profile_anon.json")
+    capture_feed = kwargs.get("capture_feed", False)
+    resource_policy = kwargs.get("resource_policy", None)
+    monitor = kwargs.get("monitor_resources", False)
 
     # Get session options
     driver_service = Service(driver_path)
-    options = get_chrome_options(user_dir="./users/default", incognito=True)
+    options = get_chrome_options(user_dir="./users/default", incognito=True, capture_feed=(capture_feed or monitor))
 
     # Open driver
     driver = webdriver.Chrome(service=driver_service, options=options)
@@ -67,6 +90,11 @@ def setup_anon_puppet(driver_path, **kwargs):
     # Make bot & set output file
     puppet = PuppetBase(driver, "ANON", profile_file=profile_f, output_file=outf)
     puppet.set_output_file(outf)
+    if capture_feed:
+        puppet.enable_feed_capture(kwargs.get("feed_output_file", None))
+    _configure_resources(puppet, resource_policy, monitor)
+    if kwargs.get("metrics_dir", None) is not None:
+        puppet.enable_instrumentation(kwargs["metrics_dir"])
     return puppet
 
 def setup_puppet(driver_path, creds_file, puppet_id, **kwargs):
@@ -90,10 +118,16 @@ def setup_puppet(driver_path, creds_file, puppet_id, **kwargs):
 
     # Set params
     data_dir = kwargs.get("data_dir", "./data")
-    outf = kwargs.get("output_file", _default_outputfile(data_dir, puppet_id))
+    if kwargs.get("output_format", "csv") == "parquet":
+        outf = kwargs.get("output_file", _default_partitionfile(data_dir, puppet_id))
+    else:
+        outf = kwargs.get("output_file", _default_outputfile(data_dir, puppet_id))
 
     user_dir_parent = kwargs.get("user_dir", "./users")
     user_dir = f"{user_dir_parent}/{puppet_id}"
+    capture_feed = kwargs.get("capture_feed", False)
+    resource_policy = kwargs.get("resource_policy", None)
+    monitor = kwargs.get("monitor_resources", False)
 
     # Open driver
     driver = None
@@ -102,13 +136,15 @@ def setup_puppet(driver_path, creds_file, puppet_id, **kwargs):
         ucoptions = uc.ChromeOptions()
         ucoptions.add_argument(f"--user-data-dir={user_dir}")
         ucoptions.add_argument("--mute-audio")
+        if capture_feed or monitor:
+            ucoptions.set_capability("goog:loggingPrefs", {"performance": "ALL"})
         if sys.platform == "linux":
             # Fix so the program uses Chrome instead of Chromium if both are installed
             ucoptions.binary_location = "/usr/bin/google-chrome"
         driver = uc.Chrome(options=ucoptions, version_main=102)
     else:
         driver_service = Service(driver_path)
-        options = get_chrome_options(user_dir=user_dir, incognito=False)
+        options = get_chrome_options(user_dir=user_dir, incognito=False, capture_feed=(capture_feed or monitor))
         driver = webdriver.Chrome(service=driver_service, options=options)
 
     # Make bot & configure
@@ -117,5 +153,15 @@ def setup_puppet(driver_path, creds_file, puppet_id, **kwargs):
     puppet = puppet_type(driver, puppet_id, output_file=outf)
     puppet.set_data_dir(data_dir)
     puppet.set_credentials(cred_info["email"], cred_info["password"], platform=cred_info["platform"])
+    if kwargs.get("session_cache", None) is not None:
+        # Reuse the cached logged-in session (e.g. session_cache="./users/sessions") if it is still valid
+        # (login_tiktok then skips the login flow)
+        puppet.enable_session_cache(kwargs["session_cache"])
+        puppet.restore_session()
+    if capture_feed:
+        puppet.enable_feed_capture(kwargs.get("feed_output_file", None))
+    _configure_resources(puppet, resource_policy, monitor)
+    if kwargs.get("metrics_dir", None) is not None:
+        puppet.enable_instrumentation(kwargs["metrics_dir"])
 
     return puppet
@@ -2,9 +2,169 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, ElementNotInteractableException, TimeoutException
-from TikTokBot.utils import random_wait, emulate_keystrokes
-import time, traceback, logging, json, re
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+from TikTokBot.utils import random_wait, emulate_keystrokes, sleep
+from TikTokBot.locators import SelectorRegistry, probe_xpaths
+from TikTokBot.output import VideoInfoWriter, COLUMNS, encode_row, make_writer, is_parquet
+from TikTokBot.checkpoint import Checkpoint
+from TikTokBot.instrumentation import Instrumentation, timed, is_none, is_falsy, format_summary
+from collections import deque
+import time, traceback, logging, json, re, math, atexit, weakref
+
+
+# Bots whose buffered output is flushed at interpreter exit (weak, so finished bots & drivers can be collected)
+_live_bots = weakref.WeakSet()
+
+def _close_live_bots():
+    for bot in list(_live_bots):
+        try:
+            bot.close_output()
+        except Exception as e:
+            logging.getLogger('Bot').error("Error while closing output at exit.", exc_info=True)
+
+atexit.register(_close_live_bots)
+
+
+# Extracts all VideoInfo fields in a single round trip.
+# Arguments: a dict of selector name -> list of alternative XPaths (tried in order).
+# Returns null while the video element has no metadata yet (so it can be polled).
+# The matching variant per selector is returned in 'hits'.
+VIDEO_INFO_SCRIPT = """
+const paths = arguments[0];
+const hits = {};
+const byXPath = (name) => {
+    const ps = paths[name] || [];
+    for (let i = 0; i < ps.length; i++) {
+        const el = document.evaluate(ps[i], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        if (el) { hits[name] = i; return el; }
+    }
+    return null;
+};
+const text = (el) => el ? el.innerText : null;
+
+const url = window.location.href.split('/');
+const id_ix = url.indexOf('video');
+if (id_ix < 0) return null;
+
+let video = document.querySelector('video') || byXPath('video');
+if (!video || !(video.duration > 0)) return null;
+
+const tags_el = byXPath('tags');
+const tags = tags_el ? Array.from(tags_el.querySelectorAll('a strong')).map((s) => s.innerText) : [];
+const desc_el = byXPath('desc');
+
+return {
+    vid: url[id_ix + 1].split('?')[0],
+    creator: text(byXPath('creator')),
+    desc: desc_el ? desc_el.innerText : "",
+    tags: tags,
+    duration: video.duration,
+    sound: text(byXPath('sound')),
+    likes: text(byXPath('likes')),
+    comments: text(byXPath('comments')),
+    hits: hits
+};
+"""
+
+# Reads every anomaly flag of the page in a single round trip.
+# Arguments: list of alternative XPaths for the content warning button.
+PAGE_STATE_SCRIPT = """
+const visible = (el) => el !== null && el.offsetParent !== null;
+const flags = (window.sessionStorage.botflags || "").split(',');
+let warning = false;
+for (const p of arguments[0]) {
+    if (visible(document.evaluate(p, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue)) {
+        warning = true;
+        break;
+    }
+}
+const video = document.querySelector('video');
+return {
+    paused: flags.includes('paused'),
+    captcha: visible(document.getElementById('tiktok-verify-ele')),
+    content_warning: warning,
+    video_paused: video !== null && video.paused && !video.ended && video.readyState >= 2,
+    stuck: video !== null && (video.error !== null || video.networkState === HTMLMediaElement.NETWORK_NO_SOURCE),
+    cookie_banner: document.querySelector('tiktok-cookie-banner') !== null,
+    modal: document.querySelector('[class~="DivModalMask"]') !== null
+};
+"""
+
+# Resolves once the 'paused' bot flag is removed (polled inside the page, not over WebDriver).
+WAIT_UNPAUSED_SCRIPT = """
+const done = arguments[arguments.length - 1];
+const check = () => {
+    if (!(window.sessionStorage.botflags || "").split(',').includes('paused')) done(true);
+    else setTimeout(check, 250);
+};
+check();
+"""
+
+# Collects the video links currently in a tag/creator grid, then scrolls down so the grid loads more.
+GRID_LINKS_SCRIPT = """
+const links = Array.from(document.querySelectorAll('a[href*="/video/"]'), (a) => a.href);
+window.scrollTo(0, document.body.scrollHeight);
+return links;
+"""
+
+# Login state of the open page: "in" (profile icon shown), "out" (login button shown) or null while the header loads.
+# Arguments: list of alternative XPaths for the login button.
+SESSION_PROBE_SCRIPT = """
+if (document.querySelector('[data-e2e="profile-icon"]')) return "in";
+for (const p of arguments[0]) {
+    if (document.evaluate(p, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue) return "out";
+}
+if (document.querySelector('[data-e2e="top-login-button"]')) return "out";
+return null;
+"""
+
+
+# Outcomes of moving between videos
+MOVED, END_OF_FEED, BLOCKED = "moved", "end_of_feed", "blocked"
+
+class Navigation:
+    """
+        Result of next_video/prev_video. Truthy only if the bot moved to another video.
+    """
+
+    def __init__(self, status, from_vid, to_vid, seconds):
+        self.status = status     # MOVED, END_OF_FEED or BLOCKED
+        self.from_vid = from_vid
+        self.to_vid = to_vid     # ID of the video moved to (None unless MOVED)
+        self.seconds = seconds   # Time the transition took
+
+    def __bool__(self):
+        return self.status == MOVED
+
+    def __repr__(self):
+        return f"Navigation({self.status}, {self.from_vid} -> {self.to_vid}, {self.seconds:.2f}s)"
+
+def video_id_from_url(url):
+    """
+        Returns the video ID in a TikTok video URL (or None).
+    """
+    m = re.search(r"/video/(\d+)", url or "")
+    return m.group(1) if m else None
+
+class RunIds:
+    """
+        Video IDs a run skips: those it encountered itself and those in to_skip (a set or SeenIndex).
+        add() only records an ID for this run; it reaches to_skip once its row is flushed (see Bot._on_flush).
+    """
+
+    def __init__(self, to_skip=None):
+        self.run = set()
+        self.to_skip = to_skip
+
+    def __contains__(self, vid):
+        return vid in self.run or (self.to_skip is not None and vid in self.to_skip)
+
+    def add(self, vid):
+        self.run.add(vid)
+
+    def __ior__(self, vids):
+        self.run |= set(vids)
+        return self
 
 
 # POD for video info
@@ -20,6 +180,19 @@ class VideoInfo:
         self.comments = None
         self.sound = None
 
+    @classmethod
+    def from_dict(cls, d):
+        """
+            Builds VideoInfo from a dict as returned by VIDEO_INFO_SCRIPT
+        """
+        duration = d.get("duration")
+        vi = cls(d.get("vid"), d.get("creator"), d.get("desc"), d.get("tags"),
+                 float(duration) if duration is not None else None)
+        vi.likes = d.get("likes")
+        vi.comments = d.get("comments")
+        vi.sound = d.get("sound")
+        return vi
+
     def valid(self):
         """
             True if essential fields are not None
@@ -27,31 +200,39 @@ class VideoInfo:
         return (self.vid is not None) and (isinstance(self.creator, str)) and (isinstance(self.desc, str)) \
                 and (isinstance(self.tags, list)) and (isinstance(self.duration, float))
 
+    def to_row(self):
+        """
+            Returns list of values, in the order of output.COLUMNS
+        """
+        return [self.vid, self.creator, self.desc, self.duration, self.num_str_to_int(self.likes),
+                self.num_str_to_int(self.comments), self.sound, str(self.tags)]
+
     def to_csv(self):
         """
-            Returns CSV columns & value
+            Returns CSV columns & value (properly quoted/escaped)
             <value_str> <columns>
         """
-        cols = "v_id,creator,desc,duration,likes,comments,sound,tags"
-        vals = f"{self.vid},\"{self.creator}\",\"{self.desc}\",{self.duration},{self.num_str_to_int(self.likes)},"
-        vals += f"{self.num_str_to_int(self.comments)},\"{self.sound}\",\"{self.tags}\""
-        return (vals, cols)
+        return (encode_row(self.to_row()), ",".join(COLUMNS))
 
     def num_str_to_int(self, n):
         """
             Converts from shorthand number strings to integers
-            e.g. "10.5K" -> 10500
+            e.g. "10.5K" -> 10500, "1,234" -> 1234
+            Returns None for strings that aren't numbers (e.g. the "Like" placeholder shown instead of 0)
         """
-        if not isinstance(n, str):
+        if not isinstance(n, str) or len(n) == 0:
             return n
 
+        n = n.strip().replace(",", "")
         suffix = {'K': 1000, 'M': 1_000_000, 'B': 1_000_000_000}
-        if n[-1] in suffix:
-            # Strip suffix & multiply
-            return round(float(n[:-1]) * suffix[n[-1]])
-        else:
+        try:
+            if n[-1:] in suffix:
+                # Strip suffix & multiply
+                return round(float(n[:-1]) * suffix[n[-1]])
             # Number is likely already expressed in full
             return int(n)
+        except ValueError:
+            return None
 
 
 """
@@ -64,27 +245,213 @@ class Bot:
         self._driver = driver
         self._wait = WebDriverWait(self._driver, 5) # Waits for max. 5 seconds
         self._outf = output_file
+        self._writer = make_writer(output_file) # Buffers rows, creates the file on first flush
         self._data_dir = ""
+        self.base_url = "http://tiktok.com" # Site root (can point to a local stand-in for testing)
         self.logger = logging.getLogger('Bot')
         self.logger.setLevel(20)
-
-        # Prepare output file
-        with open(self._outf, "w") as ofile:
-            ofile.write(VideoInfo(0, "", "", [], 1).to_csv()[1] + "\n")
+        self.script_extraction = True # Collect VideoInfo in a single execute_script call
+        self.selectors = SelectorRegistry() # Remembers which layout variants matched this session
+        self.feed_capture = None # FeedCapture, if enabled
+        self.resource_monitor = None # ResourceMonitor, if enabled
+        self.resource_policy = None # Name of the applied resource policy (re-applied to tabs opened later)
+        self.videos_written = 0  # Number of VideoInfo rows written by this bot
+        self.last_run_completed = None # Whether the last run collected all its videos (None before the first run)
+        self.checkpointing = True # Journal run progress so crashed runs can resume
+        self._ckpt = None
+        self._to_skip = None   # Persistent to_skip collection of the current run
+        self._unflushed = list() # Video IDs of the rows still buffered by the writer (current run)
+        self._feed_writer = None
+        self.instrumentation = None # Instrumentation (per-step latency metrics), if enabled
+        self.harvest_tabs = 4 # Tabs used to load videos in parallel in harvest mode
+        self.harvest_margin = 0.25 # Extra grid links collected in harvest mode (share of the videos needed)
+        self.session_cache = None # SessionCache, if enabled
+        self.logged_in = False
+
+        # Make sure buffered output is written when the process exits (without keeping the bot alive)
+        _live_bots.add(self)
 
     ### Accessors ###
     def set_output_file(self, fname):
         """
             Sets the default output file for storing collected VideoInfo
         """
+        if is_parquet(fname) != is_parquet(self._outf):
+            # Switching between CSV & Parquet
+            self._writer.close()
+            self._writer = make_writer(fname)
         self._outf = fname
-    
+        self._writer.set_file(fname)
+
+    def append_output(self):
+        """
+            Appends to the existing output file (e.g. of an earlier attempt of the same job) rather than
+            overwriting it on the first write.
+        """
+        self._writer.append(self._outf)
+
+    def set_base_url(self, url):
+        """
+            Sets the root URL of the site to browse (default: http://tiktok.com)
+        """
+        self.base_url = url.rstrip("/")
+
     def set_data_dir(self, ddir):
         """
             Sets the default data directory for other I/O
         """
         self._data_dir = ddir
 
+    def set_script_extraction(self, enabled):
+        """
+            Enables/disables collecting VideoInfo through a single script call.
+            When disabled (or when the script fails), the per-field getters are used.
+        """
+        self.script_extraction = enabled
+
+    def enable_feed_capture(self, feed_output_file=None):
+        """
+            Collects VideoInfo from the feed JSON the web app receives (requires performance logging).
+            The DOM is then only used to confirm which video is open.
+            If feed_output_file is set, every delivered item (including skipped ones) is written there.
+        """
+        from TikTokBot.feedcapture import FeedCapture
+        self.feed_capture = FeedCapture(self._driver)
+        if feed_output_file is not None:
+            self._feed_writer = VideoInfoWriter(feed_output_file)
+
+    def apply_resource_policy(self, policy):
+        """
+            Restricts what the browser downloads (see resources.RESOURCE_POLICIES).
+        """
+        from TikTokBot.resources import apply_policy
+        apply_policy(self._driver, policy)
+        self.resource_policy = policy
+        if self.resource_monitor is not None:
+            self.resource_monitor.policy = policy
+        self.logger.info("Applied resource policy '%s'", policy)
+
+    def enable_resource_monitor(self, policy="full"):
+        """
+            Tracks bandwidth & CPU used by this session (bandwidth requires performance logging).
+        """
+        from TikTokBot.resources import ResourceMonitor
+        self.resource_monitor = ResourceMonitor(self._driver, policy)
+
+    def poll_performance_log(self):
+        """
+            Reads the performance log once and hands the messages to the feed capture & resource monitor.
+        """
+        if self.feed_capture is None and self.resource_monitor is None:
+            return
+        from TikTokBot.feedcapture import read_performance_log
+        try:
+            messages = read_performance_log(self._driver)
+        except Exception as e:
+            self.logger.info("Could not read performance log.")
+            return
+        if self.resource_monitor is not None:
+            self.resource_monitor.on_messages(messages)
+        if self.feed_capture is not None:
+            self.feed_capture.poll(messages)
+
+    def log_run_stats(self):
+        """
+            Logs selector statistics & resource usage for the run.
+        """
+        self.selectors.log_stats(self.logger)
+        if self.resource_monitor is not None:
+            self.poll_performance_log()
+            s = self.resource_monitor.summary()
+            self.logger.info("Resources (%s): %.1f MB in %d requests (%.2f MB/min), CPU %s",
+                             s["policy"], s["mb"], s["requests"], s["mb_per_min"],
+                             "n/a" if s["cpu_s"] is None else f"{s['cpu_s']:.1f}s ({s['cpu_share'] * 100:.0f}%)")
+
+    def enable_instrumentation(self, metrics_dir="./metrics"):
+        """
+            Records per-step latencies, timeouts, retries & waits; writes a JSON-lines metrics file per run.
+        """
+        self.instrumentation = Instrumentation(metrics_dir, prefix=getattr(self, "_id", "bot"))
+
+    def _retry(self, step):
+        if self.instrumentation is not None:
+            self.instrumentation.retry(step)
+
+    def _lap(self, step):
+        """
+            Ends the current video of a run loop. Drains the performance log for the resource monitor
+            (feed capture reads it while collecting), so it doesn't pile up over a whole run.
+        """
+        if self.resource_monitor is not None and self.feed_capture is None:
+            self.poll_performance_log()
+        if self.instrumentation is not None:
+            self.instrumentation.lap(step)
+
+    def _start_metrics(self, kind, target, n=None):
+        if self.instrumentation is not None:
+            self.instrumentation.start_run(kind, target, n)
+
+    def _finish_metrics(self, **info):
+        """
+            Closes the run's metrics file & logs the summary table.
+        """
+        if self.instrumentation is None or self.instrumentation.run is None:
+            return
+        summary = self.instrumentation.end_run(**info)
+        self.logger.info("Run metrics (%s):\n%s", self.instrumentation.path, format_summary(summary))
+
+    def enable_session_cache(self, cache_dir="./users/sessions"):
+        """
+            Saves the session (cookies & localStorage) after logging in, and reuses it instead of logging in again.
+        """
+        from TikTokBot.sessioncache import SessionCache
+        self.session_cache = SessionCache(cache_dir)
+
+    def session_state(self, time=10):
+        """
+            Probes the open page once (bounded wait for the header).
+            Returns "in" (logged in), "out" (login button shown) or None if the probe was inconclusive.
+        """
+        try:
+            return WebDriverWait(self._driver, time, poll_frequency=0.25).until(
+                lambda d: d.execute_script(SESSION_PROBE_SCRIPT, self.selectors.paths("login_btn")))
+        except WebDriverException:
+            # Header didn't load in time, or the page changed while probing
+            return None
+
+    def session_valid(self, time=10):
+        """
+            Probes the open page once and returns True if the session is logged in.
+        """
+        self.logged_in = (self.session_state(time) == "in")
+        return self.logged_in
+
+    def restore_session(self):
+        """
+            Restores the cached session of this bot (if any). Returns True if the restored session is logged in.
+            The cached session is only discarded if the page shows it is logged out.
+        """
+        if self.session_cache is None:
+            return False
+        puppet_id = getattr(self, "_id", "bot")
+        if not self.session_cache.restore(self._driver, puppet_id, self.base_url):
+            return False
+        state = self.session_state()
+        self.logged_in = (state == "in")
+        if state == "in":
+            self.logger.info("Restored cached session for %s.", puppet_id)
+            return True
+        if state == "out":
+            self.logger.info("Cached session for %s expired.", puppet_id)
+            self.session_cache.discard(puppet_id)
+        else:
+            self.logger.info("Could not verify cached session for %s (page didn't load), keeping it.", puppet_id)
+        return False
+
+    def save_session(self):
+        if self.session_cache is not None:
+            self.session_cache.save(self._driver, getattr(self, "_id", "bot"))
+
     def set_credentials(self, email, password, platform="Google"):
         """
             Sets credentials the bot should use for its Google account.
@@ -105,6 +472,7 @@ class Bot:
             self.logger.error("Error while locating element by XPath.", exc_info=True)
             raise e
 
+    @timed(timeout_if=is_none)
     def _wait_el_by_xpath(self, path, time=5, verbose=True):
         """
             Returns element if found after waiting some time.
@@ -118,19 +486,39 @@ class Bot:
             self.logger.error("Error while waiting for element.", exc_info=True)
         return elem
 
+    @timed(timeout_if=is_none)
     def _wait_el_by_xpaths(self, paths, time=5, verbose=True):
         """
-            Tries finding an element using multiple specified XPaths. 
+            Tries finding an element using multiple specified XPaths.
+            All alternatives are probed at once, so a layout change costs no extra timeouts.
+        """
+        el = None
+        try:
+            _, el = probe_xpaths(self._driver, paths, time)
+            if el is None and verbose:
+                self.logger.warning("Could not locate element %s", paths)
+        except Exception as e:
+            self.logger.error("Error while waiting for element.", exc_info=True)
+        return el
+
+    @timed(timeout_if=is_none)
+    def _wait_el(self, name, time=5, verbose=True, clickable=False):
+        """
+            Returns the element registered under name in the selector registry (or None if not found).
         """
         el = None
-        for p in paths:
-            el = self._wait_el_by_xpath(p, time, verbose)
-            if el is not None:
-                return el
+        try:
+            el = self.selectors.find(self._driver, name, time, clickable)
+            if el is None and verbose:
+                self.logger.warning("Could not locate element '%s' (%s)", name, self._driver.current_url)
+        except Exception as e:
+            self.logger.error("Error while waiting for element.", exc_info=True)
+        return el
 
     
     ### Data collection ###
     # Assume a video is open/in focus (for locating by XPath) unless stated otherwise
+    @timed(timeout_if=is_none)
     def get_video_element(self):
         """
             Returns the video player WebElement (or None if not found after max wait)
@@ -141,9 +529,10 @@ class Bot:
             el = WebDriverWait(self._driver, 3).until(EC.presence_of_element_located((By.CSS_SELECTOR, "video")))
         except TimeoutException as e:
             # Fallback, assumes a video is in 'fullscreen/focus' view, get element by XPath
-            el = self._wait_el_by_xpath("/html/body/div[2]/div[2]/div[3]/div[1]/div[2]/div[1]/div/video", time=3)
+            el = self._wait_el("video", time=3)
         return el
 
+    @timed()
     def get_video_id(self):
         """
             Returns the ID (19 digits) for the currently opened TikTok video.
@@ -153,17 +542,14 @@ class Bot:
         id_ix = url_split.index("video") + 1
         return url_split[id_ix].split(sep='?')[0]
 
+    @timed()
     def get_video_tags(self):
         """
             Returns hashtags & mentions for the opened/currently viewed TikTok video.
         """
         tags = list()
         try:        
-            desc_xpaths = ["/html/body/div[2]/div[2]/div[3]/div[2]/div[2]/div[1]",
-                           "/html/body/div[2]/div[2]/div[2]/div[2]/div[3]/div[2]/div[2]/div[1]"
-            ]
-                                      
-            desc_el = self._wait_el_by_xpaths(desc_xpaths, verbose=False)
+            desc_el = self._wait_el("tags", verbose=False)
             tag_els = desc_el.find_elements(by=By.CSS_SELECTOR, value='a') # Tags are links in description
             for t_e in tag_els:
                 tag_span = t_e.find_element(by=By.CSS_SELECTOR, value="strong") # Tags & mentions are encapsulated by <strong>
@@ -172,34 +558,34 @@ class Bot:
             self.logger.info("Could not fetch tags (%s)", self._driver.current_url)
         return tags
 
+    @timed()
     def get_video_sound(self):
         """
             Returns sound used in video.
         """
         try:
-            sound_el = self._wait_el_by_xpath("/html/body/div[2]/div[2]/div[3]/div[2]/div[2]/h4/a", verbose=False)
+            sound_el = self._wait_el("sound", verbose=False)
             return sound_el.text
         except Exception as e:
             self.logger.info("Could not locate sound element (%s)",self._driver.current_url)
 
+    @timed()
     def get_video_creator(self):
         """
             Returns username of the video's creator.
         """
         try:
-            creator_el_xpaths = ["/html/body/div[2]/div[2]/div[3]/div[2]/div[1]/a[2]/span[1]",
-                                 "/html/body/div[2]/div[2]/div[2]/div[2]/div[3]/div[2]/div[1]/a[2]/span[1]"
-            ]                                
-            return self._wait_el_by_xpaths(creator_el_xpaths, verbose=False).text
+            return self._wait_el("creator", verbose=False).text
         except Exception as e:
             self.logger.warning("Could not locate creator element (%s)", self._driver.current_url)
 
+    @timed()
     def get_video_description(self):
         """
             Returns video's description (can be empty).
         """
         try:
-            desc_el = self._wait_el_by_xpath("/html/body/div[2]/div[2]/div[3]/div[2]/div[2]/div[1]/span[1]", verbose=False)
+            desc_el = self._wait_el("desc", verbose=False)
             if desc_el is not None:
                 return desc_el.text
             else:
@@ -207,6 +593,7 @@ class Bot:
         except Exception as e:
             self.logger.info("Could not locate description element (%s)", self._driver.current_url)
 
+    @timed(timeout_if=is_none)
     def get_video_duration(self):
         """
             Returns video duration in seconds (float).
@@ -218,6 +605,7 @@ class Bot:
         except Exception as e:
             self.logger.warning("Could not fetch video duration (%s)", self._driver.current_url)
 
+    @timed()
     def get_video_date(self):
         """
             Returns date the current post was made (if possible)
@@ -231,6 +619,7 @@ class Bot:
             self.logger.warning("Could not find video date (%s)", self._driver.current_url)
 
     ### Handling anomalies ###
+    @timed()
     def close_cookie_banner(self, accept=False):
         c_b = None
         try:
@@ -248,17 +637,19 @@ class Bot:
                 else:
                     btns[(accept_ix + 1) % 2].click()
 
+    @timed()
     def pause_for_captcha(self):
         """
             Checks if Captcha has popped up, and if so, waits until it is gone
         """
         try:
-            time.sleep(1)
+            sleep(1)
             WebDriverWait(self._driver, 180).until(EC.invisibility_of_element_located((By.ID, 'tiktok-verify-ele')))
-            time.sleep(1)
+            sleep(1)
         except Exception as e:
             self.logger.error("Exception during captcha-handling.", exc_info=True)
 
+    @timed()
     def unstuck_video(self):
         """
             Checks if video if paused or 'unavailable' for whatever reason,
@@ -280,19 +671,30 @@ class Bot:
                 break
                 """
 
+    @timed()
     def dismiss_content_warning(self):
         """
             Some videos come with a (disturbing) content warning.
             This function checks whether the 'watch anyway' button is present, and if so, clicks it.
         """
         try:
-            dismiss_btn = WebDriverWait(self._driver, 2).until(EC.element_to_be_clickable((By.XPATH, "/html/body/div[2]/div[2]/div[3]/div[1]/div[2]/div[5]/div/div[2]/button[2]")))
-            dismiss_btn.click()
-        except TimeoutException:
-            pass
+            dismiss_btn = self.selectors.find(self._driver, "content_warning_btn", time=2, clickable=True)
+            if dismiss_btn is not None:
+                dismiss_btn.click()
         except Exception as e:
             self.logger.error("Error while dismissing content warning.", exc_info=True)
 
+    @timed()
+    def resume_video(self):
+        """
+            Resumes playback of a video that got paused automatically.
+        """
+        try:
+            self._driver.execute_script("const v = document.querySelector('video'); if (v) v.play();")
+        except Exception as e:
+            self.logger.error("Error while resuming video.", exc_info=True)
+
+    @timed()
     def close_modal_overlay(self):
         """
             TikTok sometimes shows a 'scrolling tutorial' overlay that intercepts all other clicks.
@@ -308,14 +710,37 @@ class Bot:
 
 
     ### Internal behaviours ###
-    def collect_open_video_info(self):
+    @timed(timeout_if=is_none)
+    def _collect_video_info_script(self, time=5, vid=None):
         """
-        Assumes a TikTok video is being viewed and returns corresponding VideoInfo object
+            Returns VideoInfo collected with a single script call (polled until the video has loaded),
+            or None if the script did not produce a result in time.
+            If vid is given, also waits until that video is the one open.
+        """
+        try:
+            paths = self.selectors.all_paths()
+            def ready(d):
+                info = d.execute_script(VIDEO_INFO_SCRIPT, paths)
+                return info if info is not None and (vid is None or info["vid"] == vid) else None
+            info = WebDriverWait(self._driver, time).until(ready)
+            for name, ix in info.get("hits", dict()).items():
+                self.selectors.record_hit(name, paths[name][ix])
+            return VideoInfo.from_dict(info)
+        except TimeoutException:
+            self.logger.info("Script extraction timed out (%s)", self._driver.current_url)
+        except Exception as e:
+            self.logger.error("Error during script extraction.", exc_info=True)
+        return None
+
+    @timed()
+    def _collect_video_info_fields(self):
+        """
+            Collects VideoInfo using the per-field getters (one lookup per field).
         """
         # Wait until video is playing
         vid_el = self._wait.until(EC.presence_of_element_located((By.TAG_NAME, "video")))
         if vid_el.__sizeof__ == 0:
-            time.sleep(1)
+            sleep(1)
 
         vid = self.get_video_id()
         creator = self.get_video_creator()
@@ -323,123 +748,251 @@ class Bot:
         tags = self.get_video_tags()
         duration = self.get_video_duration()
 
-        # Temp? Like & comment counts
-        # Taken out to speed up video info collection
-        """
-        likes_el_paths = [
-            "/html/body/div[2]/div[2]/div[2]/div[2]/div[3]/div[2]/div[2]/div[2]/div[1]/div[1]/button[1]/strong",
-            "/html/body/div[2]/div[2]/div[3]/div[2]/div[2]/div[2]/div[1]/div[1]/button[1]/strong"
-        ]
-        likes_el = self._wait_el_by_xpaths(likes_el_paths, verbose=False)
-        likes = None
-        if likes_el is not None:
-            likes = likes_el.text
-        comments_el = self._el_by_xpath("/html/body/div[2]/div[2]/div[3]/div[2]/div[2]/div[2]/div[1]/div[1]/button[2]/strong")
-        comments = None
-        if comments_el is not None:
-            comments = comments_el.text
-        """
-
         vid_data = VideoInfo(vid, creator, desc, tags, duration)
         vid_data.sound = self.get_video_sound()
-        #vid_data.likes = likes
-        #vid_data.comments = comments
         return vid_data
 
+    @timed()
+    def collect_open_video_info(self):
+        """
+        Assumes a TikTok video is being viewed and returns corresponding VideoInfo object
+        """
+        if self.feed_capture is not None:
+            # Use the feed data if the open video was delivered through a captured response: only confirm the ID
+            vid = self.get_video_id()
+            vid_data = self.feed_capture.get(vid)
+            if vid_data is None:
+                self.poll_performance_log()
+                vid_data = self.feed_capture.get(vid)
+            if vid_data is not None and vid_data.valid():
+                return vid_data
+        if self.script_extraction:
+            vid_data = self._collect_video_info_script()
+            if vid_data is not None and vid_data.valid():
+                return vid_data
+            # Fall back to the per-field getters
+            self.logger.info("Falling back to per-field extraction (%s)", self._driver.current_url)
+        return self._collect_video_info_fields()
+
+    def _navigate(self, btn_name, timeout=8):
+        """
+            Clicks the named navigation button once and waits (single bounded wait) until the URL shows another video.
+            Returns a Navigation result.
+        """
+        t0 = time.perf_counter()
+        cur_id = self.get_video_id()
+        btn = self._wait_el(btn_name, verbose=False, clickable=True)
+        if btn is None:
+            # The arrow isn't there (or never became clickable): no more videos in this direction
+            return Navigation(END_OF_FEED, cur_id, None, time.perf_counter() - t0)
+        try:
+            btn.click()
+            new_id = WebDriverWait(self._driver, timeout, poll_frequency=0.1).until(
+                lambda d: (lambda vid: vid if vid != cur_id else None)(video_id_from_url(d.current_url)))
+            return Navigation(MOVED, cur_id, new_id, time.perf_counter() - t0)
+        except WebDriverException:
+            # Click was intercepted, the button went stale or the click didn't lead anywhere (overlay, captcha, ...)
+            return Navigation(BLOCKED, cur_id, None, time.perf_counter() - t0)
+
+    def _transition(self, btn_name):
+        """
+            Navigates using the named button; if blocked by a page anomaly, handles it and tries once more.
+        """
+        nav = self._navigate(btn_name)
+        if nav.status == BLOCKED and any(self.handle_page_state().values()):
+            self._retry(btn_name)
+            nav = self._navigate(btn_name)
+        if self.instrumentation is not None:
+            self.instrumentation.record(f"transition:{nav.status}", nav.seconds)
+        if not nav:
+            self.logger.info("Navigation (%s) %s after %.2fs (%s)", btn_name, nav.status, nav.seconds, self._driver.current_url)
+        return nav
+
+    @timed(timeout_if=is_falsy)
     def prev_video(self):
         """
             Assuming a TikTok is being viewed, returns to the previous one using the arrow button
+            Returns a Navigation result (falsy unless the bot moved).
         """
-        cur_id = self.get_video_id()
-        while self.get_video_id() == cur_id:
-            try:
-                up_btn = self._wait.until(EC.presence_of_element_located((By.XPATH, "/html/body/div[2]/div[2]/div[3]/div[1]/button[2]")))
-                up_btn.click()
-                time.sleep(0.1)
-            except ElementNotInteractableException:
-                continue
-            except Exception as e:
-                self.logger.error(f"Could not continue to next video ({self._driver.current_url})", exc_info=True)
-            time.sleep(0.5)
+        return self._transition("prev_btn")
 
+    @timed(timeout_if=is_falsy)
     def next_video(self):
         """
             Assuming a TikTok is being viewed, continues to next one using the arrow button
-            Returns False if bot could not move to next video for some reason.
+            Returns a Navigation result: status MOVED, END_OF_FEED or BLOCKED (falsy unless the bot moved).
         """
-        timeout_count = 0
-        cur_id = self.get_video_id()
-        while self.get_video_id() == cur_id:
-            if timeout_count >= 3:
-                # Assume there is no next video (the arrow hasn't loaded)
-                return False
-            try:
-                down_btn_paths = ["/html/body/div[2]/div[2]/div[3]/div[1]/button[3]",
-                                  "/html/body/div[2]/div[2]/div[2]/div[2]/div[3]/div[1]/button[3]"
-                ]
-                down_btn = None
-                for p in down_btn_paths:
-                    down_btn = self._wait_el_by_xpaths(down_btn_paths, verbose=False)
-                    if down_btn is not None:
-                        break
-                if down_btn is not None:
-                    down_btn.click()
-                    time.sleep(0.2)
-                else:
-                    self.logger.warning("Could not locate down/next button.")
-                    timeout_count += 1 # Count this as a failed attempt
-            except ElementNotInteractableException:
-                continue
-            except TimeoutException:
-                # There might not be a next video, keep track of count
-                timeout_count += 1
-            except Exception as e:
-                self.logger.error(f"Could not continue to next video ({self._driver.current_url})", exc_info=True)
-                return False
-            time.sleep(0.2)
-        return True
+        return self._transition("next_btn")
 
+    @timed()
     def write_vidinfo(self, vi, header=False):
         """
-            Saves VideoInfo data to output file. Creates/overwrites file if header=True
+            Saves VideoInfo data to output file (buffered). Creates/overwrites file if header=True
+        """
+        if header:
+            self._writer.set_file(self._outf, fresh=True)
+            self._unflushed = list()
+        if self._ckpt is not None:
+            self._ckpt.add(vi.vid)
+        if self._to_skip is not None:
+            self._unflushed.append(vi.vid)
+        self._writer.write(vi)
+        self.videos_written += 1
+
+    def _begin_run(self, kind, target, n, to_skip=None):
+        """
+            Starts (or resumes from a checkpoint) a run writing to the output file.
+            Returns (number of videos already written, RunIds of video IDs to skip).
+            Video IDs written by the run are added to to_skip once their rows are flushed.
+            Checkpoints are only kept for CSV output.
+        """
+        run_ids = RunIds(to_skip)
+        self._ckpt = None
+        self._to_skip = to_skip
+        self._unflushed = list()
+        self._writer.on_flush = self._on_flush
+        self._start_metrics(kind, target, n)
+        if not self.checkpointing or is_parquet(self._outf):
+            return 0, run_ids
+
+        path = self._outf + ".ckpt"
+        ckpt = Checkpoint.load(path)
+        if ckpt is not None and ckpt.matches(kind, target, self._outf) and ckpt.written < n:
+            # Resume: append to the output as it was at the last checkpoint
+            self._writer.resume(self._outf, ckpt.offset)
+            run_ids |= ckpt.seen()
+            self.logger.info("Resuming %s run (%s) at %d/%d videos.", kind, target, ckpt.written, n)
+            ckpt.n = n
+        else:
+            ckpt = Checkpoint(path, kind, target, n, self._outf)
+        self._ckpt = ckpt
+        return ckpt.written, run_ids
+
+    def _on_flush(self, fname, rows, offset):
+        """
+            Output flush callback of a run: adds the IDs of the flushed rows to to_skip & updates the checkpoint.
+        """
+        if fname != self._outf:
+            return
+        if self._to_skip is not None:
+            flushed, self._unflushed = self._unflushed[:rows], self._unflushed[rows:]
+            self._to_skip.update(flushed)
+        if self._ckpt is not None:
+            self._ckpt.on_flush(fname, rows, offset)
+
+    def _end_run(self, completed):
+        """
+            Flushes output; removes the checkpoint if the run completed. Logs the run metrics (if enabled).
+        """
+        self.flush_output()
+        self.last_run_completed = completed
+        self._finish_metrics(completed=completed, videos_written=self.videos_written)
+        self._writer.on_flush = None
+        self._to_skip = None
+        if self._ckpt is not None:
+            if completed:
+                self._ckpt.finish()
+            self._ckpt = None
+
+    def flush_output(self):
+        """
+            Writes any buffered VideoInfo to the output file(s).
         """
-        mode = "w" if header else "a"
-        with open(self._outf, mode) as ofile:
-            row, cols = vi.to_csv()
-            if header: ofile.write(cols + '\n')
-            ofile.write(row + '\n')
+        self._writer.flush()
+        if self._feed_writer is not None:
+            self._feed_writer.flush()
+
+    def close_output(self):
+        """
+            Flushes & closes the output file(s).
+        """
+        self._writer.close()
+        if self._feed_writer is not None:
+            self._feed_writer.close()
+
+    def write_captured_feed(self):
+        """
+            Writes all captured feed items that haven't been written yet to the feed output file.
+        """
+        if self.feed_capture is None or self._feed_writer is None:
+            return
+        self.poll_performance_log()
+        for vi in self.feed_capture.drain():
+            self._feed_writer.write(vi)
+
+    @timed()
+    def _paused_flag(self):
+        flags = self._driver.execute_script("return window.sessionStorage.botflags")
+        return flags is not None and "paused" in flags.split(sep=',')
 
     def check_run_paused(self):
         """
             Checks sessionStorage.botflags for 'paused' flag, waits until flag is removed
         """
-        paused = True
-        log_msg = False
-        while paused:
-            time.sleep(0.25)
-            flags = self._driver.execute_script("return window.sessionStorage.botflags")
-            if flags is not None:
-                flags = flags.split(sep=',')
-                paused = ("paused" in flags)
-                if paused and not log_msg: 
-                    # Just to check if the run was actually paused
-                    log_msg = True
-                    print("Run paused.")
-                    self.logger.info("Run paused.")
-            else:
+        if not self._paused_flag():
+            return
+        self.flush_output()
+        print("Run paused.")
+        self.logger.info("Run paused.")
+        while True:
+            # The page itself waits for the flag to disappear, so nothing is polled over WebDriver
+            try:
+                self._driver.execute_async_script(WAIT_UNPAUSED_SCRIPT)
                 break
-        if log_msg:
-            print("Run unpaused.")
-            self.logger.info("Run unpaused.")
+            except TimeoutException:
+                continue
+            except WebDriverException:
+                # The script was discarded (e.g. the page reloaded or navigated): check the flag again
+                if not self._paused_flag():
+                    break
+                sleep(1)
+        print("Run unpaused.")
+        self.logger.info("Run unpaused.")
 
-    def _browse(self, base_url, first_xpath, n, **kwargs):
+    @timed()
+    def probe_page_state(self):
+        """
+            Returns dict of anomaly flags for the current page (single script call):
+            paused, captcha, content_warning, video_paused, stuck, cookie_banner, modal
         """
-            Starting from base_url, tries to open first video and browses n TikToks
+        try:
+            return self._driver.execute_script(PAGE_STATE_SCRIPT, self.selectors.paths("content_warning_btn")) or dict()
+        except Exception as e:
+            self.logger.error("Error while probing page state.", exc_info=True)
+            return dict()
+
+    @timed()
+    def handle_page_state(self):
+        """
+            Probes the page once, and only runs the handlers for the anomalies that are present.
+            Returns the probed state.
+        """
+        state = self.probe_page_state()
+        if state.get("paused"):
+            self.check_run_paused()
+        if state.get("captcha"):
+            self.pause_for_captcha()
+        if state.get("cookie_banner"):
+            self.close_cookie_banner()
+        if state.get("modal"):
+            self.close_modal_overlay()
+        if state.get("content_warning"):
+            self.dismiss_content_warning()
+        if state.get("stuck"):
+            self.unstuck_video()
+        elif state.get("video_paused"):
+            self.resume_video()
+        return state
+
+    def _browse(self, base_url, first_selector, n, **kwargs):
+        """
+            Starting from base_url, tries to open first video (selector name) and browses n TikToks
             Writes videodata to file for each video.
         """
         # Config
         max_watch_time = kwargs.get("max_watch_time", 6)
         to_skip = kwargs.get("to_skip", None)
+        kind = kwargs.get("kind", "browse")
 
         # Navigate to base page
         self._driver.get(base_url)
@@ -451,7 +1004,7 @@ class Bot:
 
         # Open first recommended video
         try:
-            first_rec = self._wait_el_by_xpath(first_xpath)
+            first_rec = self._wait_el(first_selector)
             if first_rec is not None:
                 first_rec.click()
             else:
@@ -464,16 +1017,11 @@ class Bot:
 
         # Run
         self.logger.info(f"Beginning run ({n} videos)")
-        run_ids = to_skip or set() # Video IDs encountered this run
-        i = 0
+        i, run_ids = self._begin_run(kind, base_url, n, to_skip) # Video IDs encountered this run (and previous attempts)
         while i < n:
             try:
-                self.check_run_paused()  # Check if run suspended
-                self.pause_for_captcha() # Pauses run if captcha popup opened
-                self.unstuck_video()
-                self.dismiss_content_warning() # Dismisses any 'disturbing content' warning
-                # TODO:
-                # - Add check to unpause videos that got paused automatically
+                # Handles pauses, captchas, content warnings, stuck/paused videos, banners & overlays
+                self.handle_page_state()
 
                 # Collect statistics about this video
                 random_wait(0.1)
@@ -486,6 +1034,7 @@ class Bot:
                     s = self._driver.current_url + ": " + str(v_d.creator) + " / " + str(v_d.desc) + "\n"
                     s += str(v_d.tags) + " / " + str(v_d.duration) + "s." 
                     self.logger.info("Invalid VideoInfo: %s", s)
+                    self._retry("collect_open_video_info")
                     continue
 
                 # Skip already seen videos
@@ -496,7 +1045,7 @@ class Bot:
                     if (i+1) % 5 == 0: print(f"Watching video {i+1}/{n}")
                     i += 1
                     run_ids.add(v_d.vid)
-                    self.write_vidinfo(v_d, header=(i==1))
+                    self.write_vidinfo(v_d)
                     # Watch a little more than half of the video
                     random_wait(min(v_d.duration*0.55, max_watch_time), sdev=0.25, min_t=(max_watch_time/1.5))
 
@@ -507,28 +1056,167 @@ class Bot:
                 break
 
             # Move on
-            if not self.next_video():
+            self.write_captured_feed()
+            nav = self.next_video()
+            if not nav:
                 # Could not continue, abort the run
-                self.logger.warning("Could not continue to next video, aborting run.")
+                self.logger.warning("Could not continue to next video (%s), aborting run.", nav.status)
+                self._end_run(completed=False)
                 return
             random_wait(0.5, sdev=0.1, min_t=0.15)
+            self._lap(f"loop:{kind}")
 
+        self.write_captured_feed()
+        self._end_run(completed=(i >= n))
         self.logger.info("Finished run.")
+        self.log_run_stats()
+
+    ### Harvest mode ###
+    @timed()
+    def _harvest_grid_urls(self, n, to_skip, exclude=(), max_scrolls=50):
+        """
+            Scrolls the open tag/creator grid, collecting video links in bulk (one script call per scroll).
+            Returns list of (video ID, URL) in grid order, excluding IDs in to_skip or exclude; stops once n
+            are found or the grid stops growing.
+        """
+        urls, seen = list(), set()
+        idle = 0
+        for _ in range(max_scrolls):
+            new = 0
+            for href in self._driver.execute_script(GRID_LINKS_SCRIPT) or list():
+                m = re.search(r"/video/(\d+)", href)
+                if m is None or m.group(1) in seen:
+                    continue
+                seen.add(m.group(1))
+                new += 1
+                if m.group(1) not in to_skip and m.group(1) not in exclude:
+                    urls.append((m.group(1), href))
+            if len(urls) >= n:
+                break
+            idle = 0 if new else idle + 1
+            if idle >= 3:
+                break # Grid didn't grow after several scrolls
+            random_wait(1.0, sdev=0.2, min_t=0.5) # Let the grid load more items
+        return urls
+
+    def _fetch_in_tabs(self, urls, tabs):
+        """
+            Generator: loads the (video ID, URL) pairs in up to tabs browser tabs and yields (video ID, VideoInfo or None).
+            Navigation is started without waiting, so the other tabs keep loading while one is being read.
+        """
+        driver = self._driver
+        main = driver.current_window_handle
+        handles = [main]
+        pending = deque(urls)
+        loading = dict() # window handle -> video ID
+
+        def load(h):
+            if not pending:
+                return
+            vid, url = pending.popleft()
+            driver.switch_to.window(h)
+            driver.execute_script("window.location.href = arguments[0];", url)
+            loading[h] = vid
+
+        try:
+            for _ in range(min(tabs, len(urls)) - 1):
+                driver.switch_to.new_window('tab')
+                handles.append(driver.current_window_handle)
+                if self.resource_policy is not None:
+                    # Blocked URLs & throttling are set per tab
+                    from TikTokBot.resources import apply_policy
+                    apply_policy(driver, self.resource_policy)
+            for h in handles:
+                load(h)
+            while loading:
+                for h in handles:
+                    if h not in loading:
+                        continue
+                    vid = loading.pop(h)
+                    driver.switch_to.window(h)
+                    v_d = self._collect_video_info_script(time=10, vid=vid)
+                    if v_d is None:
+                        # Captcha, banner or content warning in the way?
+                        self.handle_page_state()
+                        v_d = self._collect_video_info_script(time=5, vid=vid)
+                    yield vid, v_d
+                    load(h)
+        finally:
+            for h in handles[1:]:
+                driver.switch_to.window(h)
+                driver.close()
+            driver.switch_to.window(main)
+
+    def _harvest(self, base_url, n, **kwargs):
+        """
+            Harvest mode: collects the video URLs of the grid at base_url in bulk, then reads the metadata
+            of n videos in parallel tabs. Videos aren't watched, so use this only when no watch signals are needed.
+            Collects harvest_margin more links than needed to replace failed fetches, and reloads the grid
+            for more (up to max_rounds grid loads) if the run still falls short.
+        """
+        # Config
+        to_skip = kwargs.get("to_skip", None)
+        kind = kwargs.get("kind", "grid")
+        tabs = kwargs.get("tabs", self.harvest_tabs)
+        max_rounds = kwargs.get("max_rounds", 3) # Grid loads (the first one & top-ups after failed fetches)
 
+        # Navigate to grid
+        self._driver.get(base_url)
+        random_wait(1.0)
+        self.close_cookie_banner()
+
+        self.logger.info(f"Beginning harvest ({n} videos)")
+        i, run_ids = self._begin_run(f"{kind}_harvest", base_url, n, to_skip)
+        tried = set() # Video IDs loaded this run (including failed ones)
+        for attempt in range(max_rounds):
+            if attempt > 0:
+                # Some fetches failed: reload the grid for more links
+                self.logger.info("Harvest short by %d videos, reloading grid.", n - i)
+                self._driver.get(base_url)
+                random_wait(1.0)
+            # Collect a margin of links, so failed fetches are replaced without going back to the grid
+            need = n - i
+            urls = self._harvest_grid_urls(need + int(math.ceil(need * self.harvest_margin)), run_ids, tried)
+            if len(urls) == 0:
+                if attempt == 0:
+                    self.logger.warning("No videos found in grid. Aborting run.")
+                break
+            tried.update(vid for vid, _ in urls)
+
+            fetch = self._fetch_in_tabs(urls, tabs)
+            try:
+                for vid, v_d in fetch:
+                    if v_d is None or not v_d.valid():
+                        self.logger.info("Could not collect VideoInfo for %s", vid)
+                        self._retry("harvest_video")
+                        continue
+                    if v_d.vid in run_ids:
+                        continue
+                    i += 1
+                    run_ids.add(v_d.vid)
+                    self.write_vidinfo(v_d)
+                    self._lap(f"harvest:{kind}")
+                    if i >= n:
+                        break
+            except Exception as e:
+                traceback.print_exc()
+                self.logger.error("Exception during harvest. Aborting.", exc_info=True)
+                break
+            finally:
+                fetch.close()
+            if i >= n:
+                break
+
+        self._end_run(completed=(i >= n))
+        self.logger.info(f"Finished harvest ({i}/{n} videos).")
+        self.log_run_stats()
+
+    @timed()
     def like_video(self, like=True):
         """
             Assuming a tiktok is being viewed, likes that tiktok.
         """                                 
-        like_btn_paths = ["/html/body/div[2]/div[2]/div[2]/div[1]/div[1]/div/div[2]/div[2]/button[1]",
-                          "/html/body/div[2]/div[2]/div[2]/div[2]/div[3]/div[2]/div[2]/div[2]/div[1]/div[1]/button[1]"
-                          "/html/body/div[2]/div[2]/div[3]/div[2]/div[2]/div[2]/div[1]/div[1]/button[1]",
-                          "/html/body/div[2]/div[2]/div[2]/div[1]/div[3]/div/div[1]/div[3]/button[1]"]
-                          
-        like_btn = None
-        for xpath in like_btn_paths:
-            like_btn = self._wait_el_by_xpath(xpath, verbose=False)
-            if like_btn is not None:
-                break
+        like_btn = self._wait_el("like_btn", verbose=False)
         """
         # Old method
         like_btn = self._wait_el_by_xpath("/html/body/div[2]/div[2]/div[3]/div[2]/div[2]/div[2]/div[1]/div[1]/button[1]", verbose=False)
@@ -556,13 +1244,12 @@ class Bot:
         if like != liked:
             like_btn.click()
 
+    @timed()
     def follow_video(self, follow=True):
         """
             Assuming a tiktok is being viewed, follows the creator.
         """
-        follow_btn_paths = ["/html/body/div[2]/div[2]/div[2]/div[2]/div[3]/div[2]/div[1]/button",
-                            "/html/body/div[2]/div[2]/div[3]/div[2]/div[1]/button"]
-        follow_btn = self._wait_el_by_xpaths(follow_btn_paths)
+        follow_btn = self._wait_el("follow_btn")
         if follow_btn is None:
             # Fallback: look for a button with some 'StyledFollowButton' class
             follow_btn = WebDriverWait(self._driver, 3).until(EC.presence_of_element_located((By.CSS_SELECTOR, '[class~="StyledFollowButton"]')))
@@ -574,6 +1261,7 @@ class Bot:
         if follow != following:
             follow_btn.click()
 
+    @timed()
     def execute_search(self, query):
         """
             Executes a search query.
@@ -768,6 +1456,7 @@ class Bot:
     def login_tiktok(self):
         """
             Logs into Tiktok. Only works if credentials have been set.
+            With a session cache, a still valid cached session is reused instead (see enable_session_cache).
         """
         creds = None
         try:
@@ -776,15 +1465,19 @@ class Bot:
             self.logger.error("Could not log in: no credentials set.")
             raise Exception("No credentials set for bot.")
 
+        if self.session_cache is not None and (self.logged_in or self.restore_session()):
+            self.logger.info("Session still valid, skipping login.")
+            return
+
         # Go to TikTok
-        self._driver.get("http://tiktok.com")
+        self._driver.get(self.base_url)
         random_wait(3)
 
         self.close_modal_overlay()
         self.close_cookie_banner()
 
         # Open the login popup
-        login_btn = self._wait_el_by_xpath("/html/body/div[2]/div[1]/div/div[2]/button")
+        login_btn = self._wait_el("login_btn")
         if login_btn is None:
             self.logger.warn("Login button not found. Can't log in.")
             return
@@ -798,6 +1491,14 @@ class Bot:
         elif creds["platform"] == "Facebook":
             self._login_via_facebook(creds)
 
+        # Snapshot the fresh session for the next start
+        if self.session_cache is not None:
+            self._driver.get(self.base_url)
+            if self.session_valid():
+                self.save_session()
+            else:
+                self.logger.warning("Login did not result in a valid session; not caching it.")
+
     def anon_run(self, n=10, to_skip=None):
         """
             Browses top n posts on the FYP/home page
@@ -809,30 +1510,38 @@ class Bot:
         # Config
         max_watch_time = 6 # in seconds
 
-        self._browse(base_url="http://tiktok.com", first_xpath="/html/body/div[2]/div[2]/div[2]/div[1]/div[1]/div/div[2]/div[1]/div",
-                     n=n, to_skip=to_skip, max_watch_time=max_watch_time)
+        self._browse(base_url=self.base_url, first_selector="first_fyp",
+                     n=n, to_skip=to_skip, max_watch_time=max_watch_time, kind="anon")
         
-    def browse_tag(self, tag, n=10, to_skip=None):
+    def browse_tag(self, tag, n=10, to_skip=None, harvest=False):
         """
             Browses the top n videos of the given tag
+            With harvest=True, collects metadata from the grid & parallel tabs instead of watching (see _harvest)
         """
         # Config
         max_watch_time = 6 # in seconds
-        tag_url = f"http://tiktok.com/tag/{tag}"
+        tag_url = f"{self.base_url}/tag/{tag}"
 
         # Data collection
-        self._browse(base_url=tag_url, first_xpath="/html/body/div[2]/div[2]/div[2]/div/div[2]/div/div[1]/div[1]/div/div/a",
-                     n=n, to_skip=to_skip, max_watch_time=max_watch_time)
+        if harvest:
+            self._harvest(tag_url, n, to_skip=to_skip, kind="tag")
+            return
+        self._browse(base_url=tag_url, first_selector="first_tag",
+                     n=n, to_skip=to_skip, max_watch_time=max_watch_time, kind="tag")
 
-    def browse_creator(self, creator, n=10, to_skip=None):
+    def browse_creator(self, creator, n=10, to_skip=None, harvest=False):
         """
             Browses n most recent videos of the given creator
+            With harvest=True, collects metadata from the grid & parallel tabs instead of watching (see _harvest)
         """
         # Config
         max_watch_time = 6 # in seconds
-        user_url = f"http://tiktok.com/@{creator}"
+        user_url = f"{self.base_url}/@{creator}"
 
         # Data collection
-        self._browse(base_url=user_url, first_xpath="/html/body/div[2]/div[2]/div[2]/div/div[2]/div[2]/div/div[1]/div[1]/div/div/a",
-                     n=n, to_skip=to_skip, max_watch_time=max_watch_time)
+        if harvest:
+            self._harvest(user_url, n, to_skip=to_skip, kind="creator")
+            return
+        self._browse(base_url=user_url, first_selector="first_creator",
+                     n=n, to_skip=to_skip, max_watch_time=max_watch_time, kind="creator")
 
@@ -0,0 +1,82 @@
+"""
+    Crash-safe checkpoint journal for browse runs.
+    Stored as <output file>.ckpt and updated every time the output is flushed, so it always
+    describes what is actually on disk. A restarted run with the same kind & target resumes from it.
+"""
+import json, os
+
+
+class Checkpoint:
+
+    def __init__(self, path, kind, target, n, output):
+        self.path = path
+        self.kind = kind       # e.g. "fyp", "tag", "creator"
+        self.target = target   # e.g. base URL of the run
+        self.n = n             # Requested number of videos
+        self.output = output   # Output file this run writes to
+        self.ids = list()      # Video IDs written this run, in order
+        self.flushed = 0       # Number of ids that are on disk
+        self.offset = 0        # Size of the output file after the last flush
+
+    @classmethod
+    def load(cls, path):
+        """
+            Returns the checkpoint stored at path, or None if there isn't a (valid) one.
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                d = json.load(f)
+        except (ValueError, OSError):
+            return None
+        ckpt = cls(path, d["kind"], d["target"], d["n"], d["output"])
+        ckpt.ids = list(d["seen"])
+        ckpt.flushed = d["written"]
+        ckpt.offset = d["offset"]
+        return ckpt
+
+    def matches(self, kind, target, output):
+        return self.kind == kind and self.target == target and self.output == output
+
+    @property
+    def written(self):
+        return self.flushed
+
+    def seen(self):
+        """
+            Returns set of video IDs already written by this run.
+        """
+        return set(self.ids[:self.flushed])
+
+    def add(self, vid):
+        self.ids.append(vid)
+
+    def on_flush(self, fname, rows, offset):
+        """
+            Output flush callback: records the rows that reached the disk.
+        """
+        if fname != self.output:
+            return
+        self.flushed = min(self.flushed + rows, len(self.ids))
+        self.offset = offset
+        self.save()
+
+    def save(self):
+        """
+            Writes the journal atomically (write to temp file, then rename).
+        """
+        tmp = self.path + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump({"kind": self.kind, "target": self.target, "n": self.n, "output": self.output,
+                       "seen": self.ids[:self.flushed], "written": self.flushed, "offset": self.offset}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def finish(self):
+        """
+            Removes the journal once the run completed.
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,158 @@
+"""
+    Captures the JSON item lists the web app fetches (FYP, tags, creators, search)
+    from Chrome's performance log, and turns every delivered item into VideoInfo.
+    Requires the driver to be started with performance logging enabled
+    (see get_chrome_options(capture_feed=True)).
+"""
+from TikTokBot.bot import VideoInfo
+from collections import OrderedDict
+import json, logging, re
+
+
+# Endpoints which return batches of items
+FEED_URL_PATTERNS = re.compile(r"/api/(recommend/item_list|challenge/item_list|post/item_list|search/item/full|related/item_list)")
+
+
+### Parsing ###
+def item_tags(item):
+    """
+        Returns hashtags & mentions of an item, formatted like the DOM (#tag, @user).
+    """
+    tags = list()
+    for te in item.get("textExtra", None) or list():
+        if te.get("hashtagName"):
+            tags.append("#" + te["hashtagName"])
+        elif te.get("userUniqueId"):
+            tags.append("@" + te["userUniqueId"])
+    if len(tags) == 0:
+        # Older responses only list the challenges
+        tags = ["#" + c["title"] for c in item.get("challenges", None) or list() if c.get("title")]
+    return tags
+
+def item_desc(item, tags):
+    """
+        Returns the description without hashtags & mentions (the DOM shows those as separate links).
+    """
+    desc = item.get("desc", "") or ""
+    for t in tags:
+        desc = desc.replace(t, "", 1)
+    return " ".join(desc.split())
+
+def parse_item(item):
+    """
+        Converts a single item from an item list to VideoInfo.
+        Note: durations in the JSON are whole seconds, the DOM reports fractions.
+    """
+    author = item.get("author", None)
+    creator = author.get("uniqueId") if isinstance(author, dict) else author
+    tags = item_tags(item)
+    video = item.get("video", None) or dict()
+    duration = video.get("duration", None)
+
+    vi = VideoInfo(str(item.get("id")), creator, item_desc(item, tags), tags,
+                   float(duration) if duration is not None else None)
+
+    music = item.get("music", None)
+    if music:
+        vi.sound = f"{music.get('title', '')} - {music.get('authorName', '')}"
+    stats = item.get("stats", None) or dict()
+    vi.likes = stats.get("diggCount", None)
+    vi.comments = stats.get("commentCount", None)
+    return vi
+
+def parse_feed_response(body):
+    """
+        Returns list of VideoInfo for a (JSON string or dict) item list response.
+    """
+    if isinstance(body, str):
+        body = json.loads(body)
+    items = body.get("itemList", None) or body.get("data", None) or list()
+    # Search results wrap items
+    items = [i.get("item", i) for i in items]
+    return [parse_item(i) for i in items if i.get("id") is not None]
+
+
+### Capture ###
+def read_performance_log(driver):
+    """
+        Returns the DevTools messages logged since the last read (reading clears the log).
+    """
+    messages = list()
+    for entry in driver.get_log("performance"):
+        try:
+            messages.append(json.loads(entry["message"])["message"])
+        except (KeyError, ValueError):
+            continue
+    return messages
+
+class FeedCapture:
+    """
+        Collects VideoInfo for every item delivered to the browser.
+        Call poll() regularly (e.g. once per video) to process new responses.
+    """
+
+    def __init__(self, driver):
+        self._driver = driver
+        self.items = OrderedDict() # Video ID -> VideoInfo, in delivery order
+        self._pending = list()     # Video IDs not yet handed out by drain()
+        self._requests = set()     # Feed requests whose body hasn't finished loading yet
+        self.logger = logging.getLogger('Bot')
+
+    def _response_ids(self, messages):
+        """
+            Returns request IDs of feed responses that finished loading, given performance log messages.
+        """
+        req_ids = list()
+        for msg in messages:
+            method = msg.get("method")
+            params = msg.get("params", dict())
+            if method == "Network.responseReceived":
+                if FEED_URL_PATTERNS.search(params.get("response", dict()).get("url", "")):
+                    self._requests.add(params["requestId"])
+            elif method == "Network.loadingFinished" and params.get("requestId") in self._requests:
+                self._requests.discard(params["requestId"])
+                req_ids.append(params["requestId"])
+        return req_ids
+
+    def add_response(self, body):
+        """
+            Parses a response body and stores the new items. Returns number of new items.
+        """
+        new = 0
+        for vi in parse_feed_response(body):
+            if vi.vid not in self.items:
+                self.items[vi.vid] = vi
+                self._pending.append(vi.vid)
+                new += 1
+        return new
+
+    def poll(self, messages=None):
+        """
+            Processes all feed responses received since the last poll. Returns number of new items.
+            Pass messages if the performance log was already read (see read_performance_log).
+        """
+        if messages is None:
+            messages = read_performance_log(self._driver)
+        new = 0
+        for req_id in self._response_ids(messages):
+            try:
+                res = self._driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": req_id})
+                new += self.add_response(res["body"])
+            except Exception as e:
+                # Body might have been evicted already
+                self.logger.info("Could not read feed response %s", req_id)
+        return new
+
+    def get(self, vid):
+        """
+            Returns captured VideoInfo for the given ID (or None).
+        """
+        return self.items.get(vid, None)
+
+    def drain(self):
+        """
+            Returns captured VideoInfo not yet returned by a previous drain().
+        """
+        drained = [self.items[v] for v in self._pending]
+        self._pending = list()
+        return drained
@@ -0,0 +1,169 @@
+"""
+    Sparse video x feature matrices (tags, creators, sounds, video IDs) for the feed metrics.
+    Feature values are interned into a stable vocabulary: rebuilding with more data only appends new values,
+    so column indices of existing values don't change. Matrices built for a data folder are cached next to
+    the data (feedmatrix.npz) and rebuilt when the source files change.
+    Requires SciPy (imported on first use).
+"""
+from itertools import chain
+import TikTokBot.preprocessing as preproc
+import pandas as pd
+import numpy as np
+import json, os
+
+
+FEATURES = ("v_id", "creator", "sound", "tags")
+CACHE_FILE = "feedmatrix.npz"
+
+
+### Private functionality ###
+
+def _intern(values, vocab=None):
+    """
+        Returns (rows, codes, vocab) for a Series of feature values: the row position & vocabulary index of every
+        value, and the vocabulary (the given one, extended with new values in order of appearance).
+        List-valued features (e.g. tags) get one entry per item; missing values are dropped.
+    """
+    values = values.reset_index(drop=True).dropna()
+    first = values.iloc[0] if len(values) else None
+    if isinstance(first, (list, tuple, set, np.ndarray)):
+        lengths = np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+        flat = np.fromiter(chain.from_iterable(values), dtype=object, count=lengths.sum())
+        rows = np.repeat(values.index.to_numpy(), lengths)
+    else:
+        flat, rows = values.to_numpy(dtype=object), values.index.to_numpy()
+
+    # Intern locally, then map the (few) distinct values onto the vocabulary
+    codes, uniques = pd.factorize(flat)
+    uniques = np.asarray(uniques, dtype=object).astype(str).astype(object)
+    vocab = pd.Index(vocab if vocab is not None else list(), dtype=object)
+    ix = vocab.get_indexer(uniques)
+    if (ix < 0).any():
+        vocab = vocab.append(pd.Index(pd.unique(uniques[ix < 0]), dtype=object))
+        ix = vocab.get_indexer(uniques)
+    codes = ix[codes]
+    return rows, codes, vocab
+
+def _manifest(files):
+    return [[os.path.basename(f), os.path.getmtime(f), os.path.getsize(f)] for f in files]
+
+
+### Public functionality ###
+
+class FeedMatrix:
+    """
+        CSR matrices (videos x vocabulary) per feature; entries count the occurrences of a value in a video.
+        Rows follow the order of the DataFrame the matrix was built from (see v_ids).
+    """
+
+    def __init__(self, v_ids, matrices, vocabs, manifest=None):
+        self.v_ids = np.asarray(v_ids)
+        self.matrices = matrices # feature -> scipy.sparse.csr_matrix
+        self.vocabs = vocabs     # feature -> pd.Index of (str) values
+        self.manifest = manifest # Source files the matrix was built from (name, mtime, size)
+
+    def __len__(self):
+        return len(self.v_ids)
+
+    @property
+    def features(self):
+        return list(self.matrices)
+
+    @classmethod
+    def from_frame(cls, df, features=FEATURES, vocabs=None):
+        """
+            Builds the matrices for a preprocessed VideoInfo DataFrame (see preprocessing.prep_vidinfo).
+            vocabs (feature -> values) are extended rather than replaced, so matrices built with the vocabs of
+            another FeedMatrix share its column indices.
+        """
+        from scipy import sparse
+        vocabs = vocabs or dict()
+        matrices, new_vocabs = dict(), dict()
+        for feature in features:
+            if feature not in df:
+                continue
+            rows, codes, vocab = _intern(df[feature], vocabs.get(feature))
+            matrices[feature] = sparse.csr_matrix((np.ones(len(codes), dtype=np.int32), (rows, codes)),
+                                                  shape=(len(df), len(vocab)))
+            new_vocabs[feature] = vocab
+        v_ids = df["v_id"] if "v_id" in df else pd.Series(np.arange(len(df)))
+        return cls(v_ids.astype(str).to_numpy(), matrices, new_vocabs)
+
+    @classmethod
+    def for_folder(cls, folder, features=FEATURES, cache_file=None):
+        """
+            Returns the FeedMatrix of all data in folder (see preprocessing.load_folder), from the cache file
+            (default <folder>/feedmatrix.npz) unless the source files changed since it was written.
+        """
+        cache_file = cache_file or os.path.join(str(folder), CACHE_FILE)
+        files = preproc.folder_files(folder)
+        manifest = _manifest(files)
+        cached = cls.load(cache_file) if os.path.exists(cache_file) else None
+        if cached is not None and cached.manifest == manifest and set(features) <= set(cached.features):
+            return cached
+
+        # (Re)build, keeping the cached vocabulary so column indices stay stable
+        df = preproc.prep_vidinfo(preproc.load_folder(folder))
+        fm = cls.from_frame(df, features, vocabs=cached.vocabs if cached is not None else None)
+        fm.manifest = manifest
+        fm.save(cache_file)
+        return fm
+
+    def matrix(self, feature, binary=False):
+        """
+            Returns the CSR matrix of feature; binary: 1 if the value occurs in the video (ignoring repeats).
+        """
+        m = self.matrices[feature]
+        if binary:
+            m = m.copy()
+            m.data = np.ones_like(m.data)
+        return m
+
+    def columns(self, feature, values):
+        """
+            Returns array of column indices of the given values (values not in the vocabulary are left out).
+        """
+        ix = self.vocabs[feature].get_indexer([str(v) for v in values])
+        return ix[ix >= 0]
+
+    def present(self, feature):
+        """
+            Returns boolean array (per vocabulary value) of the values that occur in this feed.
+        """
+        return self.matrices[feature].getnnz(axis=0) > 0
+
+    def subset(self, rows):
+        """
+            Returns FeedMatrix with only the given rows (positions or boolean mask), sharing the vocabulary.
+        """
+        rows = np.asarray(rows)
+        return FeedMatrix(self.v_ids[rows], {f: m[rows] for f, m in self.matrices.items()}, self.vocabs, self.manifest)
+
+    def save(self, path):
+        """
+            Writes the matrices, vocabularies & source manifest to path (.npz, written atomically).
+        """
+        arrays = {"v_ids": self.v_ids.astype(str), "manifest": np.array(json.dumps(self.manifest))}
+        for f, m in self.matrices.items():
+            arrays.update({f"{f}.data": m.data, f"{f}.indices": m.indices, f"{f}.indptr": m.indptr,
+                           f"{f}.shape": np.array(m.shape), f"{f}.vocab": np.array(list(self.vocabs[f]), dtype=str)})
+        tmp = path + ".tmp"
+        with open(tmp, 'wb') as fh:
+            np.savez_compressed(fh, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+            Returns the FeedMatrix stored at path, or None if it can't be read.
+        """
+        from scipy import sparse
+        try:
+            with np.load(path, allow_pickle=False) as npz:
+                features = [k[:-len(".vocab")] for k in npz.files if k.endswith(".vocab")]
+                matrices = {f: sparse.csr_matrix((npz[f"{f}.data"], npz[f"{f}.indices"], npz[f"{f}.indptr"]),
+                                                 shape=tuple(npz[f"{f}.shape"])) for f in features}
+                vocabs = {f: pd.Index(npz[f"{f}.vocab"].astype(object), dtype=object) for f in features}
+                return cls(npz["v_ids"], matrices, vocabs, json.loads(str(npz["manifest"])))
+        except (OSError, ValueError, KeyError):
+            return None
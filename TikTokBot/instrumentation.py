@@ -0,0 +1,182 @@
+"""
+    Opt-in latency instrumentation for bot primitives & browse loops.
+    Records per-step latency histograms, timeouts, retries and time spent in intentional waits (utils.sleep)
+    vs overhead. Every run gets a JSON-lines metrics file (one event per line) ending with a summary event.
+"""
+from TikTokBot.utils import waited
+import json, os, time, datetime, functools
+
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket holds everything slower
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+
+def timed(step=None, timeout_if=None):
+    """
+        Decorator for Bot methods: records the call's latency under step (default: method name)
+        if the bot has instrumentation enabled. timeout_if(result) marks results that count as timeouts.
+    """
+    def decorator(f):
+        name = step or f.__name__
+        @functools.wraps(f)
+        def wrapper(self, *args, **kwargs):
+            inst = self.instrumentation
+            if inst is None:
+                return f(self, *args, **kwargs)
+            t0, w0 = time.perf_counter(), waited()
+            try:
+                res = f(self, *args, **kwargs)
+            except Exception:
+                inst.record(name, time.perf_counter() - t0, waited() - w0, error=True)
+                raise
+            inst.record(name, time.perf_counter() - t0, waited() - w0,
+                        timeout=(timeout_if is not None and timeout_if(res)))
+            return res
+        return wrapper
+    return decorator
+
+def is_none(res):
+    return res is None
+
+def is_falsy(res):
+    return not res
+
+
+class StepStats:
+    """
+        Latency statistics of a single step.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0     # seconds
+        self.wait = 0.0      # seconds spent in intentional waits during the step
+        self.timeouts = 0
+        self.retries = 0
+        self.errors = 0
+        self.hist = [0] * (len(BUCKETS_MS) + 1)
+        self.durations = list()
+
+    def add(self, dt, wait, timeout=False, error=False):
+        self.calls += 1
+        self.total += dt
+        self.wait += wait
+        self.timeouts += int(timeout)
+        self.errors += int(error)
+        ms = dt * 1000
+        ix = next((i for i, b in enumerate(BUCKETS_MS) if ms <= b), len(BUCKETS_MS))
+        self.hist[ix] += 1
+        self.durations.append(dt)
+
+    def percentile(self, q):
+        if not self.durations:
+            return 0.0
+        d = sorted(self.durations)
+        return d[min(len(d) - 1, int(q * len(d)))]
+
+    def to_dict(self):
+        return {"calls": self.calls, "total_s": self.total, "wait_s": self.wait, "overhead_s": self.total - self.wait,
+                "mean_ms": self.total / self.calls * 1000 if self.calls else 0.0,
+                "p50_ms": self.percentile(0.5) * 1000, "p95_ms": self.percentile(0.95) * 1000,
+                "max_ms": max(self.durations, default=0.0) * 1000,
+                "timeouts": self.timeouts, "retries": self.retries, "errors": self.errors,
+                "hist": self.hist}
+
+
+class Instrumentation:
+    """
+        Collects step metrics for a bot. Runs (start_run/end_run) are written to
+        <metrics_dir>/<prefix>_<kind>_<timestamp>.jsonl
+    """
+
+    def __init__(self, metrics_dir="./metrics", prefix="bot"):
+        self.metrics_dir = metrics_dir
+        self.prefix = prefix
+        self.steps = dict()
+        self.run = None
+        self.path = None
+        self._f = None
+        self._t0 = self._w0 = 0.0
+        self._lap = None
+
+    def _emit(self, event):
+        if self._f is not None:
+            self._f.write(json.dumps(event) + "\n")
+
+    def start_run(self, kind, target, n=None):
+        """
+            Resets the step metrics & opens the metrics file for a new run.
+        """
+        if self._f is not None:
+            self.end_run(completed=False)
+        self.steps = dict()
+        self.run = {"kind": kind, "target": target, "n": n}
+        os.makedirs(self.metrics_dir, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.path = os.path.join(self.metrics_dir, f"{self.prefix}_{kind}_{stamp}.jsonl")
+        self._f = open(self.path, 'w', encoding="utf-8")
+        self._t0, self._w0 = time.perf_counter(), waited()
+        self._lap = (self._t0, self._w0)
+        self._emit({"event": "run_start", "time": datetime.datetime.now().isoformat(), **self.run})
+
+    def _step(self, step):
+        if step not in self.steps:
+            self.steps[step] = StepStats()
+        return self.steps[step]
+
+    def record(self, step, dt, wait=0.0, timeout=False, error=False):
+        self._step(step).add(dt, wait, timeout, error)
+        if self._f is not None:
+            self._emit({"event": "step", "step": step, "t": time.perf_counter() - self._t0,
+                        "dt": dt, "wait": wait, "timeout": timeout, "error": error})
+
+    def retry(self, step):
+        self._step(step).retries += 1
+        self._emit({"event": "retry", "step": step, "t": time.perf_counter() - self._t0})
+
+    def lap(self, step):
+        """
+            Records the time since the previous lap (or the start of the run) as step, e.g. one browse loop iteration.
+        """
+        if self._lap is None:
+            return
+        t, w = time.perf_counter(), waited()
+        self.record(step, t - self._lap[0], w - self._lap[1])
+        self._lap = (t, w)
+
+    def summary(self):
+        """
+            Returns dict with run totals & per-step statistics.
+        """
+        total = time.perf_counter() - self._t0 if self.run is not None else 0.0
+        wait = waited() - self._w0 if self.run is not None else 0.0
+        return {**(self.run or dict()), "total_s": total, "wait_s": wait, "overhead_s": total - wait,
+                "buckets_ms": BUCKETS_MS, "steps": {k: s.to_dict() for k, s in self.steps.items()}}
+
+    def end_run(self, **info):
+        """
+            Writes the run summary & closes the metrics file. Returns the summary.
+        """
+        summary = {**self.summary(), **info}
+        self._emit({"event": "summary", **summary})
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+        self.run = None
+        self._lap = None
+        return summary
+
+
+def format_summary(summary):
+    """
+        Returns the summary as a table (slowest steps first).
+    """
+    lines = [f"{'step':<28}{'calls':>7}{'total s':>9}{'mean ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}"
+             f"{'wait s':>8}{'t/o':>5}{'retry':>6}{'err':>5}"]
+    steps = sorted(summary["steps"].items(), key=lambda kv: -kv[1]["total_s"])
+    for name, s in steps:
+        lines.append(f"{name:<28}{s['calls']:>7}{s['total_s']:>9.2f}{s['mean_ms']:>9.1f}{s['p50_ms']:>9.1f}"
+                     f"{s['p95_ms']:>9.1f}{s['max_ms']:>9.1f}{s['wait_s']:>8.2f}{s['timeouts']:>5}{s['retries']:>6}{s['errors']:>5}")
+    lines.append(f"Run {summary.get('kind')}: {summary['total_s']:.1f}s total, {summary['wait_s']:.1f}s intentional waits, "
+                 f"{summary['overhead_s']:.1f}s overhead")
+    return "\n".join(lines)
@@ -0,0 +1,149 @@
+"""
+    Central registry of the XPaths the bot uses to locate elements.
+    TikTok serves several layouts (e.g. div[2] vs div[3] variants), so every named element
+    has a list of alternatives. The registry remembers which variant matched last and
+    keeps hit/miss statistics, so layout drift shows up in the numbers.
+"""
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+
+
+# Named elements & their alternative XPaths (in default order of preference)
+SELECTORS = {
+    # Video page
+    "video": ["/html/body/div[2]/div[2]/div[3]/div[1]/div[2]/div[1]/div/video"],
+    "creator": ["/html/body/div[2]/div[2]/div[3]/div[2]/div[1]/a[2]/span[1]",
+                "/html/body/div[2]/div[2]/div[2]/div[2]/div[3]/div[2]/div[1]/a[2]/span[1]"],
+    "desc": ["/html/body/div[2]/div[2]/div[3]/div[2]/div[2]/div[1]/span[1]"],
+    "tags": ["/html/body/div[2]/div[2]/div[3]/div[2]/div[2]/div[1]",
+             "/html/body/div[2]/div[2]/div[2]/div[2]/div[3]/div[2]/div[2]/div[1]"],
+    "sound": ["/html/body/div[2]/div[2]/div[3]/div[2]/div[2]/h4/a"],
+    "likes": ["/html/body/div[2]/div[2]/div[2]/div[2]/div[3]/div[2]/div[2]/div[2]/div[1]/div[1]/button[1]/strong",
+              "/html/body/div[2]/div[2]/div[3]/div[2]/div[2]/div[2]/div[1]/div[1]/button[1]/strong"],
+    "comments": ["/html/body/div[2]/div[2]/div[3]/div[2]/div[2]/div[2]/div[1]/div[1]/button[2]/strong"],
+
+    # Video controls
+    "next_btn": ["/html/body/div[2]/div[2]/div[3]/div[1]/button[3]",
+                 "/html/body/div[2]/div[2]/div[2]/div[2]/div[3]/div[1]/button[3]"],
+    "prev_btn": ["/html/body/div[2]/div[2]/div[3]/div[1]/button[2]"],
+    "like_btn": ["/html/body/div[2]/div[2]/div[2]/div[1]/div[1]/div/div[2]/div[2]/button[1]",
+                 "/html/body/div[2]/div[2]/div[2]/div[2]/div[3]/div[2]/div[2]/div[2]/div[1]/div[1]/button[1]",
+                 "/html/body/div[2]/div[2]/div[3]/div[2]/div[2]/div[2]/div[1]/div[1]/button[1]",
+                 "/html/body/div[2]/div[2]/div[2]/div[1]/div[3]/div/div[1]/div[3]/button[1]"],
+    "follow_btn": ["/html/body/div[2]/div[2]/div[2]/div[2]/div[3]/div[2]/div[1]/button",
+                   "/html/body/div[2]/div[2]/div[3]/div[2]/div[1]/button"],
+    "content_warning_btn": ["/html/body/div[2]/div[2]/div[3]/div[1]/div[2]/div[5]/div/div[2]/button[2]"],
+    "unavailable_msg": ["/html/body/div[2]/div[2]/div[2]/div[1]/div/p[1]"],
+
+    # Entry points of runs
+    "first_fyp": ["/html/body/div[2]/div[2]/div[2]/div[1]/div[1]/div/div[2]/div[1]/div"],
+    "first_tag": ["/html/body/div[2]/div[2]/div[2]/div/div[2]/div/div[1]/div[1]/div/div/a"],
+    "first_creator": ["/html/body/div[2]/div[2]/div[2]/div/div[2]/div[2]/div/div[1]/div[1]/div/div/a"],
+    "first_search": ["/html/body/div[2]/div[2]/div[2]/div[2]/div[1]/div/div[2]/div[1]/div/div/a",
+                     "/html/body/div[2]/div[2]/div[2]/div[2]/div[1]/div/div[3]/div[1]/div/div/a",
+                     "/html/body/div[2]/div[2]/div[2]/div[2]/div[1]/div/div[3]"],
+
+    # Login
+    "login_btn": ["/html/body/div[2]/div[1]/div/div[2]/button"],
+}
+
+# Probes all alternatives in one call. Returns [index, element] for the first match, or null.
+# Arguments: list of XPaths, bool requiring the element to be clickable (visible & enabled).
+PROBE_SCRIPT = """
+const paths = arguments[0];
+const clickable = arguments[1];
+for (let i = 0; i < paths.length; i++) {
+    const el = document.evaluate(paths[i], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    if (el && (!clickable || (el.offsetParent !== null && !el.disabled))) return [i, el];
+}
+return null;
+"""
+
+
+def probe_xpaths(driver, paths, time=5, clickable=False):
+    """
+        Waits until any of the given XPaths matches, probing all of them in a single script call per poll.
+        Returns (index of matching path, element), or (None, None) on timeout.
+    """
+    try:
+        ix, el = WebDriverWait(driver, time).until(lambda d: d.execute_script(PROBE_SCRIPT, paths, clickable))
+        return ix, el
+    except TimeoutException:
+        return None, None
+
+
+class SelectorRegistry:
+    """
+        Per-session view on SELECTORS which orders alternatives by the last variant that matched,
+        and tracks hits/misses per selector & variant.
+    """
+
+    def __init__(self, selectors=None):
+        selectors = selectors or SELECTORS
+        self._selectors = {name: list(paths) for name, paths in selectors.items()}
+        self._last_hit = dict() # name -> XPath that matched most recently
+        self._hits = dict()     # name -> {XPath: count}
+        self._misses = dict()   # name -> count
+
+    def names(self):
+        return list(self._selectors.keys())
+
+    def paths(self, name):
+        """
+            Returns the alternatives for a selector, with the last matching variant first.
+        """
+        paths = self._selectors[name]
+        last = self._last_hit.get(name, None)
+        if last is None or last == paths[0]:
+            return list(paths)
+        return [last] + [p for p in paths if p != last]
+
+    def all_paths(self):
+        """
+            Returns ordered alternatives for every selector (as a dict).
+        """
+        return {name: self.paths(name) for name in self._selectors}
+
+    def record_hit(self, name, path):
+        self._last_hit[name] = path
+        variants = self._hits.setdefault(name, dict())
+        variants[path] = variants.get(path, 0) + 1
+
+    def record_miss(self, name):
+        self._misses[name] = self._misses.get(name, 0) + 1
+
+    def find(self, driver, name, time=5, clickable=False):
+        """
+            Waits for the named element, probing all its alternatives at once.
+            Returns the element or None.
+        """
+        paths = self.paths(name)
+        ix, el = probe_xpaths(driver, paths, time, clickable)
+        if el is None:
+            self.record_miss(name)
+        else:
+            self.record_hit(name, paths[ix])
+        return el
+
+    def stats(self):
+        """
+            Returns {name: {"hits": int, "misses": int, "variants": {variant index: hits}}}
+            Variant indices refer to the default order in SELECTORS.
+        """
+        stats = dict()
+        for name, paths in self._selectors.items():
+            variants = self._hits.get(name, dict())
+            stats[name] = {
+                "hits": sum(variants.values()),
+                "misses": self._misses.get(name, 0),
+                "variants": {paths.index(p): c for p, c in variants.items()}
+            }
+        return stats
+
+    def log_stats(self, logger):
+        """
+            Logs hit/miss counts for every selector that was used.
+        """
+        for name, s in self.stats().items():
+            if s["hits"] or s["misses"]:
+                logger.info("Selector %s: %d hits, %d misses, variants %s", name, s["hits"], s["misses"], s["variants"])
@@ -1,52 +1,237 @@
 """
     Metrics for evaluating feed diversity.
-    Unless otherwise specified, feeds are passed using Pandas Dataframes containing VideoInfo.
+    Unless otherwise specified, feeds are passed using Pandas Dataframes containing VideoInfo (preprocessed,
+    see preprocessing.prep_vidinfo) or as a FeedMatrix. Metrics over many topics or feeds are computed as sparse
+    matrix operations on the latter (DataFrames are converted, which costs about as much as a single pass
+    over the feed: build a FeedMatrix once when evaluating the same feed repeatedly).
 """
 import pandas as pd
+import numpy as np
 from itertools import chain
+from TikTokBot.feedmatrix import FeedMatrix
+import TikTokBot.preprocessing as preproc
+from concurrent.futures import ProcessPoolExecutor
+import os, glob
+
+
+PARALLEL_MIN_NNZ = 2000000 # Feed x value entries above which feed_similarity uses worker processes by default
+
+
+def _as_matrix(feed, features, vocabs=None):
+    """
+        Returns feed as FeedMatrix (DataFrames are converted, with only the given features).
+    """
+    if isinstance(feed, FeedMatrix):
+        return feed
+    return FeedMatrix.from_frame(feed, features, vocabs=vocabs)
+
+def _list_valued(values):
+    """
+        Returns true if the (first non-missing) values of the Series are lists, e.g. tags.
+    """
+    if values.dtype != object or len(values) == 0:
+        return False
+    first = values.iloc[0]
+    if first is None or first is np.nan or (isinstance(first, float) and np.isnan(first)):
+        ix = values.first_valid_index()
+        if ix is None:
+            return False
+        first = values.loc[ix]
+    return isinstance(first, (list, tuple, set, np.ndarray))
+
+def _items(values):
+    """
+        Returns list of all items of a list-valued Series (e.g. tags), skipping missing values.
+    """
+    # Hashing the flattened items directly is faster than exploding them into a Series
+    try:
+        return list(chain.from_iterable(values))
+    except TypeError:
+        # Missing values (NaN) in between
+        return list(chain.from_iterable(values.dropna()))
+
+def _value_set(values):
+    """
+        Returns set of the distinct (non-missing) values; list-valued features are compared item by item.
+    """
+    if _list_valued(values):
+        return set(_items(values))
+    return set(values.dropna().unique())
 
 def jaccard_index(f1, f2, feature="v_id"):
     """
         Returns the Jaccard Index between two feeds.
+        FeedMatrix arguments need to share their vocabulary (e.g. subsets of the same FeedMatrix).
     """
     # Jaccard Index = overlap between two sets = (size of intersection / size of union)
-    f1_items = set(f1[feature])
-    f2_items = set(f2[feature])
-    return len(f1_items & f2_items) / len(f1_items | f2_items)
+    if not isinstance(f1, FeedMatrix) and not isinstance(f2, FeedMatrix):
+        # Two DataFrames: comparing the value sets directly is cheaper than building matrices for one pair
+        f1_items, f2_items = _value_set(f1[feature]), _value_set(f2[feature])
+        return len(f1_items & f2_items) / len(f1_items | f2_items)
+    if not isinstance(f1, FeedMatrix):
+        f1, f2 = f2, f1
+    f2 = _as_matrix(f2, [feature], vocabs=f1.vocabs) # Extends f1's vocabulary, so columns line up
+    a, b = f1.present(feature), f2.present(feature)
+    n = max(len(a), len(b))
+    a, b = np.pad(a, (0, n - len(a))), np.pad(b, (0, n - len(b)))
+    return (a & b).sum() / (a | b).sum()
 
 
-def feature_diversity(feed, feature="creator"):
+def feature_diversity(feed, features="creator"):
     """
-        Returns ratio of unique values of feature over total number of values.
+        Returns DataFrame (index: feature) with the ratio of unique values of each feature over its total number of values.
         1 = all values are unique (most diversity), ~0 = almost all values are repeated at least once
+        List-valued features (e.g. tags) are compared item by item.
+        DataFrames are evaluated directly (a single pass over the values); FeedMatrix feeds from their matrices.
+
+        Parameters:
+            features (str or list<str>): feature(s) to evaluate
     """
-    if not isinstance(f1[feature][0], list):
-        # Single valued feature (e.g. creator), ratio = unique / total
-        return len(feed[feature].unique()) / len(feed)
+    if isinstance(features, str):
+        features = [features]
+    if isinstance(feed, FeedMatrix):
+        rows = [(f, int(feed.present(f).sum()), int(feed.matrix(f).sum())) for f in features]
     else:
-        # Feature is a list, we need to look at the individual items in the lists
-        all_items = [i for l in feed[feature] for i in l]
-        return len(set(all_items)) / len(all_items)
+        rows = list()
+        for f in features:
+            values = feed[f]
+            if _list_valued(values):
+                items = _items(values)
+                rows.append((f, len(set(items)), len(items)))
+            else:
+                uniques = values.unique()
+                missing = pd.isna(uniques)
+                rows.append((f, int(len(uniques) - missing.sum()), values.count() if missing.any() else len(values)))
+    res = pd.DataFrame(rows, columns=["feature", "unique", "total"]).set_index("feature")
+    res["diversity"] = res["unique"] / res["total"]
+    return res
 
-def topic_presence(feed, topic_tags, threshold=1):
+def topic_presence(feed, topics, threshold=1):
     """
-        Ratio of how many posts belonging to a given topic are present in the feed.
+        Returns DataFrame (index: topic) with the ratio of posts in the feed that belong to each topic.
+        All topics are evaluated at once: (video x tag) @ (tag x topic) counts the relevant tags of every post.
 
         Parameters:
-            topic_tags (set<str>): tags that are considered indicative of the topic
-            threshold (int) : how many relevant tags a post needs in order to be counted as relevant
+            topics (dict<str, set<str>> or set<str>): topic name -> tags that are considered indicative of the topic
+                                                      (a single tag set is reported as topic 'topic')
+            threshold (int) : how many (distinct) relevant tags a post needs in order to be counted as relevant
     """
-    relevant_count = 0
-    for ix, post in feed.iterrows():
-        if len(topic_tags & set(post["tags"])) >= threshold:
-            relevant_count += 1
-    return relevant_count / len(feed)
+    from scipy import sparse
+    if not isinstance(topics, dict):
+        topics = {"topic": topics}
+    fm = _as_matrix(feed, ["tags"])
 
+    # Tag x topic indicator matrix
+    cols = [fm.columns("tags", tags) for tags in topics.values()]
+    indicator = sparse.csc_matrix((np.ones(sum(len(c) for c in cols), dtype=np.int32),
+                                   (np.concatenate(cols), np.repeat(np.arange(len(cols)), [len(c) for c in cols]))),
+                                  shape=(len(fm.vocabs["tags"]), len(topics)))
 
+    if threshold <= 0:
+        relevant = np.full(len(topics), len(fm))
+    else:
+        counts = (fm.matrix("tags", binary=True) @ indicator).tocsc()
+        counts.data = (counts.data >= threshold).astype(np.int32)
+        counts.eliminate_zeros()
+        relevant = counts.getnnz(axis=0)
+    res = pd.DataFrame({"relevant": relevant, "posts": len(fm)}, index=pd.Index(list(topics), name="topic"))
+    res["presence"] = res["relevant"] / len(fm)
+    return res
 
-if __name__ == "__main__":
-    import TikTokBot.preprocessing as preproc
 
+
+### Similarity between many feeds ###
+
+_gram_shared = None # Feed x value matrix of the worker process (see _init_gram_worker)
+
+def _init_gram_worker(presence):
+    global _gram_shared
+    _gram_shared = presence
+
+def _gram_block(rows):
+    lo, hi = rows
+    return (_gram_shared[lo:hi] @ _gram_shared.T).toarray()
+
+def _gram(presence, workers):
+    """
+        Returns presence @ presence.T as dense array, split by row blocks over worker processes if workers > 1.
+    """
+    if workers <= 1:
+        return (presence @ presence.T).toarray()
+    bounds = np.linspace(0, presence.shape[0], min(workers * 4, presence.shape[0]) + 1, dtype=int)
+    with ProcessPoolExecutor(workers, initializer=_init_gram_worker, initargs=(presence,)) as ex:
+        return np.vstack(list(ex.map(_gram_block, zip(bounds[:-1], bounds[1:]))))
+
+def load_feeds(paths):
+    """
+        Returns dict of feed label -> DataFrame with one feed per puppet & day (e.g. 'AV3_2022-06-08').
+        paths: CSV files, folders or glob patterns; folders with Parquet partitions are split by puppet & date.
+    """
+    feeds = dict()
+    for p in paths:
+        if os.path.isdir(p) and preproc.is_partition_root(p):
+            df = preproc.load_partitions(p)
+            for (puppet, date), feed in df.groupby(["puppet", "date"]):
+                feeds[f"{puppet}_{date}"] = feed.reset_index(drop=True)
+            continue
+        files = sorted(glob.glob(os.path.join(p, "*.csv"))) if os.path.isdir(p) else sorted(glob.glob(p))
+        for fname in files:
+            label = os.path.splitext(os.path.basename(fname))[0]
+            feeds[label[:-len("_out")] if label.endswith("_out") else label] = pd.read_csv(fname)
+    return feeds
+
+def feed_similarity(feeds, features="v_id", labels=None, workers=None):
+    """
+        Returns the Jaccard Index between all pairs of feeds, as a labelled (feed x feed) DataFrame.
+        For several features, the rows are indexed by (feature, feed): use res.loc[feature] for one square matrix.
+        Pairs of feeds that both have no values for a feature are NaN.
+
+        Parameters:
+            feeds: dict of feed label -> VideoInfo DataFrame (see load_feeds), or a FeedMatrix with labels
+            labels (array or pd.Categorical): feed label of every FeedMatrix row; pass a Categorical to include
+                                              feeds without rows (its categories)
+            workers (int): worker processes for the pairwise products (default: all cores for large inputs)
+    """
+    from scipy import sparse
+    if isinstance(features, str):
+        features = [features]
+
+    if isinstance(feeds, FeedMatrix):
+        fm = feeds
+        if not isinstance(labels, pd.Categorical):
+            labels = np.asarray(labels)
+            labels = pd.Categorical(labels, categories=pd.unique(labels))
+    else:
+        # Duplicates only count once per feed, but videos can occur in many feeds
+        frames = [preproc.prep_vidinfo(f) for f in feeds.values()]
+        labels = pd.Categorical(np.repeat(np.array(list(feeds), dtype=object), [len(f) for f in frames]),
+                                categories=list(feeds)) # Keeps feeds without rows
+        fm = FeedMatrix.from_frame(pd.concat(frames, ignore_index=True), features)
+    codes, names = labels.codes, labels.categories
+    rows = np.flatnonzero(codes >= 0) # Rows without a label (NaN) belong to no feed
+    grouping = sparse.csr_matrix((np.ones(len(rows), dtype=np.int32), (codes[rows], rows)),
+                                 shape=(len(names), len(codes)))
+
+    results = dict()
+    for feature in features:
+        # Feed x value presence, then all intersections at once
+        presence = (grouping @ fm.matrix(feature, binary=True)).tocsr()
+        presence.data = np.ones_like(presence.data)
+        n_workers = workers if workers is not None else (os.cpu_count() or 1) if presence.nnz >= PARALLEL_MIN_NNZ else 1
+        inter = _gram(presence, n_workers)
+        sizes = np.diag(inter)
+        union = sizes[:, None] + sizes[None, :] - inter
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sim = np.where(union > 0, inter / union, np.nan)
+        results[feature] = pd.DataFrame(sim, index=pd.Index(names, name="feed"), columns=pd.Index(names, name="feed"))
+
+    if len(features) == 1:
+        return results[features[0]]
+    return pd.concat(results, names=["feature", "feed"])
+
+
+
+if __name__ == "__main__":
     # Testing/Experimenting
     DATA_DIR = "./data/tags"
     f1 = pd.read_csv(DATA_DIR + "/antivax/nojab.csv")
@@ -55,4 +240,5 @@ if __name__ == "__main__":
     f2 = preproc.prep_vidinfo(f2)
 
     antivax_tags = set(["#nojab", "#antivax", "#antimask", "#nomask", "#novax", "#unvaccinated", "#naturalimmunity"])
-    print(topic_presence(f1, antivax_tags, threshold=2))
+    print(topic_presence(f1, {"antivax": antivax_tags}, threshold=2))
+    print(feature_diversity(f1, ["creator", "tags", "sound"]))
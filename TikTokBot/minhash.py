@@ -0,0 +1,262 @@
+"""
+    MinHash sketches of feeds (one per collected CSV, i.e. per puppet & day or per tag/creator crawl) and an LSH index,
+    for estimating the Jaccard Index between many feeds without comparing them pairwise.
+    The standard error of an estimate is about 1/sqrt(num_perm): pass error to pick num_perm.
+    Sketches are stored next to the data (<folder>/minhash_<feature>.npz) and only new/changed files are sketched
+    on update. The sketch of a union of feeds is the elementwise minimum of their sketches (merge_signatures).
+
+    Usage: python -m TikTokBot.minhash data/AV data/HS data/tags [--feature creator] [--query AV/AV3_2022-06-08]
+                                       [--top 5] [--error 0.05] [--threshold 0.3]
+"""
+import TikTokBot.preprocessing as preproc
+import pandas as pd
+import numpy as np
+import json, os, glob, math, argparse
+
+
+EMPTY = np.uint64(2**64 - 1) # Signature value of an empty feed
+CHUNK = 4096                 # Values hashed at once (bounds memory to num_perm x CHUNK)
+
+
+### Sketching ###
+
+def num_perm_for(error):
+    """
+        Returns the number of permutations for a standard error of the Jaccard estimate of about error.
+    """
+    return int(math.ceil(1 / error ** 2))
+
+def _seeds(num_perm, seed):
+    return np.random.default_rng(seed).integers(0, 2**63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+
+def _mix(x):
+    """
+        splitmix64 finalizer (uint64 arithmetic wraps around).
+    """
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xbf58476d1ce4e5b9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94d049bb133111eb)
+    return x ^ (x >> np.uint64(31))
+
+def signature(values, num_perm=128, seed=1):
+    """
+        Returns the MinHash signature (uint64 array of num_perm) of a set of values (compared as strings).
+    """
+    values = pd.unique(np.asarray([str(v) for v in values], dtype=object))
+    sig = np.full(num_perm, EMPTY, dtype=np.uint64)
+    if not len(values):
+        return sig
+    seeds = _seeds(num_perm, seed)
+    hashes = pd.util.hash_array(values)
+    with np.errstate(over="ignore"):
+        for i in range(0, len(hashes), CHUNK):
+            h = _mix(hashes[None, i:i + CHUNK] ^ seeds[:, None])
+            sig = np.minimum(sig, h.min(axis=1))
+    return sig
+
+def merge_signatures(sigs):
+    """
+        Returns the signature of the union of the sketched feeds.
+    """
+    return np.minimum.reduce(list(sigs))
+
+def estimate(sig1, sig2):
+    """
+        Returns the estimated Jaccard Index between two sketched feeds (NaN if both are empty).
+    """
+    if (sig1 == EMPTY).all() and (sig2 == EMPTY).all():
+        return float("nan")
+    return float(np.mean(sig1 == sig2))
+
+def feed_values(feed, feature):
+    """
+        Returns the values of feature in a (raw or preprocessed) VideoInfo DataFrame; tags are taken item by item.
+    """
+    values = feed[feature].dropna()
+    if feature == "tags":
+        return [t for tags in values.map(preproc.tags_normalize) for t in tags]
+    return values.tolist()
+
+
+### LSH ###
+
+def _band_params(num_perm, threshold, points=101):
+    """
+        Returns (bands, rows) minimizing the (equally weighted) false positive & negative probability mass
+        for the given similarity threshold.
+    """
+    s = np.linspace(0, 1, points)
+    best, best_err = (num_perm, 1), float("inf")
+    for b in range(1, num_perm + 1):
+        r = num_perm // b
+        p = 1 - (1 - s ** r) ** b # Probability of becoming a candidate at similarity s
+        err = np.mean(np.where(s < threshold, p, 0)) + np.mean(np.where(s >= threshold, 1 - p, 0))
+        if err < best_err:
+            best, best_err = (b, r), err
+    return best
+
+class LSHIndex:
+    """
+        Banded LSH over MinHash signatures: feeds sharing a band are candidates, which are ranked by estimate.
+        threshold is the similarity above which feeds should (most likely) become candidates.
+    """
+
+    def __init__(self, num_perm, threshold=0.3):
+        self.num_perm = num_perm
+        self.threshold = threshold
+        self.bands, self.rows = _band_params(num_perm, threshold)
+        self._buckets = [dict() for _ in range(self.bands)]
+        self._sigs = dict()
+
+    def __len__(self):
+        return len(self._sigs)
+
+    def __contains__(self, label):
+        return label in self._sigs
+
+    def _keys(self, sig):
+        return [sig[b * self.rows:(b + 1) * self.rows].tobytes() for b in range(self.bands)]
+
+    def add(self, label, sig):
+        if label in self._sigs:
+            self.remove(label)
+        self._sigs[label] = sig
+        for bucket, key in zip(self._buckets, self._keys(sig)):
+            bucket.setdefault(key, set()).add(label)
+
+    def remove(self, label):
+        sig = self._sigs.pop(label)
+        for bucket, key in zip(self._buckets, self._keys(sig)):
+            bucket[key].discard(label)
+            if not bucket[key]:
+                del bucket[key]
+
+    def candidates(self, sig):
+        """
+            Returns set of labels sharing at least one band with sig.
+        """
+        found = set()
+        for bucket, key in zip(self._buckets, self._keys(sig)):
+            found |= bucket.get(key, set())
+        return found
+
+    def query(self, sig, k=10, exclude=None):
+        """
+            Returns up to k (label, estimated Jaccard Index) of the most similar candidates, most similar first.
+        """
+        res = [(l, estimate(sig, self._sigs[l])) for l in self.candidates(sig) if l != exclude]
+        return sorted(res, key=lambda x: -x[1])[:k]
+
+    def similar(self, label, k=10):
+        """
+            Returns up to k (label, estimated Jaccard Index) of the feeds most similar to an indexed feed.
+        """
+        return self.query(self._sigs[label], k, exclude=label)
+
+    def estimate(self, label1, label2):
+        return estimate(self._sigs[label1], self._sigs[label2])
+
+
+### Storage ###
+
+class FeedSketches:
+    """
+        Signatures of all CSV files under a folder (label: path relative to the folder, without '_out.csv'),
+        stored in <folder>/minhash_<feature>.npz
+    """
+
+    def __init__(self, folder, feature="v_id", error=0.05, seed=1, cache_file=None):
+        self.folder = str(folder)
+        self.feature = feature
+        self.num_perm = num_perm_for(error)
+        self.seed = seed
+        self.cache_file = cache_file or os.path.join(self.folder, f"minhash_{feature}.npz")
+        self.signatures = dict() # label -> signature
+        self.manifest = dict()   # label -> [mtime, size] of the sketched file
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with np.load(self.cache_file, allow_pickle=False) as npz:
+                params = json.loads(str(npz["params"]))
+                if params != {"num_perm": self.num_perm, "seed": self.seed}:
+                    return # Sketched with other parameters: start over
+                labels = [str(l) for l in npz["labels"]]
+                self.signatures = dict(zip(labels, npz["signatures"]))
+                self.manifest = dict(zip(labels, json.loads(str(npz["manifest"]))))
+        except (OSError, ValueError, KeyError):
+            self.signatures, self.manifest = dict(), dict()
+
+    def _files(self):
+        files = glob.glob(os.path.join(self.folder, "**", "*.csv"), recursive=True)
+        labels = [os.path.relpath(f, self.folder)[:-len(".csv")] for f in files]
+        return {(l[:-len("_out")] if l.endswith("_out") else l): f for l, f in zip(labels, files)}
+
+    def update(self):
+        """
+            Sketches new & changed files, forgets deleted ones and saves the sketches if anything changed.
+            Returns number of files sketched.
+        """
+        files = self._files()
+        changed = False
+        for label in set(self.signatures) - set(files):
+            del self.signatures[label], self.manifest[label]
+            changed = True
+
+        sketched = 0
+        for label, fname in sorted(files.items()):
+            stat = [os.path.getmtime(fname), os.path.getsize(fname)]
+            if self.manifest.get(label) == stat:
+                continue
+            feed = pd.read_csv(fname)
+            values = feed_values(feed, self.feature) if self.feature in feed else list()
+            self.signatures[label] = signature(values, self.num_perm, self.seed)
+            self.manifest[label] = stat
+            sketched += 1
+        if sketched or changed:
+            self.save()
+        return sketched
+
+    def save(self):
+        labels = sorted(self.signatures)
+        sigs = np.array([self.signatures[l] for l in labels], dtype=np.uint64).reshape(len(labels), self.num_perm)
+        tmp = self.cache_file + ".tmp"
+        with open(tmp, 'wb') as f:
+            np.savez(f, labels=np.array(labels, dtype=str), signatures=sigs,
+                     manifest=np.array(json.dumps([self.manifest[l] for l in labels])),
+                     params=np.array(json.dumps({"num_perm": self.num_perm, "seed": self.seed})))
+        os.replace(tmp, self.cache_file)
+
+    def index(self, threshold=0.3, prefix="", lsh=None):
+        """
+            Returns an LSHIndex with all sketches (labels prefixed with prefix), or adds them to lsh.
+        """
+        if lsh is None:
+            lsh = LSHIndex(self.num_perm, threshold)
+        for label, sig in self.signatures.items():
+            lsh.add(prefix + label, sig)
+        return lsh
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sketch collected feeds and list the most similar ones.")
+    parser.add_argument("folders", nargs="+", help="Data folders (e.g. data/AV data/tags)")
+    parser.add_argument("--feature", default="v_id", choices=["v_id", "creator", "sound", "tags"])
+    parser.add_argument("--query", default=None, help="Feed to compare (e.g. AV/AV3_2022-06-08); default: all feeds")
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--error", type=float, default=0.05, help="Standard error of the Jaccard estimates")
+    parser.add_argument("--threshold", type=float, default=0.3, help="Similarity above which feeds should be found")
+    args = parser.parse_args()
+
+    lsh = None
+    for folder in args.folders:
+        sketches = FeedSketches(folder, args.feature, error=args.error)
+        n = sketches.update()
+        print(f"{folder}: {len(sketches.signatures)} feeds ({n} sketched)")
+        lsh = sketches.index(args.threshold, prefix=os.path.basename(os.path.normpath(folder)) + "/", lsh=lsh)
+
+    queries = [args.query] if args.query is not None else sorted(lsh._sigs)
+    for label in queries:
+        similar = ", ".join(f"{l} ({j:.2f})" for l, j in lsh.similar(label, args.top))
+        print(f"{label}: {similar or '-'}")
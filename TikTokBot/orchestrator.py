@@ -0,0 +1,287 @@
+"""
+    Runs an experiment round (several puppets) across worker processes.
+
+    An experiment plan is a JSON file:
+    {
+        "round": "round1",
+        "driver_path": "./drivers/chromedriver",
+        "creds_file": "./users/creds.json",
+        "data_dir": "./data",
+        "max_attempts": 3,
+        "puppets": [
+            {"id": "AV1", "type": 1, "user_dir": "./users",
+             "schedule": [{"action": "pre_run_routine", "k": 3},
+                          {"action": "browse_fyp", "n": 50, "interact": true},
+                          {"action": "browse_query", "n": 10}]},
+            ...
+        ]
+    }
+    "type" indexes PUPPET_TYPES (0 = Base, 1 = Passive, 2 = Casual, 3 = Active).
+
+    Every puppet becomes one job in a SQLite-backed queue. Worker processes (on this host, or on other
+    hosts that share the queue file) claim jobs, run the schedule with their own driver, and report back.
+    Failed jobs (including runs that were aborted) are retried until max_attempts. A retry skips the steps
+    that already finished and resumes the aborted step from its checkpoint, appending to the puppet's (daily)
+    output file.
+    Note that SQLite's locking relies on the file system, so a queue shared over a network drive needs one
+    that supports file locks.
+
+    Usage:
+        python -m TikTokBot.orchestrator plan.json [--queue queue.db] [--workers 6]
+        python -m TikTokBot.orchestrator --queue queue.db --workers 2   (only work on an existing queue)
+        python -m TikTokBot.orchestrator --queue queue.db --report
+"""
+from multiprocessing import Process
+from contextlib import contextmanager
+import sqlite3, json, time, socket, os, logging, traceback, argparse
+
+
+# Puppet methods that may be scheduled
+ACTIONS = ["pre_run_routine", "browse_fyp", "browse_query", "browse_tag", "browse_creator", "anon_run", "login_tiktok"]
+
+
+### Job queue ###
+class JobQueue:
+    """
+        SQLite-backed job queue. Safe to use from multiple processes (and hosts sharing the file).
+    """
+
+    def __init__(self, path="./queue.db", lease=3 * 3600):
+        self.path = path
+        self.lease = lease # Seconds after which a running job is assumed to belong to a dead worker
+        with self._connect() as con:
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    round TEXT, puppet_id TEXT, spec TEXT,
+                    status TEXT DEFAULT 'pending',
+                    attempts INTEGER DEFAULT 0, max_attempts INTEGER DEFAULT 3,
+                    worker TEXT, started REAL, finished REAL,
+                    videos INTEGER DEFAULT 0, error TEXT,
+                    steps_done INTEGER DEFAULT 0,
+                    UNIQUE(round, puppet_id)
+                )""")
+            try:
+                # Queues created before steps were tracked
+                con.execute("ALTER TABLE jobs ADD COLUMN steps_done INTEGER DEFAULT 0")
+            except sqlite3.OperationalError:
+                pass
+
+    @contextmanager
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        con.row_factory = sqlite3.Row
+        try:
+            yield con
+        finally:
+            con.close()
+
+    def enqueue_plan(self, plan):
+        """
+            Adds a job per puppet in the plan. Puppets already queued for this round are left alone.
+            Returns number of jobs added.
+        """
+        round_id = plan.get("round", time.strftime("%Y-%m-%d"))
+        shared = {k: v for k, v in plan.items() if k not in ("puppets", "round")}
+        added = 0
+        with self._connect() as con:
+            for p in plan["puppets"]:
+                for step in p.get("schedule", list()):
+                    if step["action"] not in ACTIONS:
+                        raise ValueError(f"Unknown action '{step['action']}' for puppet {p['id']}")
+                spec = dict(shared, **p)
+                cur = con.execute("INSERT OR IGNORE INTO jobs (round, puppet_id, spec, max_attempts) VALUES (?, ?, ?, ?)",
+                                  (round_id, p["id"], json.dumps(spec), plan.get("max_attempts", 3)))
+                added += cur.rowcount
+        return added
+
+    def claim(self, worker):
+        """
+            Atomically claims the next pending job (or an expired running one). Returns (job id, spec) or None.
+        """
+        with self._connect() as con:
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                row = con.execute("""
+                    SELECT id, spec FROM jobs
+                    WHERE status = 'pending' OR (status = 'running' AND started < ?)
+                    ORDER BY attempts, id LIMIT 1""", (time.time() - self.lease,)).fetchone()
+                if row is not None:
+                    con.execute("UPDATE jobs SET status = 'running', worker = ?, started = ?, attempts = attempts + 1 WHERE id = ?",
+                                (worker, time.time(), row["id"]))
+                con.execute("COMMIT")
+            except Exception:
+                con.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return row["id"], json.loads(row["spec"])
+
+    def steps_done(self, job_id):
+        """
+            Returns number of schedule steps of the job that finished (in earlier attempts).
+        """
+        with self._connect() as con:
+            return con.execute("SELECT steps_done FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+
+    def progress(self, job_id, steps_done):
+        """
+            Records that the first steps_done steps of the job's schedule finished.
+        """
+        with self._connect() as con:
+            con.execute("UPDATE jobs SET steps_done = ? WHERE id = ?", (steps_done, job_id))
+
+    def complete(self, job_id, videos):
+        """
+            Marks a job as done, adding the videos written by this attempt.
+        """
+        with self._connect() as con:
+            con.execute("UPDATE jobs SET status = 'done', finished = ?, videos = videos + ?, error = NULL WHERE id = ?",
+                        (time.time(), videos, job_id))
+
+    def fail(self, job_id, error, videos=0):
+        """
+            Marks a job as failed; it is requeued unless it ran out of attempts.
+            Videos written by the failed attempt are kept in the output, so they are counted as well.
+        """
+        with self._connect() as con:
+            con.execute("""
+                UPDATE jobs SET status = CASE WHEN attempts < max_attempts THEN 'pending' ELSE 'failed' END,
+                                finished = ?, error = ?, videos = videos + ?
+                WHERE id = ?""", (time.time(), error, videos, job_id))
+
+    def pending(self):
+        """
+            Returns number of jobs that still need to run (pending or running).
+        """
+        with self._connect() as con:
+            return con.execute("SELECT COUNT(*) FROM jobs WHERE status IN ('pending', 'running')").fetchone()[0]
+
+    def report(self):
+        """
+            Returns list of dicts with status & throughput (videos per hour) per job.
+        """
+        rows = list()
+        with self._connect() as con:
+            for r in con.execute("SELECT * FROM jobs ORDER BY round, puppet_id"):
+                hours = ((r["finished"] or time.time()) - r["started"]) / 3600 if r["started"] else 0
+                rows.append({"round": r["round"], "puppet": r["puppet_id"], "status": r["status"],
+                             "attempts": r["attempts"], "videos": r["videos"],
+                             "videos_per_hour": (r["videos"] / hours) if hours > 0 else 0.0,
+                             "worker": r["worker"], "error": r["error"]})
+        return rows
+
+
+### Workers ###
+def default_puppet_factory(spec):
+    """
+        Opens a browser & returns the configured puppet for a job spec.
+    """
+    from TikTokBot import setup_puppet
+    return setup_puppet(spec.get("driver_path", "./drivers/chromedriver"), spec.get("creds_file", "./users/creds.json"),
+                        spec["id"], puppet_type=spec.get("type", 0), user_dir=spec.get("user_dir", "./users"),
+                        data_dir=spec.get("data_dir", "./data"), use_undetected=spec.get("use_undetected", True))
+
+def run_schedule(puppet, schedule, start=0, on_step=None):
+    """
+        Executes the scheduled actions on a puppet, in order, skipping the first start steps.
+        on_step(k) is called once the first k steps finished. Raises RuntimeError if a run was aborted
+        (runs catch their own errors, so they don't raise).
+    """
+    for k, step in enumerate(schedule):
+        if k < start:
+            continue
+        params = {p: v for p, v in step.items() if p != "action"}
+        puppet.last_run_completed = None
+        getattr(puppet, step["action"])(**params)
+        if puppet.last_run_completed is False:
+            raise RuntimeError(f"Run aborted in step {k} ({step['action']})")
+        if on_step is not None:
+            on_step(k + 1)
+
+def work(queue_path, puppet_factory=default_puppet_factory, worker_id=None, wait_for_jobs=False):
+    """
+        Worker loop: claims & runs jobs until the queue is empty.
+        puppet_factory(spec) must return a puppet (with its own driver); it must be picklable (module level).
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    logger = logging.getLogger('Bot')
+    queue = JobQueue(queue_path)
+
+    while True:
+        job = queue.claim(worker_id)
+        if job is None:
+            if wait_for_jobs and queue.pending() > 0:
+                # Other workers are still running jobs which might be requeued
+                time.sleep(10)
+                continue
+            break
+        job_id, spec = job
+
+        puppet = None
+        try:
+            logger.info("Worker %s starting job %d (%s)", worker_id, job_id, spec["id"])
+            start = queue.steps_done(job_id)
+            puppet = puppet_factory(spec)
+            # The daily output file may hold rows of an earlier attempt (the job was requeued): keep them.
+            # Finished steps are skipped, an aborted one resumes from its checkpoint.
+            puppet.append_output()
+            run_schedule(puppet, spec.get("schedule", list()), start=start,
+                         on_step=lambda k: queue.progress(job_id, k))
+            queue.complete(job_id, puppet.videos_written)
+        except Exception:
+            logger.error("Job %d (%s) failed.", job_id, spec["id"], exc_info=True)
+            queue.fail(job_id, traceback.format_exc(limit=3), puppet.videos_written if puppet is not None else 0)
+        finally:
+            if puppet is not None:
+                try:
+                    puppet.close_output()
+                    puppet._driver.quit()
+                except Exception:
+                    pass
+
+def run_workers(queue_path, n_workers, puppet_factory=default_puppet_factory):
+    """
+        Starts n_workers processes on the queue and waits until they finish.
+    """
+    procs = [Process(target=work, args=(queue_path, puppet_factory, None, True)) for _ in range(n_workers)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+def format_report(rows):
+    """
+        Returns report rows as a printable table (including aggregate throughput).
+    """
+    lines = [f"{'round':<12}{'puppet':<8}{'status':<10}{'tries':>6}{'videos':>8}{'videos/h':>12}"]
+    for r in rows:
+        lines.append(f"{r['round']:<12}{r['puppet']:<8}{r['status']:<10}{r['attempts']:>6}{r['videos']:>8} {r['videos_per_hour']:>11.1f}")
+    done = [r for r in rows if r["status"] == "done"]
+    if len(done):
+        avg = sum(r["videos_per_hour"] for r in done) / len(done)
+        lines.append(f"Average throughput: {avg:.1f} videos/hour/puppet ({len(done)}/{len(rows)} jobs done)")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run an experiment round across worker processes.")
+    parser.add_argument("plan", nargs="?", help="Experiment plan (JSON); omit to only work on an existing queue")
+    parser.add_argument("--queue", default="./queue.db", help="Job queue (SQLite file)")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: one per puppet)")
+    parser.add_argument("--report", action="store_true", help="Only print the queue's status report")
+    args = parser.parse_args()
+
+    logging.basicConfig(filename="./logs", filemode='a', format='%(asctime)s - [%(process)d] [%(levelname)s] %(message)s', datefmt='%H:%M:%S')
+    queue = JobQueue(args.queue)
+
+    if not args.report:
+        n_workers = args.workers
+        if args.plan is not None:
+            with open(args.plan, 'r') as f:
+                plan = json.load(f)
+            print(f"Queued {queue.enqueue_plan(plan)} job(s).")
+            n_workers = n_workers or len(plan["puppets"])
+        run_workers(args.queue, n_workers or 1)
+
+    print(format_report(queue.report()))
@@ -0,0 +1,289 @@
+"""
+    Output sinks for collected VideoInfo.
+"""
+from collections import OrderedDict
+import csv, io, os, time, logging
+
+
+# Columns of VideoInfo output (in order)
+COLUMNS = ["v_id", "creator", "desc", "duration", "likes", "comments", "sound", "tags"]
+
+
+def encode_row(row):
+    """
+        Returns a single CSV-encoded line (without line terminator) for the given values.
+    """
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator="").writerow(row)
+    return buf.getvalue()
+
+
+class VideoInfoWriter:
+    """
+        Long-lived, buffered CSV writer for VideoInfo.
+        Rows are batched & flushed once max_rows are buffered or max_interval seconds have passed
+        (and on flush()/close()). A file is created fresh (with header) the first time it is used
+        by this writer; switching back to it later appends. Up to max_open handles are kept open.
+        on_flush(fname, rows, offset) is called after every flush, with the file size after writing.
+    """
+
+    def __init__(self, fname=None, max_rows=25, max_interval=15.0, max_open=4):
+        self.max_rows = max_rows
+        self.max_interval = max_interval
+        self.max_open = max_open
+        self.on_flush = None
+        self.logger = logging.getLogger('Bot')
+
+        self._fname = fname
+        self._handles = OrderedDict() # File name -> open file object (LRU)
+        self._started = set()         # Files created by this writer
+        self._buffer = list()
+        self._last_flush = time.monotonic()
+
+    def _handle(self, fname, fresh=False):
+        """
+            Returns an open handle for fname, creating the file (with header) if needed.
+        """
+        if fresh and fname in self._handles:
+            self._handles.pop(fname).close()
+        if fname in self._handles:
+            self._handles.move_to_end(fname)
+            return self._handles[fname]
+
+        if fresh or fname not in self._started:
+            f = open(fname, "w", newline="", encoding="utf-8")
+            csv.writer(f).writerow(COLUMNS)
+            self._started.add(fname)
+        else:
+            f = open(fname, "a", newline="", encoding="utf-8")
+        self._handles[fname] = f
+
+        # Close least recently used handles
+        while len(self._handles) > self.max_open:
+            _, old = self._handles.popitem(last=False)
+            old.close()
+        return f
+
+    @property
+    def fname(self):
+        return self._fname
+
+    def set_file(self, fname, fresh=False):
+        """
+            Switches output to fname. Buffered rows for the previous file are flushed first.
+            If fresh, the file is truncated (and a header written) even if it was used before.
+        """
+        if fname != self._fname:
+            self.flush()
+        elif fresh and self._buffer:
+            # Rows still buffered belong to the contents being discarded
+            self.logger.info("Dropping %d buffered rows of %s (truncated).", len(self._buffer), fname)
+            self._buffer = list()
+        self._fname = fname
+        if fresh:
+            self._handle(fname, fresh=True)
+
+    def write(self, vi):
+        """
+            Buffers a VideoInfo row, flushing if the size or time policy says so.
+        """
+        self._buffer.append(vi.to_row())
+        if len(self._buffer) >= self.max_rows or (time.monotonic() - self._last_flush) >= self.max_interval:
+            self.flush()
+
+    def flush(self):
+        """
+            Writes all buffered rows to the current file.
+        """
+        self._last_flush = time.monotonic()
+        if len(self._buffer) == 0 or self._fname is None:
+            return
+        f = self._handle(self._fname)
+        csv.writer(f).writerows(self._buffer)
+        f.flush()
+        rows = len(self._buffer)
+        self._buffer = list()
+        if self.on_flush is not None:
+            self.on_flush(self._fname, rows, f.tell())
+
+    def resume(self, fname, offset):
+        """
+            Continues writing to an existing file, dropping anything after offset (e.g. a partial row from a crash).
+        """
+        self.flush()
+        if fname in self._handles:
+            self._handles.pop(fname).close()
+        if os.path.exists(fname):
+            with open(fname, "r+b") as f:
+                f.truncate(offset)
+            self._started.add(fname)
+        self._fname = fname
+
+    def append(self, fname):
+        """
+            Continues writing at the end of an existing file (e.g. written by an earlier, failed attempt)
+            instead of overwriting it. A partial last row is dropped.
+        """
+        offset = 0
+        if os.path.exists(fname):
+            with open(fname, "rb") as f:
+                data = f.read()
+            offset = data.rfind(b"\n") + 1
+        if offset == 0:
+            # Missing, empty or without a complete header: created fresh on first flush
+            self.set_file(fname)
+            return
+        self.resume(fname, offset)
+
+    def close(self):
+        """
+            Flushes & closes all open files.
+        """
+        try:
+            self.flush()
+        except Exception as e:
+            self.logger.error("Error while flushing output.", exc_info=True)
+        for f in self._handles.values():
+            f.close()
+        self._handles = OrderedDict()
+
+
+def partition_path(root, topic, puppet_id, date, ext="parquet"):
+    """
+        Returns path of a new part file in the (hive-style) partition for topic/puppet/date:
+        <root>/topic=<topic>/puppet=<puppet_id>/date=<date>/part-<timestamp>.<ext>
+    """
+    return f"{root}/topic={topic}/puppet={puppet_id}/date={date}/part-{time.strftime('%H%M%S')}.{ext}"
+
+
+class ParquetVideoInfoWriter:
+    """
+        Buffered Parquet writer for VideoInfo, with the same interface as VideoInfoWriter.
+        Every flush appends a row group; tags are stored as a native list column.
+        Parquet files can't be appended to once closed, so re-using a file name writes a new part next to it.
+        on_flush(fname, rows, offset) is called after every flush (offset is None).
+        Requires pyarrow.
+    """
+
+    def __init__(self, fname=None, max_rows=200, max_interval=60.0, compression="zstd"):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet output requires pyarrow (pip install pyarrow).")
+        self._pa = pa
+        self._pq = pq
+        self.schema = pa.schema([
+            ("v_id", pa.int64()),
+            ("creator", pa.string()),
+            ("desc", pa.string()),
+            ("duration", pa.float64()),
+            ("likes", pa.int64()),
+            ("comments", pa.int64()),
+            ("sound", pa.string()),
+            ("tags", pa.list_(pa.string())),
+        ])
+        self.max_rows = max_rows
+        self.max_interval = max_interval
+        self.compression = compression
+        self.on_flush = None
+        self.logger = logging.getLogger('Bot')
+
+        self._fname = fname
+        self._path = None   # Path actually written (may differ from fname for re-used names)
+        self._pqwriter = None
+        self._used = dict() # File name -> number of parts written
+        self._buffer = list()
+        self._last_flush = time.monotonic()
+
+    @property
+    def fname(self):
+        return self._fname
+
+    def _open(self):
+        parts = self._used.get(self._fname, 0)
+        stem, ext = os.path.splitext(self._fname)
+        self._path = self._fname if parts == 0 else f"{stem}-{parts}{ext}"
+        self._used[self._fname] = parts + 1
+        os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+        self._pqwriter = self._pq.ParquetWriter(self._path, self.schema, compression=self.compression)
+
+    def _close_file(self):
+        if self._pqwriter is not None:
+            self._pqwriter.close()
+            self._pqwriter = None
+
+    def set_file(self, fname, fresh=False):
+        if fname == self._fname and not fresh:
+            return
+        self.flush()
+        self._close_file()
+        if fresh:
+            self._used.pop(fname, None)
+        self._fname = fname
+
+    def append(self, fname):
+        """
+            Keeps existing parts of fname: new rows go to the next free part next to it.
+        """
+        self.set_file(fname)
+        stem, ext = os.path.splitext(fname)
+        parts = self._used.get(fname, 0)
+        while os.path.exists(fname if parts == 0 else f"{stem}-{parts}{ext}"):
+            parts += 1
+        self._used[fname] = parts
+
+    def write(self, vi):
+        self._buffer.append(vi)
+        if len(self._buffer) >= self.max_rows or (time.monotonic() - self._last_flush) >= self.max_interval:
+            self.flush()
+
+    def _to_int(self, n):
+        try:
+            return int(n)
+        except (TypeError, ValueError):
+            return None
+
+    def flush(self):
+        """
+            Writes buffered rows as a row group.
+        """
+        self._last_flush = time.monotonic()
+        if len(self._buffer) == 0 or self._fname is None:
+            return
+        cols = {c: list() for c in COLUMNS}
+        for vi in self._buffer:
+            cols["v_id"].append(self._to_int(vi.vid))
+            cols["creator"].append(vi.creator)
+            cols["desc"].append(vi.desc)
+            cols["duration"].append(vi.duration)
+            cols["likes"].append(self._to_int(vi.num_str_to_int(vi.likes)))
+            cols["comments"].append(self._to_int(vi.num_str_to_int(vi.comments)))
+            cols["sound"].append(vi.sound)
+            cols["tags"].append(list(vi.tags or list()))
+        if self._pqwriter is None:
+            self._open()
+        self._pqwriter.write_table(self._pa.table(cols, schema=self.schema))
+        rows = len(self._buffer)
+        self._buffer = list()
+        if self.on_flush is not None:
+            self.on_flush(self._fname, rows, None)
+
+    def close(self):
+        try:
+            self.flush()
+        except Exception as e:
+            self.logger.error("Error while flushing output.", exc_info=True)
+        self._close_file()
+
+
+def is_parquet(fname):
+    return fname is not None and fname.endswith(".parquet")
+
+def make_writer(fname):
+    """
+        Returns a writer for the given output file, based on its extension (.parquet or CSV).
+    """
+    if is_parquet(fname):
+        return ParquetVideoInfoWriter(fname)
+    return VideoInfoWriter(fname)
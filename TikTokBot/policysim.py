@@ -0,0 +1,137 @@
+"""
+    Offline policy simulator: replays collected feeds (data/<topic>/*.csv) through the puppets' decision rules
+    to tune like/follow thresholds & watch durations without live runs.
+    Like browse_fyp, only videos with a non-zero relevance are watched (duration * watch_duration) and
+    considered for a like (relevance >= relevance_like) or follow (relevance >= relevance_follow).
+    Every feed is scored once per profile; the whole policy grid is then evaluated on the sorted scores.
+
+    Usage: python -m TikTokBot.policysim data/AV data/HS [--profiles profile_AV.json ...]
+                                         [--like 0.5 1 2] [--follow 1 2 3] [--watch 1 2] [--out sweep.csv]
+    Without a grid (--like/--follow/--watch), the settings of the puppet types are replayed.
+"""
+from TikTokBot.relevance import RelevanceIndex
+from TikTokBot.puppets import PuppetPassive, PuppetCasual, PuppetActive
+import TikTokBot.preprocessing as preproc
+import pandas as pd
+import numpy as np
+import json, os, glob, itertools, argparse
+
+
+PUPPETS = {"passive": PuppetPassive, "casual": PuppetCasual, "active": PuppetActive}
+COLUMNS = ["v_id", "creator", "desc", "duration", "sound", "tags"]
+
+
+### Policies ###
+
+def puppet_policies():
+    """
+        Returns dict of puppet type name -> (relevance_like, relevance_follow, watch_duration)
+    """
+    return {name: (p.relevance_like, p.relevance_follow, p.watch_duration) for name, p in PUPPETS.items()}
+
+def grid_policies(like, follow, watch):
+    """
+        Returns all combinations of the given thresholds & watch durations as policies (see puppet_policies).
+    """
+    return {f"like={l} follow={f} watch={w}": (l, f, w) for l, f, w in itertools.product(like, follow, watch)}
+
+
+### Simulation ###
+
+def count_at_least(sorted_values, thresholds):
+    """
+        Returns array with the number of (ascending) sorted values >= each threshold.
+    """
+    return len(sorted_values) - np.searchsorted(sorted_values, thresholds, side="left")
+
+def simulate(feed, profiles, policies):
+    """
+        Replays a feed (DataFrame of VideoInfo, as collected) for every profile & policy.
+        Returns DataFrame with one row per (profile, policy): videos watched, likes, follows,
+        distinct creators followed and the expected watch time (seconds).
+
+        Parameters:
+            profiles (dict): name -> profile (dict as in profile_XX.json, or a RelevanceIndex)
+            policies (dict): name -> (relevance_like, relevance_follow, watch_duration)
+    """
+    names = list(policies)
+    like, follow, watch = (np.array([policies[p][i] for p in names], dtype=float) for i in range(3))
+    duration = pd.to_numeric(feed["duration"], errors="coerce").fillna(0).to_numpy()
+    creators = feed["creator"].astype(str).str.lower().to_numpy()
+
+    results = list()
+    for pname, profile in profiles.items():
+        index = profile if isinstance(profile, RelevanceIndex) else RelevanceIndex(profile)
+        r = index.score_frame(feed).to_numpy()
+        watched = r != 0 # Irrelevant videos are skipped right away
+
+        # A creator is followed (once) if any of their watched videos passes the threshold
+        scores = np.sort(r[watched])
+        creator_max = np.sort(pd.Series(r[watched]).groupby(creators[watched]).max().to_numpy())
+
+        results.append(pd.DataFrame({
+            "profile": pname, "policy": names,
+            "relevance_like": like, "relevance_follow": follow, "watch_duration": watch,
+            "videos": len(feed), "watched": int(watched.sum()),
+            "likes": count_at_least(scores, like),
+            "follows": count_at_least(scores, follow),
+            "creators_followed": count_at_least(creator_max, follow),
+            "watch_time_s": duration[watched].sum() * watch,
+        }))
+    return pd.concat(results, ignore_index=True)
+
+def sweep(feeds, profiles, policies):
+    """
+        Runs simulate for every feed (dict name -> DataFrame), returns the combined results.
+    """
+    results = list()
+    for fname, feed in feeds.items():
+        res = simulate(feed, profiles, policies)
+        res.insert(0, "feed", fname)
+        results.append(res)
+    return pd.concat(results, ignore_index=True)
+
+
+### Loading ###
+
+def load_profiles(fnames):
+    """
+        Returns dict of profile name (e.g. 'AV' for profile_AV.json) -> compiled RelevanceIndex
+    """
+    profiles = dict()
+    for fname in fnames:
+        with open(fname, 'r') as f:
+            name = os.path.splitext(os.path.basename(fname))[0].replace("profile_", "")
+            profiles[name] = RelevanceIndex(json.load(f))
+    return profiles
+
+def load_feeds(folders):
+    """
+        Returns dict of folder name (topic) -> DataFrame with the collected feeds in that folder
+    """
+    return {os.path.basename(os.path.normpath(p)): preproc.load_folder(p, columns=COLUMNS) for p in folders}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay collected feeds through puppet like/follow/watch policies.")
+    parser.add_argument("folders", nargs="+", help="Data folders (e.g. data/AV)")
+    parser.add_argument("--profiles", nargs="+", default=sorted(glob.glob("./profile_*.json")))
+    parser.add_argument("--like", nargs="+", type=float, help="relevance_like values to sweep")
+    parser.add_argument("--follow", nargs="+", type=float, help="relevance_follow values to sweep")
+    parser.add_argument("--watch", nargs="+", type=float, help="watch_duration values to sweep")
+    parser.add_argument("--out", default=None, help="Write results to this CSV file")
+    args = parser.parse_args()
+
+    grid = bool(args.like or args.follow or args.watch)
+    if grid:
+        # Parameters that aren't swept keep the passive puppet's setting
+        policies = grid_policies(args.like or [PuppetPassive.relevance_like], args.follow or [PuppetPassive.relevance_follow],
+                                 args.watch or [PuppetPassive.watch_duration])
+    else:
+        policies = puppet_policies()
+
+    results = sweep(load_feeds(args.folders), load_profiles(args.profiles), policies)
+    if args.out is not None:
+        results.to_csv(args.out, index=False)
+    with pd.option_context("display.max_rows", None, "display.width", 200):
+        print(results.drop(columns=["policy"] if grid else []).to_string(index=False))
@@ -2,19 +2,65 @@ import pandas as pd
 import os, glob, re
 
 ### DATA LOADING ###
-def load_folder(path):
+def is_partition_root(path):
     """
-        Returns dataframe with all data in specified folder
+        Returns true if path is the root of Parquet partitions (topic=../puppet=../date=..) or holds Parquet files.
     """
-    pathlist = glob.glob(os.path.join(str(path), "*.csv"))
-    return pd.concat([pd.read_csv(fname) for fname in pathlist], axis=0, ignore_index=True)
+    return len(glob.glob(os.path.join(str(path), "topic=*"))) > 0 or len(glob.glob(os.path.join(str(path), "*.parquet"))) > 0
 
-def load_folders(paths):
+def folder_files(path):
+    """
+        Returns sorted list of the data files load_folder reads: the Parquet files if path is a partition root,
+        and the CSV files directly in path.
+    """
+    files = list()
+    if is_partition_root(path):
+        files += partition_files(path)
+    return sorted(files + glob.glob(os.path.join(str(path), "*.csv")))
+
+def load_folder(path, columns=None):
+    """
+        Returns dataframe with all data in specified folder (CSV files in the folder itself)
+        If the folder is a Parquet partition root (see is_partition_root), its partitions are read with
+        load_partitions and combined with any CSV files.
+    """
+    dfs = list()
+    if is_partition_root(path):
+        dfs.append(load_partitions(path, columns=columns))
+    pathlist = sorted(glob.glob(os.path.join(str(path), "*.csv")))
+    dfs += [pd.read_csv(fname, usecols=columns) for fname in pathlist]
+    return pd.concat(dfs, axis=0, ignore_index=True)
+
+def load_folders(paths, columns=None):
     dfs = list()
     for p in paths:
-        dfs.append(load_folder(p))
+        dfs.append(load_folder(p, columns=columns))
     return pd.concat(dfs, axis=0, ignore_index=True)
 
+def partition_files(root):
+    """
+        Returns sorted list of the Parquet files under root (in partitions or directly in root).
+    """
+    return sorted(glob.glob(os.path.join(str(root), "**", "*.parquet"), recursive=True))
+
+def load_partitions(root, columns=None, topics=None, puppets=None, dates=None):
+    """
+        Returns dataframe with the Parquet output under root (partitioned by topic, puppet & date).
+        Only the Parquet files are read, so root may hold other (e.g. CSV) files as well.
+
+        Parameters:
+            columns (list<str>): only read these columns (partition columns can be included)
+            topics, puppets, dates (list<str>): only read matching partitions (None = all)
+    """
+    import pyarrow.dataset as ds
+    dataset = ds.dataset(partition_files(root), format="parquet", partitioning="hive", partition_base_dir=str(root))
+    expr = None
+    for col, vals in (("topic", topics), ("puppet", puppets), ("date", dates)):
+        if vals is not None:
+            cond = ds.field(col).isin([str(v) for v in vals])
+            expr = cond if expr is None else expr & cond
+    return dataset.to_table(columns=columns, filter=expr).to_pandas()
+
 
 ### DATA FORMATTING ###
 def tags_str_to_list(s):
@@ -27,6 +73,16 @@ def tags_str_to_list(s):
     mentions = ['@' + x[:-1] for x in re.findall("@(.+?)[,\]]", s)]
     return hashtags + mentions
 
+def tags_normalize(tags):
+    """
+        Formats a native list of tags (e.g. from Parquet) like tags_str_to_list
+    """
+    if isinstance(tags, str):
+        return tags_str_to_list(tags)
+    hashtags = [t.lower() for t in tags if t.startswith('#')]
+    mentions = [t for t in tags if t.startswith('@')]
+    return hashtags + mentions
+
 
 ### DATA CLEANING ###
 def remove_emojis(data):
@@ -77,6 +133,6 @@ def prep_vidinfo(df):
     data = df.drop_duplicates(subset=["v_id"], keep="first")
 
     # Converting tags column from string to list
-    data.loc[:, 'tags'] = data.loc[:, 'tags'].apply(tags_str_to_list)
+    data = data.assign(tags=data['tags'].apply(tags_normalize))
 
     return data
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+    Availability & duration cache for the priming URLs (prime_<topic>.csv), shared by puppet processes
+    and kept across days (SQLite, WAL mode). Dead URLs are skipped up front and known durations are reused;
+    stale entries are re-checked in a background thread through TikTok's oEmbed endpoint.
+"""
+from urllib.request import urlopen
+from urllib.parse import quote
+from urllib.error import HTTPError, URLError
+import sqlite3, os, time, random, threading, logging
+
+
+OEMBED_URL = "https://www.tiktok.com/oembed?url="
+
+
+def check_available(url, timeout=10):
+    """
+        Returns True/False if the video is (un)available according to the oEmbed endpoint, None if unknown.
+    """
+    try:
+        with urlopen(OEMBED_URL + quote(url, safe=""), timeout=timeout) as res:
+            return res.status == 200
+    except HTTPError as e:
+        return False if e.code in (400, 404) else None
+    except (URLError, OSError):
+        return None
+
+
+class PrimeCache:
+    """
+        Per-URL state: available (1, 0 or NULL if never checked), duration (seconds, NULL if unknown)
+        and the time of the last check.
+    """
+
+    def __init__(self, path="./data/prime.db", max_age=7 * 24 * 3600):
+        self.path = path
+        self.max_age = max_age # Entries checked longer ago than this (seconds) are refreshed
+        self.logger = logging.getLogger('Bot')
+        self._con = self._connect()
+        self._con.execute("CREATE TABLE IF NOT EXISTS prime (url TEXT PRIMARY KEY, topic TEXT, available INTEGER, "
+                          "duration REAL, checked REAL)")
+        self._con.execute("CREATE TABLE IF NOT EXISTS lists (fname TEXT PRIMARY KEY, mtime REAL)")
+        self._refresher = None
+
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        return con
+
+    def sync(self, topic, fname):
+        """
+            Imports the URLs of a priming list (only if the file changed since the last import).
+            URLs of the topic that were removed from the list are dropped.
+        """
+        mtime = os.path.getmtime(fname)
+        row = self._con.execute("SELECT mtime FROM lists WHERE fname = ?", (fname,)).fetchone()
+        if row is not None and row[0] == mtime:
+            return
+        with open(fname, 'r') as f:
+            urls = [l.strip() for l in f if l.strip()]
+        self._con.execute("BEGIN")
+        try:
+            known = {u for (u,) in self._con.execute("SELECT url FROM prime WHERE topic = ?", (topic,))}
+            removed = known.difference(urls)
+            self._con.executemany("DELETE FROM prime WHERE url = ?", [(u,) for u in removed])
+            self._con.executemany("INSERT OR IGNORE INTO prime (url, topic) VALUES (?, ?)", [(u, topic) for u in urls])
+            self._con.execute("INSERT OR REPLACE INTO lists (fname, mtime) VALUES (?, ?)", (fname, mtime))
+            self._con.execute("COMMIT")
+        except Exception:
+            self._con.execute("ROLLBACK")
+            raise
+        if len(removed):
+            self.logger.info("Dropped %d URLs no longer in %s.", len(removed), fname)
+
+    def candidates(self, topic):
+        """
+            Returns URLs of the topic that aren't known to be unavailable.
+        """
+        return [u for (u,) in self._con.execute(
+            "SELECT url FROM prime WHERE topic = ? AND (available IS NULL OR available = 1) ORDER BY url", (topic,))]
+
+    def pick(self, topic, k, exclude=(), rand=random):
+        """
+            Returns up to k distinct candidate URLs at random, excluding the given ones.
+        """
+        pool = [u for u in self.candidates(topic) if u not in exclude]
+        return rand.sample(pool, k=min(k, len(pool)))
+
+    def duration(self, url):
+        row = self._con.execute("SELECT duration FROM prime WHERE url = ? AND available = 1", (url,)).fetchone()
+        return row[0] if row is not None else None
+
+    def record(self, url, available, duration=None):
+        """
+            Stores the outcome of loading a URL (keeps a known duration if none is given).
+        """
+        self._con.execute("UPDATE prime SET available = ?, duration = COALESCE(?, duration), checked = ? WHERE url = ?",
+                          (int(available), duration, time.time(), url))
+
+    def stale(self, topic, con=None):
+        """
+            Returns URLs of the topic that were never checked or not checked recently.
+        """
+        con = con or self._con
+        return [u for (u,) in con.execute("SELECT url FROM prime WHERE topic = ? AND (checked IS NULL OR checked < ?)",
+                                          (topic, time.time() - self.max_age))]
+
+    def refresh(self, topic, check=check_available):
+        """
+            Re-checks the availability of stale entries (blocking). Returns number of entries updated.
+        """
+        con = self._connect() # Own connection, so this can run in a background thread
+        updated = 0
+        for url in self.stale(topic, con):
+            available = check(url)
+            if available is None:
+                continue # Unknown (network issue): try again another time
+            con.execute("UPDATE prime SET available = ?, checked = ? WHERE url = ?", (int(available), time.time(), url))
+            updated += 1
+        con.close()
+        return updated
+
+    def refresh_async(self, topic, check=check_available):
+        """
+            Refreshes stale entries in a background (daemon) thread, unless a refresh is already running.
+        """
+        if self._refresher is not None and self._refresher.is_alive():
+            return
+        def run():
+            try:
+                n = self.refresh(topic, check)
+                self.logger.info("Refreshed %d priming URLs (%s).", n, topic)
+            except Exception as e:
+                self.logger.info("Could not refresh priming URLs (%s).", topic)
+        self._refresher = threading.Thread(target=run, daemon=True)
+        self._refresher.start()
+
+    def close(self):
+        self._con.close()
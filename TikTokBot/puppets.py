@@ -1,25 +1,30 @@
 """
     Specific puppet implementations.
 """
-import random, time, json, traceback
+import random, json, traceback
 from TikTokBot.bot import Bot
-from TikTokBot.utils import random_wait
+from TikTokBot.utils import random_wait, sleep
+from TikTokBot.primecache import PrimeCache
+from TikTokBot.relevance import RelevanceIndex
+from urllib.parse import urlparse
 
 
 """
     Base/Shared puppet behaviours
 """
 class PuppetBase(Bot):
+
+    # Behavior-related parameters (class-level so they can be read without a browser, e.g. by policysim)
+    relevance_like = 0
+    relevance_follow = 0
+    watch_duration = 0.3 # Fraction of TikTok duration
     
     def __init__(self, driver, puppet_id, profile_file=None, output_file=None):
         output_file = output_file or f"./{puppet_id}_out.csv"
         super().__init__(driver, output_file)
         self._id = puppet_id # This is always assumed to be either AVn or HSn (where n is an integer)
 
-        # Behavior-related parameters
-        self.relevance_like = 0
-        self.relevance_follow = 0
-        self.watch_duration = 0.3 # Fraction of TikTok duration
+        self.prime_cache = None # PrimeCache for pre_run_routine (opened on first use)
 
         # Interest data
         profile_file = profile_file or f"./profile_{puppet_id[:2]}.json"
@@ -32,6 +37,7 @@ class PuppetBase(Bot):
         self.relevant_creators = set(self._profile['creators'])
         self.relevant_sounds = set(self._profile['sounds'])
         self.relevant_keywords = set(self._profile['keywords'])
+        self.relevance = RelevanceIndex(self._profile) # Compiled once, used for every relevance check
         
 
     # Config
@@ -59,15 +65,10 @@ class PuppetBase(Bot):
         self.relevance_follow = thresh
 
     def _vid_relevance(self, vidinfo):
-        r = sum([self.relevant_tags.get(f"#{t.lower()}", 0) for t in vidinfo.tags])  # Score of tags
-        r += (int(vidinfo.creator in self.relevant_creators) * 10)     # Flagged creators count for 10
-        if vidinfo.sound is not None:
-            # Flagged sounds count too
-            for s in self.relevant_sounds:
-                if vidinfo.sound.lower() in s.lower():
-                    r += 1
-                    break
-        return r
+        """
+            Tag weights + 10 for a flagged creator + 1 for a flagged sound + 0.5 per profile keyword in the description
+        """
+        return self.relevance.score(vidinfo)
 
     def video_relevant(self, vidinfo):
         """
@@ -86,45 +87,61 @@ class PuppetBase(Bot):
     def pre_run_routine(self, k=3, likes=True):
         """
             Watches and likes a number of videos from a predefined set.
+            URLs known to be unavailable are skipped & known durations reused (see primecache.PrimeCache).
         """
-        fname = f"./prime_{self._id[:2]}.csv"
-        urls = list()
-        with open(fname, 'r') as f:
-            urls = f.readlines()
-        
-        picks = random.sample(urls, k=k)
+        topic = self._id[:2]
+        fname = f"./prime_{topic}.csv"
+        if self.prime_cache is None:
+            self.prime_cache = PrimeCache(f"{self._data_dir or './data'}/prime.db")
+        cache = self.prime_cache
+        cache.sync(topic, fname)
+        cache.refresh_async(topic) # Re-check stale entries while this routine runs
+
+        picks = cache.pick(topic, k)
+        tried = set(picks)
         watchtime = 1.2 # Fraction of total time
+        self._start_metrics("prime", fname, k)
 
         for p in picks:
 
-            self._driver.get(p)
+            # Open the video on the configured site
+            self._driver.get(self.base_url + urlparse(p).path)
             random_wait(0.5, min_t=0.2)
             self.pause_for_captcha()
 
-            # Check if video available
-            error_msg = self._wait_el_by_xpath("/html/body/div[2]/div[2]/div[2]/div[1]/div/p[1]", verbose=False)
-            if error_msg is not None:
-                if "unavailable" in error_msg.text.lower():
-                    # Append another pick to try instead & continue
-                    picks.append(random.choice(urls))
-                    continue
+            # Check if video available (unless it was available before & its duration is known)
+            vid_dur = cache.duration(p)
+            error_msg = self._wait_el("unavailable_msg", verbose=False) if vid_dur is None else None
+            if error_msg is not None and "unavailable" in error_msg.text.lower():
+                # Remember & try another (not yet tried) pick instead
+                cache.record(p, False)
+                picks += cache.pick(topic, 1, exclude=tried)
+                tried.update(picks)
+                self._retry("prime_video")
+                continue
 
             # Watch the video for the required time, then move on
-            vid_dur = None
             retries = 0
             while vid_dur is None and retries < 10:
                 vid_dur = self.get_video_duration()
+                if vid_dur is None:
+                    retries += 1
+                    sleep(0.5)
+            cache.record(p, True, vid_dur)
             if vid_dur is not None:
                 print(f"Watching video for {vid_dur * watchtime}s.")
-                time.sleep(vid_dur * watchtime)
-            if retries >= 10:
-                self.logger.warn(f"Couldn't find video duration after {retries} attempts. ({self._driver.current_url})")
-                time.sleep(1)
+                sleep(vid_dur * watchtime)
+            else:
+                self.logger.warning(f"Couldn't find video duration after {retries} attempts. ({self._driver.current_url})")
+                sleep(1)
 
             if likes:
                 self.like_video(like=True)
 
             random_wait(1) # Random wait before moving on
+            self._lap("loop:prime")
+
+        self._finish_metrics(completed=True)
 
     def browse_fyp(self, n=50, interact=True):
         """
@@ -134,7 +151,7 @@ class PuppetBase(Bot):
                 - interact (bool): Puppet can like/follow (based on profile) if true
         """
         # Navigate to base page
-        self._driver.get("http://tiktok.com/foryou")
+        self._driver.get(f"{self.base_url}/foryou")
         random_wait(1.0)
 
         # Close cookies banner by rejecting
@@ -142,9 +159,8 @@ class PuppetBase(Bot):
         random_wait(1.0)
 
         # Open first recommended video
-        first_xpath = "/html/body/div[2]/div[2]/div[2]/div[1]/div[1]/div/div[2]/div[1]/div"
         try:
-            first_rec = self._wait_el_by_xpath(first_xpath)
+            first_rec = self._wait_el("first_fyp")
             if first_rec is not None:
                 first_rec.click()
             else:
@@ -158,19 +174,15 @@ class PuppetBase(Bot):
         # Run
         self.logger.info(f"Beginning run ({n} videos)")
         if not interact: self.logger.info("Interaction disabled.")
-        i = 0
+        i, _ = self._begin_run("fyp", f"{self.base_url}/foryou", n)
         while i < n:
             try:
-                self.check_run_paused()  # Check if run suspended
-                self.pause_for_captcha() # Pauses run if captcha popup opened
-                self.unstuck_video()
-                self.dismiss_content_warning() # Dismisses any 'disturbing content' warning
-                # TODO:
-                # - Add check to unpause videos that got paused automatically
+                # Handles pauses, captchas, content warnings, stuck/paused videos, banners & overlays
+                self.handle_page_state()
 
                 # Collect statistics about this video
                 #random_wait(0.1)
-                time.sleep(0.1)
+                sleep(0.1)
                 v_d = self.collect_open_video_info()
                 valid = v_d.valid()
 
@@ -179,10 +191,11 @@ class PuppetBase(Bot):
                     s = self._driver.current_url + ": " + str(v_d.creator) + " / " + str(v_d.desc) + "\n"
                     s += str(v_d.tags) + " / " + str(v_d.duration) + "s." 
                     self.logger.info("Invalid VideoInfo: %s", s)
+                    self._retry("collect_open_video_info")
                     continue
 
                 i += 1
-                self.write_vidinfo(v_d, header=(i==1))
+                self.write_vidinfo(v_d)
 
                 # Check if video is at all relevant before committing
                 if abs(self._vid_relevance(v_d)) > 0:
@@ -208,13 +221,20 @@ class PuppetBase(Bot):
                 break
 
             # Move on
-            if not self.next_video():
+            self.write_captured_feed()
+            nav = self.next_video()
+            if not nav:
                 # Could not continue, abort the run
-                self.logger.warning("Could not continue to next video, aborting run.")
+                self.logger.warning("Could not continue to next video (%s), aborting run.", nav.status)
+                self._end_run(completed=False)
                 return
             random_wait(0.4, sdev=0.075, min_t=0.1)
+            self._lap("loop:fyp")
 
+        self.write_captured_feed()
+        self._end_run(completed=(i >= n))
         self.logger.info("Finished run.")
+        self.log_run_stats()
 
     def browse_query(self, n=10, interact=True):
         """
@@ -231,27 +251,23 @@ class PuppetBase(Bot):
         first_vid = None
         timeout_count = 3
         while first_vid is None and timeout_count > 0:
-            first_vid_xpaths = ["/html/body/div[2]/div[2]/div[2]/div[2]/div[1]/div/div[2]/div[1]/div/div/a",
-                                "/html/body/div[2]/div[2]/div[2]/div[2]/div[1]/div/div[3]/div[1]/div/div/a",
-                                "/html/body/div[2]/div[2]/div[2]/div[2]/div[1]/div/div[3]"
-            ]
-            first_vid = self._wait_el_by_xpaths(first_vid_xpaths)
+            first_vid = self._wait_el("first_search")
             if first_vid is not None:
                 break
             timeout_count -= 1
+            self._retry("first_search")
         if first_vid is None:
             self.logger.warning("Could not locate first search result. Aborting query.")
             return
         first_vid.click()
         random_wait(1, min_t = 0.75)
+        self._start_metrics("query", query, n)
 
         # Browse as usual
         for _ in range(n):
             try:
-                self.check_run_paused()  # Check if run suspended
-                self.pause_for_captcha() # Pauses run if captcha popup opened
-                self.unstuck_video()
-                self.dismiss_content_warning() # Dismisses any 'disturbing content' warning
+                # Handles pauses, captchas, content warnings, stuck/paused videos, banners & overlays
+                self.handle_page_state()
 
                 random_wait(0.2)
                 v_d = self.collect_open_video_info()
@@ -273,11 +289,16 @@ class PuppetBase(Bot):
                 continue
 
             # Move on
-            if not self.next_video():
+            nav = self.next_video()
+            if not nav:
                 # Could not continue, abort the run
-                self.logger.warning("Could not continue to next video, aborting run.")
+                self.logger.warning("Could not continue to next video (%s), aborting run.", nav.status)
+                self._finish_metrics(completed=False)
                 return
             random_wait(0.5, sdev=0.1, min_t=0.15)
+            self._lap("loop:query")
+
+        self._finish_metrics(completed=True)
 
 
 """
@@ -287,14 +308,14 @@ class PuppetBase(Bot):
         - Occassionally likes posts
 """
 class PuppetPassive(PuppetBase):
+
+    # Passive params
+    watch_duration = 1
+    relevance_like = 2
+    relevance_follow = 3
     
     def __init__(self, driver, puppet_id, profile_file=None, output_file=None):
         super().__init__(driver, puppet_id, profile_file, output_file)
-        
-        # Passive params
-        self.watch_duration = 1
-        self.relevance_like = 2
-        self.relevance_follow = 3
 
         # Log creation of puppet
         self.logger.info("Created passive puppet %s", self._id)
@@ -307,14 +328,14 @@ class PuppetPassive(PuppetBase):
         - Likes sufficiently relevant posts, occassionally follows relevant creators
 """
 class PuppetCasual(PuppetBase):
+
+    # Casual params
+    watch_duration = 2
+    relevance_like = 1
+    relevance_follow = 2
     
     def __init__(self, driver, puppet_id, profile_file=None, output_file=None):
         super().__init__(driver, puppet_id, profile_file, output_file)
-        
-        # Passive params
-        self.watch_duration = 2
-        self.relevance_like = 1
-        self.relevance_follow = 2
 
         # Log creation of puppet
         self.logger.info("Created casual puppet %s", self._id)
@@ -327,14 +348,14 @@ class PuppetCasual(PuppetBase):
         - Likes all relevant posts, follows relevant creators   
 """
 class PuppetActive(PuppetBase):
+
+    # Active params
+    watch_duration = 2
+    relevance_like = 0.5
+    relevance_follow = 1
     
     def __init__(self, driver, puppet_id, profile_file=None, output_file=None):
         super().__init__(driver, puppet_id, profile_file, output_file)
-        
-        # Passive params
-        self.watch_duration = 2
-        self.relevance_like = 0.5
-        self.relevance_follow = 1
 
         # Log creation of puppet
         self.logger.info("Created active puppet %s", self._id)
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""
+    Relevance scoring of videos against a puppet profile (tags, creators, sounds & keywords).
+    The profile is compiled once into a scoring index, which is used both online (PuppetBase._vid_relevance)
+    and offline over collected data (score_frame).
+"""
+from collections import deque
+import ast
+
+
+# Weights of the profile features (tags carry their own weight in the profile)
+CREATOR_WEIGHT = 10    # Flagged creators
+SOUND_WEIGHT = 1       # Any flagged sound (counted once)
+KEYWORD_WEIGHT = 0.5   # Per distinct keyword in the description
+
+
+def canonical_tag(tag):
+    """
+        Returns the lookup key of a hashtag ('#Tag', 'tag' -> 'tag'); mentions keep their '@'.
+    """
+    tag = tag.strip().lower()
+    return tag[1:] if tag.startswith('#') else tag
+
+def parse_tags(tags):
+    """
+        Returns tags as a list (accepts lists/arrays and their string representation, as in the CSV output).
+    """
+    if isinstance(tags, str):
+        try:
+            tags = ast.literal_eval(tags)
+        except (ValueError, SyntaxError):
+            return list()
+    try:
+        return list(tags) if tags is not None else list()
+    except TypeError:
+        # Missing value (NaN)
+        return list()
+
+
+class PatternMatcher:
+    """
+        Aho-Corasick automaton: finds all patterns (case-insensitive) in a text in a single pass.
+    """
+
+    def __init__(self, patterns):
+        """
+            patterns: iterable of (key, pattern string, whole_word) - whole_word patterns only match
+            if not surrounded by letters/digits.
+        """
+        self._goto = [dict()]
+        self._fail = [0]
+        self._out = [list()]
+        for key, pattern, whole_word in patterns:
+            pattern = pattern.lower()
+            if not pattern:
+                continue
+            node = 0
+            for c in pattern:
+                if c not in self._goto[node]:
+                    self._goto.append(dict())
+                    self._fail.append(0)
+                    self._out.append(list())
+                    self._goto[node][c] = len(self._goto) - 1
+                node = self._goto[node][c]
+            self._out[node].append((key, len(pattern), whole_word))
+
+        # Failure links (breadth first)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for c, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and c not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[child] = self._goto[f].get(c, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find(self, text):
+        """
+            Returns set of keys of the patterns occurring in text.
+        """
+        found = set()
+        if not text:
+            return found
+        text = text.lower()
+        node = 0
+        for i, c in enumerate(text):
+            while node and c not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(c, 0)
+            for key, length, whole_word in self._out[node]:
+                if whole_word:
+                    start = i - length + 1
+                    if (start > 0 and text[start - 1].isalnum()) or (i + 1 < len(text) and text[i + 1].isalnum()):
+                        continue
+                found.add(key)
+        return found
+
+
+class RelevanceIndex:
+    """
+        Compiled profile: canonical tag weights, creator set and a pattern automaton for sounds & keywords.
+    """
+
+    def __init__(self, profile):
+        self.tags = dict()
+        for t, w in profile.get("tags", dict()).items():
+            self.tags[canonical_tag(t)] = w
+        self.creators = {c.lower() for c in profile.get("creators", list())}
+        self._sounds = PatternMatcher(("sound", s, False) for s in profile.get("sounds", list()))
+        self._keywords = PatternMatcher((k.lower(), k, True) for k in profile.get("keywords", list()))
+
+    def tag_score(self, tags):
+        return sum(self.tags.get(canonical_tag(t), 0) for t in tags)
+
+    def score_fields(self, tags, creator, sound, desc):
+        """
+            Returns the relevance score for the given VideoInfo fields (missing values, e.g. NaN, score 0).
+        """
+        r = self.tag_score(tags) if isinstance(tags, (list, tuple, set)) else 0
+        if isinstance(creator, str) and creator.lower() in self.creators:
+            r += CREATOR_WEIGHT
+        if isinstance(sound, str) and sound and self._sounds.find(sound):
+            r += SOUND_WEIGHT
+        if isinstance(desc, str) and desc:
+            r += KEYWORD_WEIGHT * len(self._keywords.find(desc))
+        return r
+
+    def score(self, vidinfo):
+        """
+            Returns the relevance score of a VideoInfo.
+        """
+        return self.score_fields(vidinfo.tags or list(), vidinfo.creator, vidinfo.sound, vidinfo.desc)
+
+    def score_many(self, vidinfos):
+        """
+            Returns list of scores for many VideoInfo.
+        """
+        return [self.score(vi) for vi in vidinfos]
+
+    def score_frame(self, df):
+        """
+            Returns a Series of scores for a DataFrame of collected VideoInfo (columns tags, creator, sound, desc).
+            Tags & creators are scored column-wise; only sounds & descriptions run through the automaton per row.
+        """
+        import pandas as pd
+        import numpy as np
+        # Sum tag weights per row position (the index may hold duplicates, e.g. after concatenating day files)
+        tags = df["tags"].map(parse_tags)
+        rows = np.repeat(np.arange(len(df)), tags.map(len).to_numpy())
+        weights = [self.tags.get(canonical_tag(t), 0) if isinstance(t, str) else 0 for ts in tags for t in ts]
+        r = np.bincount(rows, weights=np.asarray(weights, dtype=float), minlength=len(df))
+        r += (df["creator"].astype(str).str.lower().isin(self.creators) * CREATOR_WEIGHT).to_numpy()
+        if "sound" in df:
+            r += df["sound"].map(lambda s: SOUND_WEIGHT if isinstance(s, str) and self._sounds.find(s) else 0).to_numpy()
+        if "desc" in df:
+            r += df["desc"].map(lambda d: KEYWORD_WEIGHT * len(self._keywords.find(d)) if isinstance(d, str) else 0).to_numpy()
+        return pd.Series(r, index=df.index, name="relevance")
@@ -0,0 +1,88 @@
+"""
+    Resource policies (what the browser is allowed to download) & per-session resource usage.
+    Policies are applied through the Chrome DevTools Protocol, so they only work on Chrome(-based) drivers.
+"""
+import logging, time
+
+
+# URL patterns (CDP wildcard syntax) per category of blockable resources
+BLOCK_PATTERNS = {
+    "images": ["*.jpeg*", "*.jpg*", "*.png*", "*.webp*", "*.gif*", "*.avif*", "*.image*", "*tos-alisg-avt*", "*tos-maliva-avt*", "*tos-useast*-avt*"],
+    "fonts": ["*.woff*", "*.woff2*", "*.ttf*", "*.otf*"],
+    "analytics": ["*mon.tiktokv.com*", "*mon-va.byteoversea.com*", "*mcs.tiktokv.com*", "*/web/report*",
+                  "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*analytics.tiktok.com*"],
+}
+
+# Policies: blocked categories & optional bandwidth cap (bytes/s).
+# Capping the bandwidth makes the player buffer less of each video; TikTok's web player has no quality setting.
+# None of these block the video stream itself, so durations can still be read from the <video> element.
+RESOURCE_POLICIES = {
+    "full": {"block": [], "throughput": None},
+    "lean": {"block": ["images", "fonts", "analytics"], "throughput": None},
+    "minimal": {"block": ["images", "fonts", "analytics"], "throughput": 250_000},
+}
+
+
+def apply_policy(driver, name):
+    """
+        Applies the named resource policy to the driver's current session.
+    """
+    policy = RESOURCE_POLICIES[name]
+    driver.execute_cdp_cmd("Network.enable", dict())
+    urls = [p for cat in policy["block"] for p in BLOCK_PATTERNS[cat]]
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": urls})
+    throughput = policy["throughput"] or -1 # -1 disables throttling
+    driver.execute_cdp_cmd("Network.emulateNetworkConditions",
+                           {"offline": False, "latency": 0, "downloadThroughput": throughput, "uploadThroughput": -1})
+
+
+class ResourceMonitor:
+    """
+        Tracks bandwidth (from Network.loadingFinished events in the performance log)
+        and renderer CPU time (CDP Performance metrics) for a session.
+    """
+
+    def __init__(self, driver, policy="full"):
+        self._driver = driver
+        self.policy = policy
+        self.bytes = 0
+        self.requests = 0
+        self._start = time.monotonic()
+        self._cpu_start = None
+        self.logger = logging.getLogger('Bot')
+        try:
+            self._driver.execute_cdp_cmd("Performance.enable", dict())
+            self._cpu_start = self._cpu_time()
+        except Exception as e:
+            self.logger.info("CPU metrics unavailable for this driver.")
+
+    def _cpu_time(self):
+        """
+            Returns main-thread task time (seconds) of the renderer.
+        """
+        metrics = self._driver.execute_cdp_cmd("Performance.getMetrics", dict())["metrics"]
+        return sum(m["value"] for m in metrics if m["name"] == "TaskDuration")
+
+    def on_messages(self, messages):
+        """
+            Accumulates transferred bytes from performance log messages.
+        """
+        for msg in messages:
+            if msg.get("method") == "Network.loadingFinished":
+                self.bytes += msg.get("params", dict()).get("encodedDataLength", 0)
+                self.requests += 1
+
+    def summary(self):
+        """
+            Returns dict with bandwidth & CPU use of the session so far.
+        """
+        minutes = max(time.monotonic() - self._start, 1e-9) / 60
+        cpu = None
+        if self._cpu_start is not None:
+            try:
+                cpu = self._cpu_time() - self._cpu_start
+            except Exception:
+                pass
+        return {"policy": self.policy, "minutes": minutes, "requests": self.requests,
+                "mb": self.bytes / 1e6, "mb_per_min": self.bytes / 1e6 / minutes,
+                "cpu_s": cpu, "cpu_share": (cpu / (minutes * 60)) if cpu is not None else None}
@@ -0,0 +1,116 @@
+"""
+    Persistent index of seen video IDs, shared by puppet processes (SQLite, WAL mode).
+    Behaves like the set of IDs passed to _browse(to_skip=...): supports `in`, add(), update() and |=.
+    A run adds the IDs it wrote once their rows are flushed to the output.
+
+    Usage (bulk import of existing data):
+        python -m TikTokBot.seenindex [--index ./data/seen.db] [--namespace hate] data/tags/hate data/creators/hate
+"""
+import sqlite3, csv, glob, os, threading, argparse
+
+
+class SeenIndex:
+    """
+        Set of 19-digit video IDs per namespace (e.g. per topic), stored as integers.
+        Membership checks are O(log n) primary key lookups; appends from several processes are safe.
+        The connection is shared by the threads of a process (serialized by a lock).
+    """
+
+    def __init__(self, path="./data/seen.db", namespace="default"):
+        self.path = path
+        self.namespace = namespace
+        self._con = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._con.execute("PRAGMA journal_mode=WAL")     # Readers don't block writers (and vice versa)
+        self._con.execute("PRAGMA synchronous=NORMAL")
+        self._con.execute("CREATE TABLE IF NOT EXISTS seen (ns TEXT, vid INTEGER, PRIMARY KEY (ns, vid)) WITHOUT ROWID")
+
+    @staticmethod
+    def _key(vid):
+        try:
+            return int(vid)
+        except (TypeError, ValueError):
+            return None
+
+    def __contains__(self, vid):
+        key = self._key(vid)
+        if key is None:
+            return False
+        with self._lock:
+            return self._con.execute("SELECT 1 FROM seen WHERE ns = ? AND vid = ?", (self.namespace, key)).fetchone() is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._con.execute("SELECT COUNT(*) FROM seen WHERE ns = ?", (self.namespace,)).fetchone()[0]
+
+    def __iter__(self):
+        with self._lock:
+            rows = self._con.execute("SELECT vid FROM seen WHERE ns = ? ORDER BY vid", (self.namespace,)).fetchall()
+        for (vid,) in rows:
+            yield str(vid)
+
+    def add(self, vid):
+        key = self._key(vid)
+        if key is not None:
+            with self._lock:
+                self._con.execute("INSERT OR IGNORE INTO seen (ns, vid) VALUES (?, ?)", (self.namespace, key))
+
+    def update(self, vids):
+        """
+            Adds many IDs in a single transaction. Returns number of new IDs.
+        """
+        rows = [(self.namespace, k) for k in map(self._key, vids) if k is not None]
+        with self._lock:
+            before = self._con.total_changes
+            self._con.execute("BEGIN")
+            try:
+                self._con.executemany("INSERT OR IGNORE INTO seen (ns, vid) VALUES (?, ?)", rows)
+                self._con.execute("COMMIT")
+            except Exception:
+                self._con.execute("ROLLBACK")
+                raise
+            return self._con.total_changes - before
+
+    def __ior__(self, vids):
+        self.update(vids)
+        return self
+
+    def import_csvs(self, paths):
+        """
+            Bulk-imports v_id columns of VideoInfo CSVs (files, folders or glob patterns, searched recursively).
+            Returns number of new IDs.
+        """
+        files = list()
+        for p in paths:
+            if os.path.isdir(p):
+                files += glob.glob(os.path.join(p, "**", "*.csv"), recursive=True)
+            else:
+                files += glob.glob(p, recursive=True)
+
+        vids = list()
+        for fname in files:
+            with open(fname, 'r', encoding="utf-8", newline="") as f:
+                reader = csv.reader(f)
+                header = next(reader, None)
+                if header is None:
+                    continue
+                col = header.index("v_id") if "v_id" in header else 0
+                vids += [row[col] for row in reader if len(row) > col]
+        return self.update(vids)
+
+    def close(self):
+        with self._lock:
+            self._con.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import collected video IDs into a seen-video index.")
+    parser.add_argument("paths", nargs="+", help="CSV files, folders or glob patterns")
+    parser.add_argument("--index", default="./data/seen.db")
+    parser.add_argument("--namespace", default="default")
+    args = parser.parse_args()
+
+    index = SeenIndex(args.index, args.namespace)
+    added = index.import_csvs(args.paths)
+    print(f"Imported {added} new IDs into '{args.namespace}' ({len(index)} total).")
+    index.close()
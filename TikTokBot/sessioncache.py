@@ -0,0 +1,92 @@
+"""
+    Per-puppet snapshots of a logged-in session (cookies & localStorage), so a new browser
+    can reuse it instead of going through the login flow again.
+    Snapshots contain session tokens: keep the cache directory private.
+"""
+import json, os, time, logging
+
+
+# Reads the localStorage of the current page
+READ_STORAGE_SCRIPT = "return Object.assign({}, window.localStorage);"
+
+# Writes the given items to the localStorage of the current page
+WRITE_STORAGE_SCRIPT = """
+const items = arguments[0];
+for (const k in items) window.localStorage.setItem(k, items[k]);
+"""
+
+# Cookie fields accepted by WebDriver's add_cookie
+COOKIE_FIELDS = ("name", "value", "path", "domain", "secure", "httpOnly", "expiry", "sameSite")
+
+
+class SessionCache:
+    """
+        Stores session snapshots as <cache_dir>/<puppet id>.json
+    """
+
+    def __init__(self, cache_dir="./users/sessions", max_age=14 * 24 * 3600):
+        self.cache_dir = cache_dir
+        self.max_age = max_age # Snapshots older than this (seconds) aren't restored
+        self.logger = logging.getLogger('Bot')
+
+    def path(self, puppet_id):
+        return os.path.join(self.cache_dir, f"{puppet_id}.json")
+
+    def save(self, driver, puppet_id):
+        """
+            Snapshots the cookies & localStorage of the driver's current page.
+        """
+        snapshot = {"saved": time.time(), "url": driver.current_url,
+                    "cookies": driver.get_cookies(), "local_storage": driver.execute_script(READ_STORAGE_SCRIPT) or dict()}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path(puppet_id)
+        tmp = path + ".tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp, path)
+
+    def load(self, puppet_id):
+        """
+            Returns the snapshot for puppet_id, or None if there is no (recent enough) snapshot.
+        """
+        path = self.path(puppet_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                snapshot = json.load(f)
+        except (ValueError, OSError):
+            return None
+        if time.time() - snapshot.get("saved", 0) > self.max_age:
+            return None
+        return snapshot
+
+    def restore(self, driver, puppet_id, url):
+        """
+            Loads url and applies the stored cookies & localStorage, then reloads the page.
+            Returns True if a snapshot was applied (which doesn't mean the session is still valid).
+        """
+        snapshot = self.load(puppet_id)
+        if snapshot is None:
+            return False
+        driver.get(url) # Cookies can only be set for the domain that is open
+        now = time.time()
+        for c in snapshot["cookies"]:
+            if c.get("expiry") is not None and c["expiry"] < now:
+                continue
+            cookie = {k: c[k] for k in COOKIE_FIELDS if k in c}
+            if "expiry" in cookie:
+                cookie["expiry"] = int(cookie["expiry"])
+            try:
+                driver.add_cookie(cookie)
+            except Exception as e:
+                self.logger.info("Could not restore cookie %s", c.get("name"))
+        if snapshot["local_storage"]:
+            driver.execute_script(WRITE_STORAGE_SCRIPT, snapshot["local_storage"])
+        driver.refresh()
+        return True
+
+    def discard(self, puppet_id):
+        if os.path.exists(self.path(puppet_id)):
+            os.remove(self.path(puppet_id))
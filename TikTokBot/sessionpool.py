@@ -0,0 +1,170 @@
+"""
+    Pool of warm (started & logged in) bot sessions, reused across short jobs
+    such as browse_tag/browse_creator runs.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import threading, queue, logging, time
+
+
+class SessionPool:
+    """
+        Hands out initialized bots to jobs, resets their navigation state in between,
+        and recycles a session after max_jobs jobs or when a job fails.
+
+        Parameters:
+            factory (callable): returns a new, ready-to-use bot (e.g. started with setup_puppet & logged in)
+            size (int): maximum number of sessions open at the same time
+            max_jobs (int): jobs per session before it is recycled
+            home_url (str): page sessions are reset to between jobs (default: the bot's base_url)
+    """
+
+    def __init__(self, factory, size=1, max_jobs=25, home_url=None):
+        self.factory = factory
+        self.size = size
+        self.max_jobs = max_jobs
+        self.home_url = home_url
+        self.logger = logging.getLogger('Bot')
+
+        self._idle = queue.LifoQueue() # Most recently used session first (warmest)
+        self._slots = threading.BoundedSemaphore(size)
+        self._jobs = dict() # id(bot) -> jobs run in that session
+        self._lock = threading.Lock()
+
+        # Stats
+        self.startups = 0
+        self.startup_time = 0.0
+        self.jobs_run = 0
+        self.recycled = 0
+
+    def _start(self):
+        t0 = time.monotonic()
+        bot = self.factory()
+        with self._lock:
+            self.startups += 1
+            self.startup_time += time.monotonic() - t0
+            self._jobs[id(bot)] = 0
+        return bot
+
+    def warm(self, n=None):
+        """
+            Starts sessions in advance (up to the pool size).
+        """
+        for _ in range(min(n or self.size, self.size)):
+            self._slots.acquire()
+            self._idle.put(self._start())
+
+    def reset(self, bot):
+        """
+            Brings a session back to a neutral state: single window, main frame, home page, output flushed.
+        """
+        driver = bot._driver
+        bot.flush_output()
+        handles = driver.window_handles
+        for h in handles[1:]:
+            driver.switch_to.window(h)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.switch_to.default_content()
+        driver.get(self.home_url or bot.base_url)
+
+    def _discard(self, bot, recycle=True):
+        with self._lock:
+            self._jobs.pop(id(bot), None)
+            if recycle: self.recycled += 1
+        try:
+            bot.close_output()
+            bot._driver.quit()
+        except Exception as e:
+            self.logger.info("Error while closing recycled session.")
+        self._slots.release()
+
+    def acquire(self):
+        """
+            Returns a warm session (starting one if none are idle).
+        """
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            if self._slots.acquire(blocking=False):
+                try:
+                    return self._start()
+                except Exception:
+                    self._slots.release()
+                    raise
+            # Pool is full, wait for a session to be released (or recycled, which frees a slot)
+            try:
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                continue
+
+    def release(self, bot, error=False):
+        """
+            Returns a session to the pool (or recycles it after an error/too many jobs).
+            Pass error=True if the job failed, including runs that were aborted (see Bot.last_run_completed).
+        """
+        with self._lock:
+            self.jobs_run += 1
+            self._jobs[id(bot)] = self._jobs.get(id(bot), 0) + 1
+            used = self._jobs[id(bot)]
+        if error or used >= self.max_jobs:
+            self._discard(bot)
+            return
+        try:
+            self.reset(bot)
+        except Exception as e:
+            self.logger.warning("Could not reset session, recycling it.", exc_info=True)
+            self._discard(bot)
+            return
+        self._idle.put(bot)
+
+    @contextmanager
+    def session(self):
+        """
+            Context manager: with pool.session() as bot: ...
+        """
+        bot = self.acquire()
+        bot.last_run_completed = None
+        try:
+            yield bot
+        except Exception:
+            self.release(bot, error=True)
+            raise
+        # Browse loops catch their own errors, so an aborted run doesn't raise
+        self.release(bot, error=(bot.last_run_completed is False))
+
+    def run(self, jobs):
+        """
+            Runs jobs (callables taking a bot) on the pool, using up to size sessions in parallel.
+            Returns list of (result or exception) in job order.
+        """
+        def run_job(job):
+            try:
+                with self.session() as bot:
+                    return job(bot)
+            except Exception as e:
+                self.logger.error("Job failed.", exc_info=True)
+                return e
+        with ThreadPoolExecutor(max_workers=self.size) as ex:
+            return list(ex.map(run_job, jobs))
+
+    def close(self):
+        """
+            Closes all idle sessions.
+        """
+        while True:
+            try:
+                bot = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(bot, recycle=False)
+
+    def stats(self):
+        """
+            Returns dict with pool stats, including the estimated startup time saved by reusing sessions.
+        """
+        avg_startup = self.startup_time / self.startups if self.startups else 0.0
+        return {"jobs": self.jobs_run, "startups": self.startups, "recycled": self.recycled,
+                "avg_startup_s": avg_startup, "saved_s": max(0, self.jobs_run - self.startups) * avg_startup}
@@ -1,15 +1,110 @@
 """
     Misc utility for the bot
 """
-import time, random
+import time, random, threading
 
 
+### Clocks ###
+class RealClock:
+    """
+        Waits in real time. Keeps track of the intended waits (like the other clocks).
+    """
+
+    def __init__(self):
+        self.waits = list() # Intended wait durations (seconds), in order
+        self.record = True
+
+    def now(self):
+        return time.monotonic()
+
+    def _wait(self, t):
+        time.sleep(t)
+
+    def sleep(self, t):
+        t = max(0.0, t)
+        if self.record:
+            self.waits.append(t)
+        self._wait(t)
+
+    def total_wait(self):
+        """
+            Returns the total intended waiting time (seconds).
+        """
+        return sum(self.waits)
+
+
+class CompressedClock(RealClock):
+    """
+        Waits factor times shorter than intended; now() reports intended (uncompressed) time.
+    """
+
+    def __init__(self, factor=10.0):
+        super().__init__()
+        self.factor = factor
+        self._start = time.monotonic()
+
+    def now(self):
+        return self._start + (time.monotonic() - self._start) * self.factor
+
+    def _wait(self, t):
+        time.sleep(t / self.factor)
+
+
+class VirtualClock(RealClock):
+    """
+        Doesn't wait at all: advances a virtual time instantly, while still recording the intended waits.
+    """
+
+    def __init__(self, start=0.0):
+        super().__init__()
+        self._now = start
+
+    def now(self):
+        return self._now
+
+    def _wait(self, t):
+        self._now += t
+
+
+_clock = RealClock()
+_clock.record = False # Don't accumulate waits for long real runs unless asked to
+
+def set_clock(clock):
+    """
+        Sets the clock used by all bot waits. Returns the previous clock.
+    """
+    global _clock
+    prev = _clock
+    _clock = clock
+    return prev
+
+def get_clock():
+    return _clock
+
+_waited = threading.local() # Real time spent in sleep() per thread (bots run one per thread/process)
+
+def sleep(t):
+    """
+        Waits t seconds according to the current clock.
+    """
+    t0 = time.perf_counter()
+    _clock.sleep(t)
+    _waited.total = waited() + time.perf_counter() - t0
+
+def waited():
+    """
+        Returns the real time (seconds) this thread has spent in intentional waits so far.
+    """
+    return getattr(_waited, "total", 0.0)
+
+
+### Waiting ###
 def random_wait(t, sdev=0.2, min_t=None):
     """
         Waits a random amount of seconds (normal distribution according to given params)
     """
     min_t = min_t or (t/2.0)
-    time.sleep(max(min_t, random.normalvariate(t, sdev)))
+    sleep(max(min_t, random.normalvariate(t, sdev)))
 
 def emulate_keystrokes(el, text):
     """
@@ -18,4 +113,31 @@ def emulate_keystrokes(el, text):
     SPC = 1.0/7.25 # Assumes ~7 keystrokes per second on average
     for c in text:
         el.send_keys(c)
-        random_wait(t=SPC, sdev=0.075, min_t=SPC/3.0)
\ No newline at end of file
+        random_wait(t=SPC, sdev=0.075, min_t=SPC/3.0)
+
+
+class RoundTripCounter:
+    """
+        Counts WebDriver commands (HTTP round trips) sent through a driver.
+        Usable as a context manager; every command, including WebElement calls, goes through driver.execute.
+    """
+
+    def __init__(self, driver):
+        self._driver = driver
+        self._execute = None
+        self.count = 0
+        self.commands = dict()
+
+    def __enter__(self):
+        self._execute = self._driver.execute
+        def counted_execute(driver_command, params=None):
+            self.count += 1
+            self.commands[driver_command] = self.commands.get(driver_command, 0) + 1
+            return self._execute(driver_command, params)
+        self._driver.execute = counted_execute
+        return self
+
+    def __exit__(self, *exc):
+        # Restore the original (class) method
+        del self._driver.execute
+        return False
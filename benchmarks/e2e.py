@@ -0,0 +1,66 @@
+"""
+    End-to-end scraping benchmark against the local stand-in site (benchmarks.fakesite), in headless Chrome.
+    Runs the regular browse modes on a compressed clock and reports videos/minute,
+    WebDriver round trips per video and selector timeouts per mode.
+
+    Usage: python -m benchmarks.e2e [n] [mode ...]     (modes: tag, creator, fyp, query, tag-harvest, creator-harvest)
+"""
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from TikTokBot import PUPPET_TYPES, get_chrome_options
+from TikTokBot.utils import CompressedClock, RoundTripCounter, set_clock
+from benchmarks.fakesite import FakeSite
+import sys, time
+
+DRIVER_PATH = "./drivers/chromedriver"
+CLOCK_FACTOR = 20.0
+MODES = ["tag", "creator", "fyp", "query", "tag-harvest", "creator-harvest"]
+
+
+def run_mode(puppet, site, mode, n):
+    if mode == "tag":
+        puppet.browse_tag("fyp", n=n)
+    elif mode == "creator":
+        puppet.browse_creator(site.rows[0]["creator"], n=n)
+    elif mode == "fyp":
+        puppet.browse_fyp(n=n)
+    elif mode == "tag-harvest":
+        puppet.browse_tag("fyp", n=n, harvest=True)
+    elif mode == "creator-harvest":
+        puppet.browse_creator(site.rows[0]["creator"], n=n, harvest=True)
+    elif mode == "query":
+        puppet._driver.get(puppet.base_url)
+        puppet.browse_query(n=n)
+
+def total_misses(puppet):
+    return sum(s["misses"] for s in puppet.selectors.stats().values())
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    modes = sys.argv[2:] or MODES
+
+    site = FakeSite(captcha_rate=0.02, warning_rate=0.05).start()
+    set_clock(CompressedClock(CLOCK_FACTOR))
+
+    options = get_chrome_options(user_dir="./users/bench", incognito=True)
+    options.add_argument("--headless=new")
+    driver = webdriver.Chrome(service=Service(DRIVER_PATH), options=options)
+    puppet = PUPPET_TYPES[1](driver, "BENCH", profile_file="./profile_AV.json", output_file="./bench_out.csv")
+    puppet.set_base_url(site.url)
+
+    print(f"{'mode':<9}{'videos':>8}{'wall s':>8}{'vid/min':>9}{'RT/vid':>8}{'timeouts':>10}{'requests':>10}")
+    try:
+        for mode in modes:
+            written, misses, requests = puppet.videos_written, total_misses(puppet), site.requests
+            t0 = time.perf_counter()
+            with RoundTripCounter(driver) as rt:
+                run_mode(puppet, site, mode, n)
+            elapsed = time.perf_counter() - t0
+            videos = puppet.videos_written - written
+            print(f"{mode:<9}{videos:>8}{elapsed:>8.1f}{videos / elapsed * 60:>9.1f}{rt.count / max(videos, 1):>8.1f}"
+                  f"{total_misses(puppet) - misses:>10}{site.requests - requests:>10}")
+    finally:
+        puppet.close_output()
+        driver.quit()
+        site.stop()
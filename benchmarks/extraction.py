@@ -0,0 +1,49 @@
+"""
+    Compares per-video cost of script-based and per-field VideoInfo extraction.
+    Requires a live session: opens a tag page and measures both paths on the same videos.
+
+    Usage: python -m benchmarks.extraction [tag] [n]
+"""
+from TikTokBot import setup_anon_puppet
+from TikTokBot.utils import RoundTripCounter, random_wait
+import sys, time
+
+DRIVER_PATH = "./drivers/chromedriver"
+
+
+def measure(bot, n):
+    """
+        Returns per-path lists of (round trips, seconds) for the next n videos.
+    """
+    results = {"script": list(), "fields": list()}
+    for _ in range(n):
+        for mode in results:
+            bot.set_script_extraction(mode == "script")
+            with RoundTripCounter(bot._driver) as rtc:
+                t0 = time.perf_counter()
+                bot.collect_open_video_info()
+                elapsed = time.perf_counter() - t0
+            results[mode].append((rtc.count, elapsed))
+        if not bot.next_video():
+            break
+        random_wait(0.5, sdev=0.1, min_t=0.15)
+    return results
+
+
+if __name__ == "__main__":
+    tag = sys.argv[1] if len(sys.argv) > 1 else "fyp"
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    bot = setup_anon_puppet(DRIVER_PATH, profile_file="./profile_AV.json", output_file="./bench_out.csv")
+    bot._driver.get(f"http://tiktok.com/tag/{tag}")
+    random_wait(1.0)
+    bot.close_cookie_banner()
+    bot._wait_el_by_xpath("/html/body/div[2]/div[2]/div[2]/div/div[2]/div/div[1]/div[1]/div/div/a").click()
+    random_wait(1.0)
+
+    results = measure(bot, n)
+    for mode, rows in results.items():
+        trips = sum(r[0] for r in rows) / len(rows)
+        secs = sum(r[1] for r in rows) / len(rows)
+        print(f"{mode:>7}: {trips:6.1f} round trips/video, {secs:6.3f}s/video ({len(rows)} videos)")
+    bot._driver.quit()
@@ -0,0 +1,153 @@
+"""
+    Minimal stand-in for a Selenium driver, serving a feed of collected VideoInfo rows.
+    Understands the scripts the bot sends (VIDEO_INFO_SCRIPT, PAGE_STATE_SCRIPT, PROBE_SCRIPT, ...),
+    so browse loops can run without a browser. Counts commands like a real driver would send them.
+"""
+from selenium.common.exceptions import NoSuchElementException
+from TikTokBot.bot import VIDEO_INFO_SCRIPT, PAGE_STATE_SCRIPT, GRID_LINKS_SCRIPT
+from TikTokBot.locators import PROBE_SCRIPT
+import ast, csv, glob, re
+
+
+def load_feed(pattern="./data/AV/*.csv", limit=None):
+    """
+        Returns list of dicts (VIDEO_INFO_SCRIPT format) from collected CSV files.
+    """
+    feed = list()
+    for fname in sorted(glob.glob(pattern)):
+        with open(fname, 'r', encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                feed.append({"vid": row["v_id"], "creator": row["creator"], "desc": row["desc"],
+                             "tags": ast.literal_eval(row["tags"]), "duration": float(row["duration"]),
+                             "sound": row["sound"], "likes": row["likes"], "comments": row["comments"], "hits": dict()})
+                if limit is not None and len(feed) >= limit:
+                    return feed
+    return feed
+
+
+class FakeElement:
+
+    def __init__(self, driver, name=None):
+        self._driver = driver
+        self.name = name
+        self.text = "Follow"
+
+    def click(self):
+        self._driver.commands += 1
+        if self.name == "next":
+            self._driver.ix = min(self._driver.ix + 1, len(self._driver.feed) - 1)
+        elif self.name == "prev":
+            self._driver.ix = max(self._driver.ix - 1, 0)
+
+    def find_element(self, by=None, value=None):
+        self._driver.commands += 1
+        return FakeElement(self._driver)
+
+    def find_elements(self, by=None, value=None):
+        self._driver.commands += 1
+        return list()
+
+    def get_attribute(self, name):
+        self._driver.commands += 1
+        return "#fff"
+
+    def get_property(self, name):
+        self._driver.commands += 1
+        return self
+
+
+class FakeSwitchTo:
+
+    def __init__(self, driver):
+        self._driver = driver
+
+    def window(self, handle):
+        self._driver.commands += 1
+        self._driver.current_window_handle = handle
+
+    def new_window(self, kind="tab"):
+        self._driver.commands += 1
+        handle = f"tab{len(self._driver.tabs)}"
+        self._driver.tabs[handle] = 0
+        self._driver.current_window_handle = handle
+
+    def default_content(self):
+        self._driver.commands += 1
+
+
+class FakeDriver:
+
+    def __init__(self, feed):
+        self.feed = feed
+        self.tabs = {"tab0": 0} # window handle -> index of the open video
+        self.current_window_handle = "tab0"
+        self.switch_to = FakeSwitchTo(self)
+        self.commands = 0
+
+    @property
+    def ix(self):
+        return self.tabs[self.current_window_handle]
+
+    @ix.setter
+    def ix(self, value):
+        self.tabs[self.current_window_handle] = value
+
+    @property
+    def window_handles(self):
+        return list(self.tabs.keys())
+
+    def close(self):
+        self.commands += 1
+        del self.tabs[self.current_window_handle]
+
+    @property
+    def current_url(self):
+        self.commands += 1
+        v = self.feed[self.ix]
+        return f"https://www.tiktok.com/@{v['creator']}/video/{v['vid']}"
+
+    def get(self, url):
+        self.commands += 1
+
+    def find_element(self, by=None, value=None):
+        self.commands += 1
+        if value == "tiktok-cookie-banner":
+            return FakeElement(self, "cookie_banner")
+        raise NoSuchElementException(value)
+
+    def find_elements(self, by=None, value=None):
+        self.commands += 1
+        return list()
+
+    def execute_script(self, script, *args):
+        self.commands += 1
+        if script == VIDEO_INFO_SCRIPT:
+            return dict(self.feed[self.ix])
+        if script == PAGE_STATE_SCRIPT:
+            return dict()
+        if script == GRID_LINKS_SCRIPT:
+            return [f"https://www.tiktok.com/@{v['creator']}/video/{v['vid']}" for v in self.feed]
+        if script.startswith("window.location.href"):
+            vid = re.search(r"/video/(\d+)", args[0]).group(1)
+            self.ix = next(i for i, v in enumerate(self.feed) if v["vid"] == vid)
+            return None
+        if script == PROBE_SCRIPT:
+            name = {"next_btn": "next", "prev_btn": "prev"}
+            paths = args[0]
+            from TikTokBot.locators import SELECTORS
+            for n, ps in SELECTORS.items():
+                if paths[0] in ps:
+                    return [0, FakeElement(self, name.get(n, n))]
+            return [0, FakeElement(self)]
+        return None
+
+    def execute_async_script(self, script, *args):
+        self.commands += 1
+        return True
+
+    def get_log(self, kind):
+        self.commands += 1
+        return list()
+
+    def quit(self):
+        pass
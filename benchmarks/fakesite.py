@@ -0,0 +1,222 @@
+"""
+    Local stand-in for the TikTok web app, serving collected VideoInfo rows.
+    Pages follow the XPaths/selectors in TikTokBot.locators (FYP, tag, creator, search & video pages),
+    and include the cookie banner, captcha element, content warnings and the feed JSON API.
+
+    Usage: python -m benchmarks.fakesite [port]
+"""
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, quote, unquote
+from html import escape
+import ast, csv, glob, json, random, re, threading, time
+
+
+def load_rows(pattern="./data/*/*_out.csv"):
+    """
+        Returns collected VideoInfo rows (dicts) to serve, without duplicates.
+    """
+    rows, seen = list(), set()
+    for fname in sorted(glob.glob(pattern)):
+        with open(fname, 'r', encoding="utf-8") as f:
+            for r in csv.DictReader(f):
+                if r["v_id"] in seen:
+                    continue
+                seen.add(r["v_id"])
+                r["tags"] = ast.literal_eval(r["tags"])
+                rows.append(r)
+    return rows
+
+
+### HTML ###
+def nest(segments, inner):
+    """
+        Wraps inner in elements following XPath steps (e.g. ["div[2]", "div", "a"]),
+        padding with empty siblings so that positional indices match.
+    """
+    html = inner
+    for seg in reversed(segments):
+        m = re.match(r"(\w+)(?:\[(\d+)\])?", seg)
+        tag, ix = m.group(1), int(m.group(2) or 1)
+        html = f"<{tag}></{tag}>" * (ix - 1) + f"<{tag}>{html}</{tag}>"
+    return html
+
+HEADER = '<div><div><div><form action="/search"><input name="q" placeholder="Search"></form></div><div><button>Log in</button></div></div></div>'
+
+COMMON_JS = """
+customElements.define('tiktok-cookie-banner', class extends HTMLElement {
+    constructor() {
+        super();
+        const root = this.attachShadow({mode: 'open'});
+        root.innerHTML = '<button>Decline optional cookies</button><button>Accept all</button>';
+        root.querySelectorAll('button').forEach((b) => b.onclick = () => { document.cookie = 'cookies=1;path=/'; this.remove(); });
+    }
+});
+"""
+
+def page(body, show_banner, show_captcha, script=""):
+    banner = "<tiktok-cookie-banner></tiktok-cookie-banner>" if show_banner else ""
+    captcha = ('<section id="tiktok-verify-ele">Verify to continue</section>'
+               '<script>setTimeout(() => document.getElementById("tiktok-verify-ele").style.display = "none", 1500);</script>'
+               if show_captcha else '<section id="tiktok-verify-ele" style="display:none"></section>')
+    return (f"<!DOCTYPE html><html><head><meta charset='utf-8'><script>{COMMON_JS}</script></head>"
+            f"<body><div></div><div>{HEADER}<div>{body}</div></div>{banner}{captcha}<script>{script}</script></body></html>")
+
+def video_url(row, ctx, i):
+    return f"/@{quote(row['creator'])}/video/{row['v_id']}?ctx={quote(ctx)}&i={i}"
+
+def grid(segments, rows, ctx, first=1, item=("div[1]", "div", "div", "a")):
+    """
+        Grid of video links: container at segments (relative to body/div[2]/div[2]), items from div[first] on.
+    """
+    items = "<div></div>" * (first - 1)
+    for i, r in enumerate(rows):
+        items += "<div>" + nest(list(item[:-1]), f'<a href="{video_url(r, ctx, i)}">{escape(r["desc"][:30])}</a>') + "</div>"
+    return nest(segments, items)
+
+def video_page(row, ctx, i, next_url, warning):
+    tags = "".join(f'<a href="/tag/{quote(t[1:])}"><strong>{escape(t)}</strong></a> ' for t in row["tags"])
+    controls = '<button>x</button><button onclick="history.back()">up</button>'
+    if next_url is not None:
+        controls += f'<button onclick="location.href=\'{next_url}\'">down</button>'
+    warning_style = "" if warning else ' style="display:none"'
+    player = ("<div><div><video></video></div></div><div></div><div></div><div></div>"
+              f'<div id="warning"{warning_style}><div><div></div><div><button>Back</button>'
+              '<button onclick="document.getElementById(\'warning\').style.display=\'none\'">Watch anyway</button></div></div></div>')
+    info = (f'<div><a href="/@{quote(row["creator"])}">avatar</a><a href="/@{quote(row["creator"])}"><span>{escape(row["creator"])}</span><span></span></a>'
+            '<button onclick="this.innerText = (this.innerText == \'Follow\') ? \'Following\' : \'Follow\'">Follow</button></div>'
+            f'<div><div><span>{escape(row["desc"])}</span> {tags}</div><h4><a href="/music">{escape(row["sound"])}</a></h4>'
+            '<div><div><div><button onclick="const s = this.querySelector(\'svg\'); s.setAttribute(\'fill\', s.getAttribute(\'fill\') == \'#fff\' ? \'rgba(254, 44, 85, 1)\' : \'#fff\')">'
+            f'<svg fill="#fff"></svg><strong>{row["likes"]}</strong></button><button><strong>{row["comments"]}</strong></button></div></div></div></div>')
+    body = nest(["div[3]"], f"<div>{controls}<div></div><div>{player}</div></div><div>{info}</div>")
+    # The <video> has no source; duration & playback state come from the data
+    script = (f"const v = document.querySelector('video');"
+              f"Object.defineProperty(v, 'duration', {{get: () => {float(row['duration'])}}});"
+              "Object.defineProperty(v, 'readyState', {get: () => 4});"
+              "Object.defineProperty(v, 'paused', {get: () => false});"
+              f"fetch('/api/recommend/item_list/?ctx={quote(ctx)}&cursor={i - i % 6}');")
+    return body, script
+
+def api_item(r):
+    title, _, author = r["sound"].partition(" - ")
+    return {"id": r["v_id"], "desc": (r["desc"] + " " + " ".join(r["tags"])).strip(),
+            "video": {"id": r["v_id"], "duration": round(float(r["duration"]))},
+            "author": {"uniqueId": r["creator"]}, "music": {"title": title, "authorName": author},
+            "challenges": [{"title": t[1:]} for t in r["tags"] if t.startswith("#")],
+            "textExtra": [{"hashtagName": t[1:]} if t.startswith("#") else {"userUniqueId": t[1:]} for t in r["tags"]],
+            "stats": {"diggCount": int(r["likes"] or 0), "commentCount": int(r["comments"] or 0)}}
+
+
+### Server ###
+class FakeSite:
+    """
+        Serves the stand-in site from a background thread.
+
+        Parameters:
+            captcha_rate, warning_rate (float): share of video pages showing a captcha/content warning
+            latency (float): seconds of delay added to every request
+    """
+
+    def __init__(self, rows=None, port=8765, captcha_rate=0.0, warning_rate=0.05, latency=0.0, seed=0):
+        self.rows = rows if rows is not None else load_rows()
+        self.port = port
+        self.captcha_rate = captcha_rate
+        self.warning_rate = warning_rate
+        self.latency = latency
+        self.requests = 0
+        self._rand = random.Random(seed)
+        self._server = None
+
+    @property
+    def url(self):
+        return f"http://localhost:{self.port}"
+
+    def feed(self, ctx):
+        """
+            Returns the rows for a context (fyp, tag:<t>, creator:<c>, search:<q>).
+        """
+        kind, _, key = ctx.partition(":")
+        key = key.lower()
+        if kind == "tag":
+            rows = [r for r in self.rows if f"#{key}" in (t.lower() for t in r["tags"])]
+        elif kind == "creator":
+            rows = [r for r in self.rows if r["creator"].lower() == key]
+        elif kind == "search":
+            rows = [r for r in self.rows if key in r["desc"].lower() or any(key in t.lower() for t in r["tags"])]
+        else:
+            rows = self.rows
+        return rows if len(rows) else self.rows
+
+    def render(self, path, query, cookies):
+        """
+            Returns (status, content type, body) for a request.
+        """
+        banner = "cookies=1" not in cookies
+        if path.startswith("/api/"):
+            ctx = query.get("ctx", ["fyp"])[0]
+            cursor = int(query.get("cursor", ["0"])[0])
+            items = self.feed(ctx)[cursor:cursor + 6]
+            return 200, "application/json", json.dumps({"statusCode": 0, "itemList": [api_item(r) for r in items], "hasMore": True})
+        if "/video/" in path:
+            ctx = query.get("ctx", ["fyp"])[0]
+            i = int(query.get("i", ["0"])[0])
+            rows = self.feed(ctx)
+            row = next((r for r in rows if r["v_id"] == path.rsplit("/", 1)[1]), rows[min(i, len(rows) - 1)])
+            next_url = video_url(rows[i + 1], ctx, i + 1) if i + 1 < len(rows) else None
+            body, script = video_page(row, ctx, i, next_url, self._rand.random() < self.warning_rate)
+            return 200, "text/html", page(body, banner, self._rand.random() < self.captcha_rate, script)
+        if path in ("/", "/foryou"):
+            rows = self.feed("fyp")
+            first = f'<div onclick="location.href=\'{video_url(rows[0], "fyp", 0)}\'">{escape(rows[0]["desc"][:30])}</div>'
+            body = nest(["div[2]", "div[1]", "div[1]", "div", "div[2]", "div[1]"], first)
+            return 200, "text/html", page(body, banner, False)
+        if path.startswith("/tag/"):
+            ctx = "tag:" + unquote(path[len("/tag/"):])
+            return 200, "text/html", page(grid(["div[2]", "div", "div[2]", "div"], self.feed(ctx), ctx), banner, False)
+        if path.startswith("/search"):
+            ctx = "search:" + query.get("q", [""])[0]
+            return 200, "text/html", page(grid(["div[2]", "div[2]", "div[1]", "div"], self.feed(ctx), ctx, first=2), banner, False)
+        if path.startswith("/@"):
+            ctx = "creator:" + unquote(path[2:])
+            return 200, "text/html", page(grid(["div[2]", "div", "div[2]", "div[2]", "div"], self.feed(ctx), ctx), banner, False)
+        return 404, "text/plain", "Not found"
+
+    def start(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                site.requests += 1
+                if site.latency:
+                    time.sleep(site.latency)
+                url = urlparse(self.path)
+                status, ctype, body = site.render(url.path, parse_qs(url.query), self.headers.get("Cookie", ""))
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", f"{ctype}; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("localhost", self.port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+if __name__ == "__main__":
+    import sys
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    site = FakeSite(port=port).start()
+    print(f"Serving {len(site.rows)} videos on {site.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        site.stop()
@@ -0,0 +1,93 @@
+"""
+    Compares the previous row-by-row topic_presence/feature_diversity with the sparse versions in
+    TikTokBot.metrics, on a synthetic feed (Zipf-distributed creators, sounds & tags).
+    The new versions are timed on the DataFrame (topic_presence builds a FeedMatrix from it, feature_diversity
+    evaluates it directly) and on a prebuilt FeedMatrix.
+
+    Usage: python -m benchmarks.feed_metrics [rows] [topics]
+"""
+from TikTokBot.metrics import topic_presence, feature_diversity
+from TikTokBot.feedmatrix import FeedMatrix
+import numpy as np
+import pandas as pd
+import sys, time
+
+FEATURES = ["creator", "sound", "tags"]
+
+
+### Previous implementations (per row, one topic/feature per call) ###
+
+def legacy_feature_diversity(feed, feature="creator"):
+    if not isinstance(feed[feature][0], list):
+        return len(feed[feature].unique()) / len(feed)
+    else:
+        all_items = [i for l in feed[feature] for i in l]
+        return len(set(all_items)) / len(all_items)
+
+def legacy_topic_presence(feed, topic_tags, threshold=1):
+    relevant_count = 0
+    for ix, post in feed.iterrows():
+        if len(topic_tags & set(post["tags"])) >= threshold:
+            relevant_count += 1
+    return relevant_count / len(feed)
+
+
+### Synthetic data ###
+
+def zipf_choice(rng, n_values, size, a=1.3):
+    return (rng.zipf(a, size=size) - 1) % n_values
+
+def synthetic_feed(n, seed=0, n_creators=50000, n_sounds=20000, n_tags=30000, max_tags=8):
+    """
+        Returns DataFrame of n VideoInfo-like rows (tags as lists of '#tag' strings, like prep_vidinfo output).
+    """
+    rng = np.random.default_rng(seed)
+    tag_names = np.array([f"#tag{i}" for i in range(n_tags)], dtype=object)
+    counts = rng.integers(0, max_tags + 1, size=n)
+    flat = tag_names[zipf_choice(rng, n_tags, counts.sum())]
+    bounds = np.cumsum(counts)[:-1]
+    return pd.DataFrame({
+        "v_id": np.arange(n),
+        "creator": np.array([f"creator{i}" for i in range(n_creators)], dtype=object)[zipf_choice(rng, n_creators, n)],
+        "sound": np.array([f"sound{i}" for i in range(n_sounds)], dtype=object)[zipf_choice(rng, n_sounds, n)],
+        "tags": [list(t) for t in np.split(flat, bounds)],
+    })
+
+def synthetic_topics(k, seed=1, n_tags=30000, size=12):
+    rng = np.random.default_rng(seed)
+    return {f"topic{i}": {f"#tag{t}" for t in rng.choice(n_tags // 10, size=size, replace=False)} for i in range(k)}
+
+
+def timed(f):
+    t0 = time.perf_counter()
+    res = f()
+    return res, time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    feed, t_gen = timed(lambda: synthetic_feed(n))
+    topics = synthetic_topics(k)
+    print(f"Synthetic feed: {n} rows, {feed['tags'].map(len).sum()} tags, {k} topics ({t_gen:.1f}s to generate)")
+
+    old_div, t_old_div = timed(lambda: {f: legacy_feature_diversity(feed, f) for f in FEATURES})
+    new_div, t_new_div = timed(lambda: feature_diversity(feed, FEATURES))
+    old_top, t_old_top = timed(lambda: {name: legacy_topic_presence(feed, tags, threshold=2) for name, tags in topics.items()})
+    new_top, t_new_top = timed(lambda: topic_presence(feed, topics, threshold=2))
+    fm, t_build = timed(lambda: FeedMatrix.from_frame(feed, FEATURES))
+    _, t_fm_div = timed(lambda: feature_diversity(fm, FEATURES))
+    _, t_fm_top = timed(lambda: topic_presence(fm, topics, threshold=2))
+
+    # Both versions must agree
+    for f in FEATURES:
+        assert abs(old_div[f] - new_div.loc[f, "diversity"]) < 1e-9, f
+    for name in topics:
+        assert abs(old_top[name] - new_top.loc[name, "presence"]) < 1e-9, name
+
+    print(f"FeedMatrix built in {t_build:.2f}s")
+    print(f"{'metric':<20}{'old s':>10}{'new s':>10}{'speedup':>10}{'prebuilt s':>12}{'speedup':>10}")
+    for name, t_old, t_new, t_fm in (("feature_diversity", t_old_div, t_new_div, t_fm_div),
+                                     ("topic_presence", t_old_top, t_new_top, t_fm_top)):
+        print(f"{name:<20}{t_old:>10.2f}{t_new:>10.2f}{t_old / t_new:>9.1f}x{t_fm:>12.3f}{t_old / t_fm:>9.1f}x")
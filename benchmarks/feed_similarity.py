@@ -0,0 +1,58 @@
+"""
+    Compares all-pairs feed similarity through the previous set-based jaccard_index (one call per pair)
+    with metrics.feed_similarity (sparse products, serial and with worker processes) on synthetic feeds.
+
+    Usage: python -m benchmarks.feed_similarity [feeds] [videos per feed] [workers]
+"""
+from TikTokBot.metrics import feed_similarity
+from benchmarks.feed_metrics import synthetic_feed
+import numpy as np
+import sys, time
+
+FEATURES = ["v_id", "creator", "sound", "tags"]
+
+
+def legacy_jaccard_index(f1, f2, feature="v_id"):
+    if isinstance(f1[feature].iloc[0], list):
+        f1_items, f2_items = {i for l in f1[feature] for i in l}, {i for l in f2[feature] for i in l}
+    else:
+        f1_items, f2_items = set(f1[feature]), set(f2[feature])
+    return len(f1_items & f2_items) / len(f1_items | f2_items)
+
+def synthetic_feeds(n_feeds, per_feed, seed=0):
+    """
+        Returns dict of n_feeds feeds, drawing (overlapping) videos from a shared synthetic pool.
+    """
+    pool = synthetic_feed(n_feeds * per_feed // 4, seed=seed)
+    rng = np.random.default_rng(seed)
+    return {f"P{i % 10}_day{i // 10}": pool.iloc[rng.integers(0, len(pool), size=per_feed)].reset_index(drop=True)
+            for i in range(n_feeds)}
+
+
+if __name__ == "__main__":
+    n_feeds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    per_feed = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+
+    feeds = synthetic_feeds(n_feeds, per_feed)
+    labels = list(feeds)
+    print(f"{n_feeds} feeds x {per_feed} videos, {n_feeds * (n_feeds - 1) // 2} pairs per feature")
+
+    t0 = time.perf_counter()
+    legacy = {f: [[legacy_jaccard_index(feeds[a], feeds[b], f) for b in labels] for a in labels] for f in FEATURES}
+    t_legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    serial = feed_similarity(feeds, FEATURES, workers=1)
+    t_serial = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    parallel = feed_similarity(feeds, FEATURES, workers=workers)
+    t_parallel = time.perf_counter() - t0
+
+    for f in FEATURES:
+        assert np.allclose(serial.loc[f].to_numpy(), np.array(legacy[f])), f
+        assert np.allclose(parallel.loc[f].to_numpy(), serial.loc[f].to_numpy()), f
+    print(f"{'pairwise sets':<22}{t_legacy:>8.2f}s")
+    print(f"{'sparse (1 process)':<22}{t_serial:>8.2f}s{t_legacy / t_serial:>8.1f}x")
+    print(f"{f'sparse ({workers} processes)':<22}{t_parallel:>8.2f}s{t_legacy / t_parallel:>8.1f}x")
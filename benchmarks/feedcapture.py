@@ -0,0 +1,27 @@
+"""
+    Offline benchmark of the feed JSON parser, using the recorded item lists in data/fixtures.
+
+    Usage: python -m benchmarks.feedcapture [repeats]
+"""
+from TikTokBot.feedcapture import parse_feed_response
+import glob, sys, time
+
+FIXTURES = "./data/fixtures/*item_list*.json"
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    bodies = list()
+    for fname in sorted(glob.glob(FIXTURES)):
+        with open(fname, 'r') as f:
+            bodies.append(f.read())
+
+    n_items = 0
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        for b in bodies:
+            n_items += len(parse_feed_response(b))
+    elapsed = time.perf_counter() - t0
+    print(f"Parsed {n_items} items from {len(bodies)} fixtures x {repeats} in {elapsed:.3f}s "
+          f"({elapsed / n_items * 1e6:.1f} us/item)")
@@ -0,0 +1,81 @@
+"""
+    Harvest mode on a fake driver whose video pages fail to load at a given rate (the metadata comes back invalid),
+    with and without the link margin & grid top-ups. Reports the videos collected per run and the throughput.
+
+    Usage: python -m benchmarks.harvest [n] [runs]
+"""
+from TikTokBot import PUPPET_TYPES
+from TikTokBot.utils import VirtualClock, set_clock
+from benchmarks.fakedriver import FakeDriver, load_feed
+from TikTokBot.bot import VIDEO_INFO_SCRIPT, GRID_LINKS_SCRIPT
+import logging, random, sys
+
+FAILURE_RATES = [0.0, 0.05, 0.1, 0.2, 0.3]
+GRID_PAGE = 30 # Links the grid loads per scroll
+LOAD_TIME = 3.0 # Seconds until a video page opened in a tab can be read
+
+
+class FlakyDriver(FakeDriver):
+    """
+        Fake driver on which a share of the video pages (fixed per video) doesn't load properly,
+        and whose grid loads GRID_PAGE more links per scroll. Tabs take LOAD_TIME (on the virtual clock) to load.
+    """
+
+    def __init__(self, feed, failure_rate, clock, seed=0):
+        super().__init__(feed)
+        self.clock = clock
+        self.ready = dict() # window handle -> time its page has loaded
+        rng = random.Random(seed)
+        self.broken = {v["vid"] for v in feed if rng.random() < failure_rate}
+        self.scrolls = 0
+        self.grid_loads = 0
+
+    def get(self, url):
+        super().get(url)
+        self.scrolls = 0
+        self.grid_loads += 1
+
+    def execute_script(self, script, *args):
+        if script == GRID_LINKS_SCRIPT:
+            self.commands += 1
+            self.scrolls += 1
+            return [f"https://www.tiktok.com/@{v['creator']}/video/{v['vid']}"
+                    for v in self.feed[:self.scrolls * GRID_PAGE]]
+        if script.startswith("window.location.href"):
+            self.ready[self.current_window_handle] = self.clock.now() + LOAD_TIME
+        if script == VIDEO_INFO_SCRIPT:
+            self.clock.sleep(max(0.0, self.ready.get(self.current_window_handle, 0.0) - self.clock.now()))
+        res = super().execute_script(script, *args)
+        if script == VIDEO_INFO_SCRIPT and res["vid"] in self.broken:
+            res["duration"] = None
+        return res
+
+
+def harvest(feed, failure_rate, n, margin, max_rounds, seed):
+    clock = VirtualClock()
+    set_clock(clock)
+    driver = FlakyDriver(feed, failure_rate, clock, seed)
+    puppet = PUPPET_TYPES[0](driver, "AV0", profile_file="./profile_AV.json", output_file="./sim_out.csv")
+    puppet.harvest_margin = margin
+    puppet.checkpointing = False
+    puppet._harvest("https://www.tiktok.com/tag/fyp", n, kind="tag", max_rounds=max_rounds)
+    puppet.close_output()
+    return puppet.videos_written, clock.now(), driver.grid_loads
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    logging.getLogger('Bot').addHandler(logging.NullHandler())
+
+    feed = load_feed()
+    print(f"{runs} harvest runs of {n} videos from a grid of {len(feed)}")
+    print(f"{'failure rate':<14}{'mode':<16}{'videos/run':>12}{'complete':>10}{'grid loads':>12}{'videos/min':>12}")
+    for rate in FAILURE_RATES:
+        for mode, margin, rounds in (("exact links", 0.0, 1), ("margin+top-up", 0.25, 3)):
+            res = [harvest(feed, rate, n, margin, rounds, seed) for seed in range(runs)]
+            videos = sum(r[0] for r in res)
+            complete = sum(r[0] >= n for r in res)
+            loads = sum(r[2] for r in res) / runs
+            per_min = videos / (sum(r[1] for r in res) / 60)
+            print(f"{rate:<14.2f}{mode:<16}{videos / runs:>12.1f}{complete:>6}/{runs:<3}{loads:>12.1f}{per_min:>12.1f}")
@@ -0,0 +1,96 @@
+"""
+    Runs an experiment round through the job queue (TikTokBot.orchestrator) with fake drivers on a virtual clock,
+    and checks leases, retries & output: an expired lease is reclaimed, an aborted run fails its job, the retry
+    skips finished steps & resumes the aborted one (each puppet ends up with exactly n rows) and a job that
+    keeps failing ends up 'failed' after max_attempts.
+
+    Usage: python -m benchmarks.job_queue [n]
+"""
+from TikTokBot.orchestrator import JobQueue, work, format_report
+from TikTokBot.puppets import PuppetPassive
+from TikTokBot.utils import VirtualClock, set_clock
+from benchmarks.fakedriver import FakeDriver, load_feed
+import csv, os, sys, time, tempfile, logging
+
+
+class FlakyPuppet(PuppetPassive):
+    """
+        Passive puppet whose runs break down (the run catches the error & aborts) once it wrote fail_after videos:
+        fail = "always", or "once" (the first time, using a marker file).
+    """
+
+    def __init__(self, driver, puppet_id, fail=None, fail_after=0, marker=None, **kwargs):
+        super().__init__(driver, puppet_id, **kwargs)
+        self.fail = fail
+        self.fail_after = fail_after
+        self.marker = marker
+
+    def write_vidinfo(self, vi, header=False):
+        if self.videos_written >= self.fail_after:
+            if self.fail == "always" or (self.fail == "once" and not os.path.exists(self.marker)):
+                if self.marker is not None:
+                    open(self.marker, "w").close()
+                raise RuntimeError("Simulated crash")
+        super().write_vidinfo(vi, header=header)
+
+
+def fake_puppet_factory(spec):
+    return FlakyPuppet(FakeDriver(load_feed()), spec["id"], fail=spec.get("fail"), fail_after=spec.get("fail_after", 0),
+                       marker=spec.get("marker"), profile_file="./profile_AV.json", output_file=spec["output_file"])
+
+def count_rows(fname):
+    if not os.path.exists(fname):
+        return 0, 0
+    with open(fname, 'r', encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    return len(rows) - 1, sum(r[0] == "v_id" for r in rows)
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    set_clock(VirtualClock())
+    logging.getLogger('Bot').addHandler(logging.NullHandler()) # The crashes are expected
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out = {p: os.path.join(tmp, f"{p}_out.csv") for p in ("AV1", "AV2", "AV3")}
+        browse = {"action": "browse_fyp", "n": n}
+        half = {"action": "browse_fyp", "n": n // 2}
+        plan = {"round": "sim", "puppets": [
+            # Aborts halfway through its second step: the retry skips the first & resumes the second
+            {"id": "AV1", "output_file": out["AV1"], "schedule": [half, dict(half, n=n - n // 2)], "fail": "once",
+             "fail_after": n // 2 + n // 4, "marker": os.path.join(tmp, "AV1.crashed")},
+            {"id": "AV2", "output_file": out["AV2"], "schedule": [browse]},
+            {"id": "AV3", "output_file": out["AV3"], "schedule": [browse], "fail": "always"},
+        ]}
+        # A worker claims a job and dies: nobody else gets it until its lease expires
+        lease_path = os.path.join(tmp, "lease.db")
+        JobQueue(lease_path).enqueue_plan({"round": "lease", "puppets": plan["puppets"][1:2]})
+        job_id, _ = JobQueue(lease_path).claim("dead-worker")
+        assert JobQueue(lease_path, lease=3600).claim("worker") is None, "leased job was claimed twice"
+        time.sleep(0.01)
+        reclaimed = JobQueue(lease_path, lease=0).claim("worker")
+        assert reclaimed is not None and reclaimed[0] == job_id, "expired lease was not reclaimed"
+        assert JobQueue(lease_path).report()[0]["attempts"] == 2
+
+        queue_path = os.path.join(tmp, "queue.db")
+        queue = JobQueue(queue_path)
+        assert queue.enqueue_plan(plan) == 3
+        assert queue.enqueue_plan(plan) == 0, "re-enqueueing a plan must not duplicate jobs"
+
+        t0 = time.perf_counter()
+        work(queue_path, fake_puppet_factory, worker_id="worker")
+        elapsed = time.perf_counter() - t0
+
+        report = {r["puppet"]: r for r in queue.report()}
+        print(format_report(queue.report()))
+        assert report["AV1"]["status"] == "done" and report["AV1"]["attempts"] == 2, report["AV1"]
+        assert report["AV2"]["status"] == "done" and report["AV2"]["attempts"] == 1, report["AV2"]
+        assert report["AV3"]["status"] == "failed" and report["AV3"]["attempts"] == 3, report["AV3"]
+        assert queue.pending() == 0
+
+        # Retries keep the rows of earlier attempts and only write what is missing
+        assert count_rows(out["AV1"]) == (n, 1), count_rows(out["AV1"])
+        assert count_rows(out["AV2"]) == (n, 1), count_rows(out["AV2"])
+        assert count_rows(out["AV3"])[0] == 0, count_rows(out["AV3"])
+        assert report["AV1"]["videos"] == n and report["AV3"]["videos"] == 0, report
+        print(f"Queue, lease & retry checks passed ({elapsed:.1f}s wall-clock)")
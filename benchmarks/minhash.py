@@ -0,0 +1,45 @@
+"""
+    Compares exact all-pairs feed similarity (metrics.feed_similarity) with MinHash sketches + LSH queries
+    on synthetic feeds, and reports the error of the estimates.
+
+    Usage: python -m benchmarks.minhash [feeds] [videos per feed] [error]
+"""
+from TikTokBot.metrics import feed_similarity
+from TikTokBot.minhash import LSHIndex, signature, num_perm_for
+from benchmarks.feed_similarity import synthetic_feeds
+import numpy as np
+import sys, time
+
+
+if __name__ == "__main__":
+    n_feeds = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    per_feed = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    error = float(sys.argv[3]) if len(sys.argv) > 3 else 0.05
+    num_perm = num_perm_for(error)
+
+    feeds = synthetic_feeds(n_feeds, per_feed)
+    labels = list(feeds)
+    print(f"{n_feeds} feeds x {per_feed} videos, creators, {num_perm} permutations")
+
+    t0 = time.perf_counter()
+    exact = feed_similarity(feeds, "creator", workers=1).to_numpy()
+    t_exact = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    sigs = [signature(feeds[l]["creator"], num_perm) for l in labels]
+    t_sketch = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    lsh = LSHIndex(num_perm, threshold=0.3)
+    for l, s in zip(labels, sigs):
+        lsh.add(l, s)
+    found = {l: lsh.similar(l, k=10) for l in labels}
+    t_query = time.perf_counter() - t0
+
+    sig_matrix = np.array(sigs)
+    errors = [abs(np.mean(sig_matrix[i] == sig_matrix[j]) - exact[i, j])
+              for i in range(n_feeds) for j in range(i + 1, min(n_feeds, i + 20))]
+    print(f"{'exact all pairs':<24}{t_exact:>8.2f}s")
+    print(f"{'sketching':<24}{t_sketch:>8.2f}s")
+    print(f"{'LSH index + top-10 all':<24}{t_query:>8.2f}s")
+    print(f"Estimate error: mean {np.mean(errors):.4f}, max {np.max(errors):.4f} (target ~{error})")
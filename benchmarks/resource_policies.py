@@ -0,0 +1,29 @@
+"""
+    Compares bandwidth & CPU per session under each resource policy (live sessions).
+
+    Usage: python -m benchmarks.resource_policies [n] [policy ...]
+"""
+from TikTokBot import setup_anon_puppet
+from TikTokBot.resources import RESOURCE_POLICIES
+import sys
+
+DRIVER_PATH = "./drivers/chromedriver"
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    policies = sys.argv[2:] or list(RESOURCE_POLICIES.keys())
+
+    print(f"{'policy':<10}{'videos':>8}{'MB':>8}{'MB/min':>8}{'CPU s':>8}{'CPU %':>7}")
+    for policy in policies:
+        bot = setup_anon_puppet(DRIVER_PATH, profile_file="./profile_AV.json", output_file="./bench_out.csv",
+                                resource_policy=policy, monitor_resources=True)
+        try:
+            bot.anon_run(n=n)
+            bot.poll_performance_log()
+            s = bot.resource_monitor.summary()
+            cpu = s["cpu_s"] or 0.0
+            print(f"{policy:<10}{bot.videos_written:>8}{s['mb']:>8.1f}{s['mb_per_min']:>8.2f}{cpu:>8.1f}{(s['cpu_share'] or 0) * 100:>6.0f}%")
+        finally:
+            bot.close_output()
+            bot._driver.quit()
@@ -0,0 +1,29 @@
+"""
+    Simulates a full puppet run (pre-collected feed, fake driver) on a virtual clock.
+    Reports wall-clock time, simulated session time and the intended waits.
+
+    Usage: python -m benchmarks.simulated_run [n] [puppet type]
+"""
+from TikTokBot import PUPPET_TYPES
+from TikTokBot.utils import VirtualClock, set_clock
+from benchmarks.fakedriver import FakeDriver, load_feed
+import sys, time
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    puppet_type = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    clock = VirtualClock()
+    set_clock(clock)
+
+    driver = FakeDriver(load_feed())
+    puppet = PUPPET_TYPES[puppet_type](driver, "AV0", profile_file="./profile_AV.json", output_file="./sim_out.csv")
+
+    t0 = time.perf_counter()
+    puppet.browse_fyp(n=n, interact=True)
+    puppet.close_output()
+    elapsed = time.perf_counter() - t0
+
+    print(f"{puppet.videos_written} videos in {elapsed * 1000:.1f}ms wall-clock, "
+          f"{clock.now() / 60:.1f} min simulated ({len(clock.waits)} waits, {driver.commands} driver commands)")
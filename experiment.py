@@ -1,18 +1,24 @@
 from code import interact
 from TikTokBot import setup_anon_puppet, setup_puppet
 from TikTokBot.puppets import PuppetBase
+from TikTokBot.sessionpool import SessionPool
+from TikTokBot.seenindex import SeenIndex
 from selenium import webdriver
-import logging, time
+import logging, time, os
 
 
 DRIVER_PATH = "./drivers/chromedriver"
 CREDS_FILE = "./users/creds.json"
 
 
-def get_skippable_ids(fname="./to-skip.csv"):
-    to_skip = set()
-    with open(fname, 'r') as ifile:
-        to_skip = set(ifile.read().split()[1:]) # Ignore header, read the rest
+def get_skippable_ids(fname="./to-skip.csv", index="./data/seen.db", namespace="default"):
+    """
+        Returns the shared seen-video index for a topic (pass as to_skip).
+        A new, empty namespace is seeded from the to-skip file if it exists.
+    """
+    to_skip = SeenIndex(index, namespace)
+    if len(to_skip) == 0 and os.path.exists(fname):
+        to_skip.import_csvs([fname])
     return to_skip
 
 def manual_setup(login=True):
@@ -46,6 +52,32 @@ def collect_creators(bot, creators):
         print("Exception occurred:")
         raise e
 
+def collect_pooled(pool, jobs):
+    """
+        Collects tags/creators on warm sessions from a SessionPool.
+        jobs: list of ("tag" | "creator", name)
+    """
+    def make_job(kind, name):
+        def job(bot):
+            print(f"Browsing {kind}:", name)
+            if kind == "tag":
+                bot.set_output_file(f"./data/tags/hate/{name}.csv")
+                bot.browse_tag(name, n=50)
+            else:
+                bot.set_output_file(f"./data/creators/hate/{name}.csv")
+                bot.browse_creator(name, n=50)
+        return job
+    results = pool.run([make_job(k, n) for k, n in jobs])
+    stats = pool.stats()
+    print(f"{stats['jobs']} jobs on {stats['startups']} sessions, ~{stats['saved_s']:.0f}s of startup saved")
+    return results
+
+def anon_pool(size=1, login=False):
+    """
+        Returns a SessionPool of anonymous sessions (logged in if requested)
+    """
+    return SessionPool(lambda: manual_setup(login=login), size=size)
+
 if __name__ == "__main__":
 
     logging.basicConfig(filename="./logs", filemode='w', format='%(asctime)s - [%(levelname)s] %(message)s', datefmt='%H:%M:%S')
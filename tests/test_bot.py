@@ -0,0 +1,23 @@
+from TikTokBot.bot import VideoInfo
+
+
+def test_num_str_to_int():
+    vi = VideoInfo("1", "creator", "desc", list(), 10.0)
+    assert vi.num_str_to_int("10.5K") == 10500
+    assert vi.num_str_to_int("2M") == 2_000_000
+    assert vi.num_str_to_int("1,234") == 1234
+    assert vi.num_str_to_int("987") == 987
+    assert vi.num_str_to_int(None) is None
+    assert vi.num_str_to_int(42) == 42
+
+def test_num_str_to_int_placeholders():
+    vi = VideoInfo("1", "creator", "desc", list(), 10.0)
+    assert vi.num_str_to_int("Like") is None
+    assert vi.num_str_to_int("Comment") is None
+    assert vi.num_str_to_int("K") is None
+
+def test_to_row_placeholder_counts():
+    vi = VideoInfo("1", "creator", "desc", ["#tag"], 10.0)
+    vi.likes, vi.comments = "Like", "1,234"
+    row = vi.to_row()
+    assert row[4] is None and row[5] == 1234
@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+import TikTokBot.preprocessing as preproc
+
+pq = pytest.importorskip("pyarrow.parquet")
+pa = pytest.importorskip("pyarrow")
+
+
+def write_parquet(fname, v_ids):
+    fname.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(pa.table({"v_id": v_ids, "creator": ["c"] * len(v_ids)}), str(fname))
+
+def test_load_folder_mixed_csv_and_parquet(tmp_path):
+    pd.DataFrame({"v_id": [1, 2], "creator": ["a", "b"]}).to_csv(tmp_path / "AV3_2022-06-08_out.csv", index=False)
+    write_parquet(tmp_path / "AV3_2022-06-09_out.parquet", [3])
+    write_parquet(tmp_path / "topic=AV" / "puppet=AV1" / "date=2022-06-10" / "part-0.parquet", [4, 5])
+
+    assert preproc.is_partition_root(tmp_path)
+    df = preproc.load_folder(tmp_path, columns=["v_id", "creator"])
+    assert sorted(df["v_id"]) == [1, 2, 3, 4, 5]
+    assert len(preproc.folder_files(tmp_path)) == 3
+
+def test_load_partitions_filters(tmp_path):
+    pd.DataFrame({"v_id": [1]}).to_csv(tmp_path / "out.csv", index=False)
+    write_parquet(tmp_path / "topic=AV" / "puppet=AV1" / "date=2022-06-10" / "part-0.parquet", [4, 5])
+    write_parquet(tmp_path / "topic=CT" / "puppet=CT1" / "date=2022-06-10" / "part-0.parquet", [6])
+
+    df = preproc.load_partitions(tmp_path, columns=["v_id", "puppet"], topics=["CT"])
+    assert list(df["v_id"]) == [6]
+    assert list(df["puppet"]) == ["CT1"]
+
+def test_load_folder_csv_only(tmp_path):
+    pd.DataFrame({"v_id": [1, 2]}).to_csv(tmp_path / "out.csv", index=False)
+    assert not preproc.is_partition_root(tmp_path)
+    assert list(preproc.load_folder(tmp_path)["v_id"]) == [1, 2]
@@ -0,0 +1,25 @@
+import pandas as pd
+from TikTokBot.relevance import RelevanceIndex, parse_tags
+
+PROFILE = {"tags": {"#cats": 1, "#dogs": 0.5}, "creators": ["catlover"], "sounds": ["meow"], "keywords": ["kitten"]}
+
+
+def day_frame(rows):
+    return pd.DataFrame(rows, columns=["tags", "creator", "sound", "desc"])
+
+def test_score_frame_matches_score_fields():
+    index = RelevanceIndex(PROFILE)
+    df = day_frame([("['#cats', '#dogs']", "someone", "meow - x", "a kitten"),
+                    ("[]", "CatLover", None, None),
+                    (float("nan"), "other", "song", "nothing")])
+    expected = [index.score_fields(parse_tags(t), c, s, d) for t, c, s, d in df.itertuples(index=False)]
+    assert list(index.score_frame(df)) == expected == [3.0, 10.0, 0.0]
+
+def test_score_frame_duplicated_index():
+    index = RelevanceIndex(PROFILE)
+    day1 = day_frame([("['#cats']", "someone", None, None), ("['#dogs']", "catlover", None, "a kitten")])
+    day2 = day_frame([("[]", "nobody", None, None), ("['#cats', '#cats']", "someone", None, None)])
+    df = pd.concat([day1, day2]) # Index 0, 1, 0, 1
+    scores = index.score_frame(df)
+    assert list(scores) == [1.0, 11.0, 0.0, 2.0]
+    assert list(scores.index) == [0, 1, 0, 1]